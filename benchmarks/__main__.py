@@ -0,0 +1,247 @@
+"""
+Runs serpentarium's benchmarks and compares the results with a baseline
+
+The results are written as JSON. When a baseline that was written by an earlier run is provided,
+each result is compared with the baseline result that has the same parameters, and the runner
+exits with a non-zero status if any of them is slower than the baseline by more than the
+threshold. Baselines should be recorded on the same machine, with the same options.
+
+Usage: python -m benchmarks [--quick] [--benchmark NAME ...] [--output FILE]
+                            [--baseline FILE] [--threshold FRACTION]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from . import (
+    cpu_affinity_scaling,
+    first_run_isolation,
+    host_logging_latency,
+    isolation_overhead,
+    logging_throughput,
+    return_value_size,
+    spawn_latency,
+)
+
+RESULTS_VERSION = 1
+DEFAULT_THRESHOLD = 0.1
+
+
+class Benchmark(NamedTuple):
+    run: Callable[..., List[Dict]]
+    # The keyword arguments that `run` is called with, for a full run and a quick run
+    arguments: Dict[str, Any]
+    quick_arguments: Dict[str, Any]
+    # The fields that identify a result, and the field that is compared with the baseline
+    parameters: Tuple[str, ...]
+    metric: str
+    higher_is_better: bool
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    "spawn_latency": Benchmark(
+        spawn_latency.run,
+        {"repeat": 10},
+        {"repeat": 3},
+        ("start_method",),
+        "seconds",
+        False,
+    ),
+    "isolation_overhead": Benchmark(
+        isolation_overhead.run,
+        {"module_counts": isolation_overhead.MODULE_COUNTS, "repeat": 20},
+        {"module_counts": [0, 1000, 10000], "repeat": 5},
+        ("added_modules",),
+        "seconds",
+        False,
+    ),
+    "first_run_isolation": Benchmark(
+        first_run_isolation.run,
+        {
+            "host_module_counts": first_run_isolation.HOST_MODULE_COUNTS,
+            "vendor_module_counts": first_run_isolation.VENDOR_MODULE_COUNTS,
+            "repeat": 5,
+        },
+        {"host_module_counts": [0, 10000], "vendor_module_counts": [0, 100], "repeat": 2},
+        ("host_modules", "vendor_modules"),
+        "seconds",
+        False,
+    ),
+    "return_value_size": Benchmark(
+        return_value_size.run,
+        {"sizes": return_value_size.SIZES, "repeat": 3},
+        {"sizes": return_value_size.SIZES[:4], "repeat": 1},
+        ("transport", "size"),
+        "bytes_per_second",
+        True,
+    ),
+    "logging_throughput": Benchmark(
+        logging_throughput.run,
+        {"processes": 8, "records": 20000, "repeat": 3},
+        {"processes": 2, "records": 5000, "repeat": 1},
+        ("batch_size", "records"),
+        "records_per_second",
+        True,
+    ),
+    "host_logging_latency": Benchmark(
+        host_logging_latency.run,
+        {"records": 100000, "repeat": 3},
+        {"records": 10000, "repeat": 1},
+        ("mode", "level"),
+        "microseconds_per_record",
+        False,
+    ),
+    "cpu_affinity_scaling": Benchmark(
+        cpu_affinity_scaling.run,
+        {"processes": os.cpu_count() or 1, "iterations": 10_000_000, "repeat": 3},
+        {"processes": os.cpu_count() or 1, "iterations": 1_000_000, "repeat": 1},
+        ("placement", "processes"),
+        "seconds",
+        False,
+    ),
+}
+
+
+class Comparison(NamedTuple):
+    benchmark: str
+    parameters: Dict[str, Any]
+    baseline: float
+    current: float
+    # How many times faster the current result is than the baseline; below 1 is slower
+    speedup: float
+    regressed: bool
+
+
+def run_benchmarks(names: Iterable[str], quick: bool) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "version": RESULTS_VERSION,
+        "quick": quick,
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": {},
+    }
+
+    for name in names:
+        benchmark = BENCHMARKS[name]
+        print(f"Running {name}", file=sys.stderr)
+        arguments = benchmark.quick_arguments if quick else benchmark.arguments
+        results["benchmarks"][name] = benchmark.run(**arguments)
+
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD
+) -> List[Comparison]:
+    """
+    Compare benchmark results with a baseline
+
+    :param results: The results of `run_benchmarks()`
+    :param baseline: The results of an earlier call to `run_benchmarks()`
+    :param threshold: The fraction by which a result may be slower than the baseline before it is
+                      considered a regression, defaults to 0.1
+    :return: A Comparison for each result that has a matching baseline result
+    """
+    if baseline.get("version") != RESULTS_VERSION:
+        raise ValueError("The baseline was written by an incompatible version of the benchmarks")
+
+    comparisons = []
+    for name, benchmark_results in results["benchmarks"].items():
+        benchmark = BENCHMARKS[name]
+        baseline_results = {
+            _key(benchmark, result): result for result in baseline["benchmarks"].get(name, [])
+        }
+
+        for result in benchmark_results:
+            baseline_result = baseline_results.get(_key(benchmark, result))
+            if baseline_result is None:
+                continue
+
+            current_value = result[benchmark.metric]
+            baseline_value = baseline_result[benchmark.metric]
+            if benchmark.higher_is_better:
+                speedup = current_value / baseline_value
+            else:
+                speedup = baseline_value / current_value
+
+            comparisons.append(
+                Comparison(
+                    name,
+                    {parameter: result[parameter] for parameter in benchmark.parameters},
+                    baseline_value,
+                    current_value,
+                    speedup,
+                    speedup < 1 - threshold,
+                )
+            )
+
+    return comparisons
+
+
+def _key(benchmark: Benchmark, result: Dict[str, Any]) -> Tuple:
+    return tuple(result[parameter] for parameter in benchmark.parameters)
+
+
+def print_comparisons(comparisons: Iterable[Comparison]):
+    for comparison in comparisons:
+        parameters = " ".join(f"{name}={value}" for name, value in comparison.parameters.items())
+        status = "REGRESSED" if comparison.regressed else "ok"
+        print(
+            f"{comparison.benchmark:>22} {parameters:<40} {comparison.baseline:>14.6g} -> "
+            f"{comparison.current:>14.6g} {comparison.speedup:>6.2f}x {status}",
+            file=sys.stderr,
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Run fewer, smaller cases, e.g. in CI")
+    parser.add_argument(
+        "--benchmark",
+        action="append",
+        choices=list(BENCHMARKS),
+        dest="benchmarks",
+        help="A benchmark to run; may be repeated. Defaults to all benchmarks.",
+    )
+    parser.add_argument(
+        "--output", type=Path, default=None, help="Write the results here instead of stdout"
+    )
+    parser.add_argument(
+        "--baseline", type=Path, default=None, help="Results of an earlier run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="The fraction by which a result may be slower than the baseline",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.benchmarks or list(BENCHMARKS), args.quick)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=1)
+        print()
+    else:
+        args.output.write_text(json.dumps(results, indent=1))
+
+    if args.baseline is None:
+        return
+
+    comparisons = compare(results, json.loads(args.baseline.read_text()), args.threshold)
+    print_comparisons(comparisons)
+    if any(comparison.regressed for comparison in comparisons):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
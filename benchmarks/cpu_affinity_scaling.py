@@ -0,0 +1,81 @@
+"""
+Measures how long many CPU-bound MultiprocessingPlugins take to run at once with each CPU placement
+
+Usage: python -m benchmarks.cpu_affinity_scaling [--processes N] [--iterations N] [--repeat N]
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, List, Optional
+
+from serpentarium import CPUPlacementPolicy, MultiprocessingPlugin
+
+from .plugins import CPUBoundPlugin
+
+JOIN_TIMEOUT = 300  # seconds
+
+
+def get_placements() -> List[Optional[CPUPlacementPolicy]]:
+    if not hasattr(os, "sched_setaffinity"):
+        return [None]
+
+    return [None, CPUPlacementPolicy.ROUND_ROBIN, CPUPlacementPolicy.LEAST_LOADED]
+
+
+def run(processes: int, iterations: int, repeat: int) -> List[Dict]:
+    results = []
+
+    for placement in get_placements():
+        durations = []
+        for _ in range(repeat):
+            plugins = [
+                MultiprocessingPlugin(
+                    plugin=CPUBoundPlugin(plugin_name="cpu_bound"), cpu_affinity=placement
+                )
+                for _ in range(processes)
+            ]
+
+            start = time.perf_counter()
+            for plugin in plugins:
+                plugin.start(iterations=iterations)
+            for plugin in plugins:
+                plugin.join(JOIN_TIMEOUT)
+            durations.append(time.perf_counter() - start)
+
+            if any(plugin.return_value is None for plugin in plugins):
+                raise RuntimeError("A plugin did not return in time")
+
+        seconds = min(durations)
+        results.append(
+            {
+                "placement": "none" if placement is None else placement.name.lower(),
+                "processes": processes,
+                "seconds": seconds,
+                "iterations_per_second": processes * iterations / seconds,
+            }
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--processes", type=int, default=os.cpu_count() or 1, help="Plugins to run at once"
+    )
+    parser.add_argument("--iterations", type=int, default=10_000_000, help="Work per plugin")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per placement; the best is kept"
+    )
+    args = parser.parse_args()
+
+    for result in run(args.processes, args.iterations, args.repeat):
+        print(
+            f"{result['placement']:>12} {result['processes']:>4} processes "
+            f"{result['seconds']:>8.3f} s ({result['iterations_per_second']:,.0f} iterations/s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Measures how long a PluginWrapper's first run takes as the host's module count and the size of the
+plugin's vendor directory grow
+
+Each run loads a freshly generated plugin whose vendor directory contains a package of N modules,
+all of which the plugin imports. A warm-up run compiles the plugin's modules first, so the
+measurement covers isolation and importing, not compiling.
+
+Usage: python -m benchmarks.first_run_isolation [--max-modules N] [--max-vendor-modules N]
+                                                [--repeat N]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from serpentarium.constants import VENDOR_DIRECTORY_NAME
+from serpentarium.plugin_wrapper import PluginWrapper
+
+from .isolation_overhead import add_host_modules, remove_host_modules
+
+HOST_MODULE_COUNTS = [0, 1000, 10000]
+VENDOR_MODULE_COUNTS = [0, 10, 100, 1000]
+PLUGIN_NAME = "first_run"
+VENDOR_PACKAGE_NAME = "vendored"
+
+PLUGIN_SOURCE = """
+import {package}
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_) -> int:
+        return {package}.count()
+"""
+
+VENDOR_MODULE_SOURCE = """
+def value() -> int:
+    return 1
+"""
+
+
+def create_plugin(plugin_directory: Path, vendor_modules: int):
+    package_directory = plugin_directory / VENDOR_DIRECTORY_NAME / VENDOR_PACKAGE_NAME
+    package_directory.mkdir(parents=True)
+
+    module_names = [f"module_{i}" for i in range(vendor_modules)]
+    for module_name in module_names:
+        (package_directory / f"{module_name}.py").write_text(VENDOR_MODULE_SOURCE)
+
+    (package_directory / "__init__.py").write_text(
+        "".join(f"from . import {module_name}\n" for module_name in module_names)
+        + "\n\ndef count() -> int:\n"
+        + f"    return sum(module.value() for module in [{', '.join(module_names)}])\n"
+    )
+    (plugin_directory / "plugin.py").write_text(PLUGIN_SOURCE.format(package=VENDOR_PACKAGE_NAME))
+
+
+def measure_first_run(plugin_directory: Path, vendor_modules: int, repeat: int) -> float:
+    durations = []
+    # The first run compiles the plugin's modules
+    for _ in range(repeat + 1):
+        plugin = PluginWrapper(plugin_name=PLUGIN_NAME, plugin_directory=plugin_directory)
+
+        start = time.perf_counter()
+        return_value = plugin.run()
+        durations.append(time.perf_counter() - start)
+
+        if return_value != vendor_modules:
+            raise RuntimeError(f"The plugin imported {return_value} of {vendor_modules} modules")
+
+    return min(durations[1:])
+
+
+def run(
+    host_module_counts: Iterable[int], vendor_module_counts: Iterable[int], repeat: int
+) -> List[Dict]:
+    results = []
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        plugin_directories = {}
+        for vendor_modules in vendor_module_counts:
+            plugin_directory = Path(temp_directory, str(vendor_modules), PLUGIN_NAME)
+            create_plugin(plugin_directory, vendor_modules)
+            plugin_directories[vendor_modules] = plugin_directory
+
+        try:
+            for host_modules in host_module_counts:
+                remove_host_modules()
+                add_host_modules(host_modules)
+
+                for vendor_modules, plugin_directory in plugin_directories.items():
+                    results.append(
+                        {
+                            "host_modules": host_modules,
+                            "vendor_modules": vendor_modules,
+                            "seconds": measure_first_run(plugin_directory, vendor_modules, repeat),
+                        }
+                    )
+        finally:
+            remove_host_modules()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--max-modules", type=int, default=10000, help="The largest number of added host modules"
+    )
+    parser.add_argument(
+        "--max-vendor-modules", type=int, default=1000, help="The largest number of vendor modules"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per size; the best is kept")
+    args = parser.parse_args()
+
+    host_module_counts = [count for count in HOST_MODULE_COUNTS if count <= args.max_modules]
+    vendor_module_counts = [
+        count for count in VENDOR_MODULE_COUNTS if count <= args.max_vendor_modules
+    ]
+    for result in run(host_module_counts, vendor_module_counts, args.repeat):
+        print(
+            f"{result['host_modules']:>8} host modules "
+            f"{result['vendor_modules']:>6} vendor modules {result['seconds'] * 1000:>9.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measures how long it takes the host process to log a record with configure_host_process_logger()
+
+Records are logged through the queue and directly to the handlers, both at a level that the
+handlers accept and at a level that they discard.
+
+Usage: python -m benchmarks.host_logging_latency [--records N] [--repeat N]
+"""
+
+import argparse
+import logging
+import time
+from queue import Queue
+from typing import Dict, List
+
+from serpentarium.logging import configure_host_process_logger
+
+HANDLER_LEVEL = logging.INFO
+LEVELS = {"accepted": logging.INFO, "discarded": logging.DEBUG}
+
+
+class NullFormattingHandler(logging.Handler):
+    """Formats records and discards them"""
+
+    def emit(self, record: logging.LogRecord):
+        self.format(record)
+
+
+def run(records: int, repeat: int) -> List[Dict]:
+    root = logging.getLogger()
+    root.setLevel(logging.DEBUG)
+    logger = logging.getLogger(__name__)
+    results = []
+
+    for direct_host_logging in [False, True]:
+        for level_name, level in LEVELS.items():
+            durations = []
+            for _ in range(repeat):
+                host_handlers = list(root.handlers)
+                handler = NullFormattingHandler()
+                handler.setLevel(HANDLER_LEVEL)
+                listener = configure_host_process_logger(
+                    Queue(), [handler], direct_host_logging=direct_host_logging
+                )
+
+                listener.start()
+                start = time.perf_counter()
+                for i in range(records):
+                    logger.log(level, "Message %d of %d", i, records)
+                durations.append(time.perf_counter() - start)
+                listener.stop()
+
+                root.handlers = host_handlers
+
+            results.append(
+                {
+                    "mode": "direct" if direct_host_logging else "queue",
+                    "level": level_name,
+                    "seconds": min(durations),
+                    "microseconds_per_record": min(durations) / records * 1e6,
+                }
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000, help="Records logged per run")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best is kept")
+    args = parser.parse_args()
+
+    for result in run(args.records, args.repeat):
+        print(
+            f"{result['mode']:>6} {result['level']:>9} {result['seconds']:>8.3f} s "
+            f"{result['microseconds_per_record']:>8.2f} us/record"
+        )
+
+
+if __name__ == "__main__":
+    main()
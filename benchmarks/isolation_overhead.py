@@ -0,0 +1,81 @@
+"""
+Measures how long PluginWrapper takes to isolate a plugin as the host's module count grows
+
+Usage: python -m benchmarks.isolation_overhead [--max-modules N] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Iterable, List
+
+from serpentarium.plugin_wrapper import PluginWrapper
+
+MODULE_COUNTS = [0, 100, 1000, 10000, 100000]
+HOST_MODULE_PREFIX = "_serpentarium_benchmark_module_"
+
+
+def add_host_modules(count: int):
+    for i in range(count):
+        name = f"{HOST_MODULE_PREFIX}{i}"
+        sys.modules.setdefault(name, ModuleType(name))
+
+
+def remove_host_modules():
+    for name in [name for name in sys.modules if name.startswith(HOST_MODULE_PREFIX)]:
+        del sys.modules[name]
+
+
+def measure_isolation(repeat: int) -> float:
+    # The plugin is never imported, so only the cost of entering and leaving the isolated context
+    # is measured
+    plugin = PluginWrapper(plugin_name="isolation", plugin_directory=Path("isolation"))
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with plugin._plugin_import_context():
+            pass
+        durations.append(time.perf_counter() - start)
+
+    return min(durations)
+
+
+def run(module_counts: Iterable[int], repeat: int) -> List[Dict]:
+    results = []
+
+    try:
+        for module_count in module_counts:
+            remove_host_modules()
+            add_host_modules(module_count)
+
+            results.append(
+                {
+                    "added_modules": module_count,
+                    "host_modules": len(sys.modules),
+                    "seconds": measure_isolation(repeat),
+                }
+            )
+    finally:
+        remove_host_modules()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--max-modules", type=int, default=100000, help="The largest number of added modules"
+    )
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per count; the best is kept")
+    args = parser.parse_args()
+
+    module_counts = [count for count in MODULE_COUNTS if count <= args.max_modules]
+    for result in run(module_counts, args.repeat):
+        print(f"{result['host_modules']:>8} modules {result['seconds'] * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
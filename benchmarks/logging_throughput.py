@@ -0,0 +1,139 @@
+"""
+Measures how many log records per second the host receives from many plugin processes
+
+With `--queue-size`, the plugins log to a bounded queue and apply `--overflow-policy` when it is
+full. Records that are dropped are reported, but are not counted as received.
+
+Usage: python -m benchmarks.logging_throughput [--processes N] [--records N] [--repeat N]
+                                               [--queue-size N] [--overflow-policy POLICY]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import time
+from functools import partial
+from typing import Dict, List
+
+from serpentarium import MultiprocessingPlugin
+from serpentarium.constants import SERPENTARIUM
+from serpentarium.logging import (
+    BatchingQueueListener,
+    OverflowPolicy,
+    configure_child_process_logger,
+)
+
+from .plugins import LoggingPlugin
+
+BATCH_SIZES = [1, 10, 100, 1000]
+JOIN_TIMEOUT = 300  # seconds
+
+
+class CountingHandler(logging.Handler):
+    """Counts the records it handles, except for reports of dropped records"""
+
+    def __init__(self):
+        super().__init__()
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord):
+        if record.name != SERPENTARIUM:
+            self.count += 1
+
+
+def run(
+    processes: int,
+    records: int,
+    repeat: int,
+    queue_size: int = 0,
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+) -> List[Dict]:
+    spawn_context = multiprocessing.get_context("spawn")
+    results = []
+
+    for batch_size in BATCH_SIZES:
+        durations = []
+        received = []
+        for _ in range(repeat):
+            ipc_logger_queue = spawn_context.Queue(queue_size)
+            handler = CountingHandler()
+            listener = BatchingQueueListener(ipc_logger_queue, handler)
+            configure_logger = partial(
+                configure_child_process_logger,
+                ipc_logger_queue,
+                max_batch_size=batch_size,
+                overflow_policy=overflow_policy,
+            )
+            plugins = [
+                MultiprocessingPlugin(
+                    plugin=LoggingPlugin(plugin_name="logging"),
+                    configure_child_process_logger=configure_logger,
+                )
+                for _ in range(processes)
+            ]
+
+            listener.start()
+            start = time.perf_counter()
+            for plugin in plugins:
+                plugin.start(count=records)
+            for plugin in plugins:
+                plugin.join(JOIN_TIMEOUT)
+            # Stopping the listener handles the records that remain in the queue
+            listener.stop()
+            durations.append(time.perf_counter() - start)
+
+            dropped = sum(listener.dropped_records.values())
+            if handler.count + dropped != processes * records:
+                raise RuntimeError(
+                    f"Received {handler.count} and dropped {dropped} of {processes * records} "
+                    "records"
+                )
+            received.append(handler.count)
+
+        results.append(
+            {
+                "batch_size": batch_size,
+                "records": processes * records,
+                "received": min(received),
+                "seconds": min(durations),
+                "records_per_second": processes * records / min(durations),
+            }
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--processes", type=int, default=8, help="The number of plugin processes")
+    parser.add_argument("--records", type=int, default=20000, help="Records logged per process")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per batch size; the best is kept"
+    )
+    parser.add_argument(
+        "--queue-size", type=int, default=0, help="The size of the queue; 0 is unbounded"
+    )
+    parser.add_argument(
+        "--overflow-policy",
+        choices=[policy.name for policy in OverflowPolicy],
+        default=OverflowPolicy.BLOCK.name,
+        help="What plugins do when the queue is full",
+    )
+    args = parser.parse_args()
+
+    for result in run(
+        args.processes,
+        args.records,
+        args.repeat,
+        args.queue_size,
+        OverflowPolicy[args.overflow_policy],
+    ):
+        print(
+            f"batch size {result['batch_size']:>5} {result['received']:>9} of "
+            f"{result['records']:>9} records received {result['seconds']:>8.3f} s "
+            f"{result['records_per_second']:>12.0f} records/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
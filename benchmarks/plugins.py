@@ -0,0 +1,30 @@
+import logging
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class PayloadPlugin(NamedPluginMixin, MultiUsePlugin):
+    """Returns a bytes object of the requested size"""
+
+    def run(self, size: int, **_) -> bytes:  # type: ignore[override]
+        return bytes(size)
+
+
+class LoggingPlugin(NamedPluginMixin, MultiUsePlugin):
+    """Logs the requested number of messages"""
+
+    def run(self, count: int, **_):  # type: ignore[override]
+        logger = logging.getLogger(__name__)
+        for i in range(count):
+            logger.info("Message %d of %d", i, count)
+
+
+class CPUBoundPlugin(NamedPluginMixin, MultiUsePlugin):
+    """Spins for the requested number of iterations"""
+
+    def run(self, iterations: int, **_) -> int:  # type: ignore[override]
+        total = 0
+        for i in range(iterations):
+            total += i * i
+
+        return total
@@ -0,0 +1,81 @@
+"""
+Measures how long it takes to run a MultiprocessingPlugin as the size of its return value grows
+
+Usage: python -m benchmarks.return_value_size [--max-size BYTES] [--repeat N]
+"""
+
+import argparse
+import time
+from typing import Dict, Iterable, List
+
+from serpentarium import MultiprocessingPlugin, PickleTransport, Transport
+
+from .plugins import PayloadPlugin
+
+KiB = 1024
+MiB = 1024 * KiB
+GiB = 1024 * MiB
+
+SIZES = [KiB, 64 * KiB, MiB, 16 * MiB, 256 * MiB, GiB]
+JOIN_TIMEOUT = 300  # seconds
+
+
+def get_transports() -> Dict[str, Transport]:
+    transports: Dict[str, Transport] = {"pickle": PickleTransport()}
+
+    try:
+        from serpentarium.shared_memory_transport import SharedMemoryTransport
+
+        transports["shared_memory"] = SharedMemoryTransport()
+    except ImportError:
+        pass
+
+    return transports
+
+
+def run(sizes: Iterable[int], repeat: int) -> List[Dict]:
+    results = []
+
+    for transport_name, transport in get_transports().items():
+        for size in sizes:
+            durations = []
+            for _ in range(repeat):
+                plugin = MultiprocessingPlugin(
+                    plugin=PayloadPlugin(plugin_name="payload"), transport=transport
+                )
+
+                start = time.perf_counter()
+                return_value = plugin.run(size=size, timeout=JOIN_TIMEOUT)
+                durations.append(time.perf_counter() - start)
+
+                if return_value is None or len(return_value) != size:
+                    raise RuntimeError(f"The plugin did not return {size} bytes in time")
+
+            results.append(
+                {
+                    "transport": transport_name,
+                    "size": size,
+                    "seconds": min(durations),
+                    "bytes_per_second": size / min(durations),
+                }
+            )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-size", type=int, default=GiB, help="The largest size in bytes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the best is kept")
+    args = parser.parse_args()
+
+    sizes = [size for size in SIZES if size <= args.max_size]
+    for result in run(sizes, args.repeat):
+        print(
+            f"{result['transport']:>14} {result['size']:>12} B "
+            f"{result['seconds']:>9.4f} s {result['bytes_per_second'] / MiB:>10.1f} MiB/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Measures how long it takes a MultiprocessingPlugin to start and return a result
+
+Usage: python -m benchmarks.spawn_latency [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from serpentarium import MultiprocessingPlugin, ProcessStartMethod
+
+from .plugins import PayloadPlugin
+
+JOIN_TIMEOUT = 60  # seconds
+
+
+def get_start_methods() -> List[ProcessStartMethod]:
+    if sys.platform == "win32":
+        return [ProcessStartMethod.SPAWN]
+
+    return [ProcessStartMethod.SPAWN, ProcessStartMethod.FORKSERVER]
+
+
+def run(repeat: int) -> List[Dict]:
+    results = []
+
+    for start_method in get_start_methods():
+        # The first plugin started with FORKSERVER also starts the template process
+        MultiprocessingPlugin(
+            plugin=PayloadPlugin(plugin_name="payload"), start_method=start_method
+        ).run(size=0, timeout=JOIN_TIMEOUT)
+
+        durations = []
+        for _ in range(repeat):
+            plugin = MultiprocessingPlugin(
+                plugin=PayloadPlugin(plugin_name="payload"), start_method=start_method
+            )
+
+            start = time.perf_counter()
+            return_value = plugin.run(size=0, timeout=JOIN_TIMEOUT)
+            durations.append(time.perf_counter() - start)
+
+            if return_value != b"":
+                raise RuntimeError("The plugin did not return in time")
+
+        results.append(
+            {
+                "start_method": start_method.value,
+                "seconds": min(durations),
+                "median_seconds": statistics.median(durations),
+            }
+        )
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10, help="Runs per method; the best is kept")
+    args = parser.parse_args()
+
+    for result in run(args.repeat):
+        print(
+            f"{result['start_method']:>10} {result['seconds'] * 1000:>9.2f} ms "
+            f"(median {result['median_seconds'] * 1000:.2f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main()
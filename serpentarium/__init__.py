@@ -4,11 +4,49 @@ import sys
 
 CLEAN_SYS_MODULES = sys.modules.copy()
 
+from typing import TYPE_CHECKING, Any
+
 from . import concurrency
 from . import types
 from . import logging
 from .plugin_thread_name import PluginThreadName
+from .transport import Transport, PickleTransport
+from .process_start_method import ProcessStartMethod, set_forkserver_preload
+from .isolation_mode import IsolationMode
+from .metrics import Metric, MetricsRecorder, InMemoryMetricsRecorder
+from .resource_limits import ResourceLimits, ResourceUsage
+from .cpu_affinity import CPUPlacementPolicy
+from .cancellation import CancellationOutcome
 from .plugin import SingleUsePlugin, MultiUsePlugin
 from .named_plugin_mixin import NamedPluginMixin
 from .multiprocessing_plugin import MultiprocessingPlugin
+from .thread_plugin import ThreadPlugin
 from .plugin_loader import PluginLoader
+
+# These are only needed by hosts that use them, so they are imported on first access rather than
+# adding to the import time of serpentarium and of every child process.
+_LAZY_ATTRIBUTES = {
+    "PluginResult": "plugin_fan_out",
+    "PersistentMultiprocessingPlugin": "persistent_multiprocessing_plugin",
+    "PluginProcessPool": "plugin_process_pool",
+    "ReloadablePlugin": "reloadable_plugin",
+    "PluginMetadata": "plugin_registry",
+    "PluginRegistry": "plugin_registry",
+}
+
+if TYPE_CHECKING:
+    from .plugin_fan_out import PluginResult
+    from .persistent_multiprocessing_plugin import PersistentMultiprocessingPlugin
+    from .plugin_process_pool import PluginProcessPool
+    from .reloadable_plugin import ReloadablePlugin
+    from .plugin_registry import PluginMetadata, PluginRegistry
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    import importlib
+
+    module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+    return getattr(module, name)
@@ -0,0 +1,24 @@
+from enum import Enum, auto
+
+DEFAULT_GRACE_PERIOD = 5.0  # seconds
+DEFAULT_TERMINATE_TIMEOUT = 5.0  # seconds
+
+
+class CancellationOutcome(Enum):
+    """
+    How a plugin stopped after it was cancelled
+
+    A plugin is cancelled cooperatively first, by setting the Event that was passed to its `run()`
+    method as `cancel_event`. NOT_RUNNING means that the plugin had already stopped before it was
+    cancelled. STOPPED means that the plugin stopped within the grace period after its cancel
+    event was set. TERMINATED means that the plugin's process had to be terminated, and KILLED means
+    that it had to be killed after it did not exit in time after being terminated. Threads can't be
+    stopped forcibly, so ABANDONED means that a plugin's thread did not stop within the grace period
+    and was left running.
+    """
+
+    NOT_RUNNING = auto()
+    STOPPED = auto()
+    TERMINATED = auto()
+    KILLED = auto()
+    ABANDONED = auto()
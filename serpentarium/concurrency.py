@@ -38,3 +38,22 @@ class Event(Protocol):
 
     def wait(self, timeout: Optional[float] = ...) -> bool:
         ...
+
+
+class Semaphore(Protocol):
+    def __enter__(self) -> bool:
+        ...
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        ...
+
+    def acquire(self, blocking: bool = ..., timeout: Optional[float] = ...) -> bool:
+        ...
+
+    def release(self) -> None:
+        ...
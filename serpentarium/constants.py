@@ -1,2 +1,4 @@
 SERPENTARIUM = "serpentarium"
 VENDOR_DIRECTORY_NAME = "vendor"
+PLUGIN_ARCHIVE_SUFFIX = ".zip"
+DEFAULT_POLL_INTERVAL = 1.0  # seconds
@@ -0,0 +1,131 @@
+"""
+Placement of plugin processes on CPUs
+
+A plugin's process can be pinned to an explicit set of CPUs, or to a single CPU that is chosen by a
+CPUPlacementPolicy when the process is started. The affinity is set with `os.sched_setaffinity()`
+in the plugin's process before the plugin runs, so it is only available on platforms that support
+it, such as Linux.
+"""
+
+import os
+import threading
+from enum import Enum, auto
+from typing import AbstractSet, Dict, FrozenSet, Iterable, List, Union
+
+
+class CPUPlacementPolicy(Enum):
+    """
+    A policy for choosing the CPU that a plugin's process is pinned to
+
+    ROUND_ROBIN pins each plugin process to the next CPU in turn. LEAST_LOADED pins each plugin
+    process to the CPU that the fewest running plugin processes are pinned to. A plugin process
+    counts as running until its plugin has been joined or found not to be alive, or until the plugin
+    is garbage collected. Only the CPUs that the host process may run on are used.
+    """
+
+    ROUND_ROBIN = auto()
+    LEAST_LOADED = auto()
+
+
+CPUAffinity = Union[CPUPlacementPolicy, Iterable[int]]
+
+
+class CPUAllocator:
+    """
+    Chooses CPUs for plugin processes according to a CPUPlacementPolicy
+
+    The allocator keeps count of the plugin processes that are pinned to each CPU. Every CPU that
+    `allocate()` returns must be given back with `release()` once the plugin process exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_index = 0
+        self._load: Dict[int, int] = {}
+
+    def allocate(self, policy: CPUPlacementPolicy) -> int:
+        """
+        Choose a CPU for a plugin process
+
+        :param policy: The CPUPlacementPolicy that chooses the CPU
+        :return: The chosen CPU
+        """
+        cpus = _available_cpus()
+
+        with self._lock:
+            if policy == CPUPlacementPolicy.ROUND_ROBIN:
+                cpu = cpus[self._next_index % len(cpus)]
+                self._next_index += 1
+            else:
+                cpu = min(cpus, key=lambda cpu: self._load.get(cpu, 0))
+
+            self._load[cpu] = self._load.get(cpu, 0) + 1
+
+        return cpu
+
+    def release(self, cpu: int):
+        """
+        Give back a CPU that was returned by `allocate()`
+
+        :param cpu: The CPU whose plugin process exited
+        """
+        with self._lock:
+            load = self._load.get(cpu, 0) - 1
+            if load > 0:
+                self._load[cpu] = load
+            else:
+                self._load.pop(cpu, None)
+
+    @property
+    def load(self) -> Dict[int, int]:
+        """The number of running plugin processes that are pinned to each CPU"""
+        with self._lock:
+            return dict(self._load)
+
+
+_allocator = CPUAllocator()
+
+
+def get_cpu_allocator() -> CPUAllocator:
+    """
+    Get the CPUAllocator that places every MultiprocessingPlugin in this process
+
+    :return: The process-wide CPUAllocator
+    """
+    return _allocator
+
+
+def validate_cpu_affinity(cpu_affinity: CPUAffinity) -> Union[CPUPlacementPolicy, FrozenSet[int]]:
+    """
+    Check that a CPU affinity can be applied on this platform
+
+    :param cpu_affinity: A CPUPlacementPolicy or an iterable of CPU numbers
+    :raises NotImplementedError: If the platform does not support CPU affinity
+    :raises ValueError: If `cpu_affinity` is an empty set of CPUs
+    :return: The CPUPlacementPolicy, or the CPUs as a frozenset
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        raise NotImplementedError("CPU affinity is not supported on this platform")
+
+    if isinstance(cpu_affinity, CPUPlacementPolicy):
+        return cpu_affinity
+
+    cpus = frozenset(cpu_affinity)
+    if not cpus:
+        raise ValueError("cpu_affinity must contain at least one CPU")
+
+    return cpus
+
+
+def set_cpu_affinity(cpus: AbstractSet[int]):
+    """
+    Pin the current process to a set of CPUs
+
+    :param cpus: The CPUs that the process may run on
+    :raises OSError: If the process could not be pinned, e.g. because a CPU does not exist
+    """
+    os.sched_setaffinity(0, cpus)
+
+
+def _available_cpus() -> List[int]:
+    return sorted(os.sched_getaffinity(0))
@@ -0,0 +1,18 @@
+from enum import Enum, auto
+
+
+class IsolationMode(Enum):
+    """
+    The method used to make a plugin and its vendored dependencies importable
+
+    SYS_PATH prepends the plugin's parent directory and its vendor directory to `sys.path` while the
+    plugin is loaded, so every import, including imports from the standard library, searches those
+    directories first. META_PATH installs a `PluginFinder` at the front of `sys.meta_path` instead.
+    The finder resolves the plugin's package and its vendored top-level modules from an index that
+    is built once per plugin, so other imports are not affected and `sys.path` is never modified.
+    If the plugin has an up-to-date manifest (see `serpentarium.vendor_manifest`), all of its
+    modules are resolved from the manifest instead.
+    """
+
+    SYS_PATH = auto()
+    META_PATH = auto()
@@ -7,12 +7,348 @@ to a queue which is serviced by a single process.
 """
 
 import logging
+import os
+import threading
+import traceback
+from enum import Enum, auto
 from logging.handlers import QueueHandler, QueueListener
-from queue import Queue
-from typing import Collection
+from queue import Empty, Full, Queue
+from typing import Any, Collection, Dict, List, Optional
 
+from .constants import SERPENTARIUM
 
-def configure_child_process_logger(ipc_logger_queue: Queue, level: int = logging.NOTSET):
+DEFAULT_MAX_BATCH_SIZE = 100  # records
+DEFAULT_MAX_BATCH_BYTES = 64 * 1024  # bytes
+DEFAULT_FLUSH_INTERVAL = 0.1  # seconds
+DEFAULT_SAMPLE_RATE = 10
+
+_FLUSH_EXIT_PRIORITY = 100
+# The number of seconds to wait for room in the queue to report dropped records when a handler is
+# closed or the process exits
+_REPORT_TIMEOUT = 1.0
+# The number of times that DROP_OLDEST tries to make room in the queue before it drops the new item
+_DROP_OLDEST_ATTEMPTS = 3
+# The attribute of the records that report how many records were dropped, by process name
+_DROPPED_RECORDS = "serpentarium_dropped_records"
+
+
+class OverflowPolicy(Enum):
+    """
+    What a QueueHandler does with a log record when a bounded queue is full
+
+    BLOCK waits until there is room in the queue, so a plugin that logs faster than the host can
+    handle its log messages is slowed down to the host's pace. DROP_OLDEST discards the oldest item
+    in the queue to make room for the new one. DROP_BELOW_LEVEL drops records below a level and
+    waits for room for the rest. SAMPLE keeps one in every N records, which wait for room, and drops
+    the rest.
+
+    A queue is bounded if it was created with a `maxsize`, e.g. `multiprocessing.Queue(1000)`. The
+    policy has no effect on unbounded queues.
+    """
+
+    BLOCK = auto()
+    DROP_OLDEST = auto()
+    DROP_BELOW_LEVEL = auto()
+    SAMPLE = auto()
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    A QueueHandler that applies an OverflowPolicy when its queue is full
+
+    Dropped records are counted by process name. Once there is room in the queue again, a WARNING
+    record that reports the counts is put on the queue. When the handler is closed or the process
+    exits, the handler waits up to a second for room to report any remaining counts. A
+    BatchingQueueListener, such as the one returned by `configure_host_process_logger()`, adds the
+    counts to its `dropped_records`.
+    """
+
+    def __init__(
+        self,
+        queue: Queue,
+        overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+        drop_level: int = logging.WARNING,
+        sample_rate: int = DEFAULT_SAMPLE_RATE,
+    ):
+        """
+        :param queue: The queue to send log records to
+        :param overflow_policy: What to do with a log record when the queue is full, defaults to
+                                OverflowPolicy.BLOCK
+        :param drop_level: With OverflowPolicy.DROP_BELOW_LEVEL, the minimum level of records that
+                           are not dropped, defaults to logging.WARNING
+        :param sample_rate: With OverflowPolicy.SAMPLE, one in every `sample_rate` records is kept,
+                            defaults to 10
+        """
+        if sample_rate < 1:
+            raise ValueError("sample_rate must be at least 1")
+
+        super().__init__(queue)
+        self._overflow_policy = overflow_policy
+        self._drop_level = drop_level
+        self._sample_rate = sample_rate
+
+        self._overflow_count = 0
+        self._dropped_records: Dict[str, int] = {}
+
+        # multiprocessing.util imports subprocess, so it is only imported once a handler is created
+        import multiprocessing.util
+
+        # Child processes don't run `atexit` hooks, but they do run multiprocessing's finalizers.
+        # Records must be flushed before a multiprocessing.Queue's finalizer, which has an exit
+        # priority of 10, stops the thread that sends them.
+        multiprocessing.util.Finalize(self, self._flush_all, exitpriority=_FLUSH_EXIT_PRIORITY)
+
+    def enqueue(self, record: Any):
+        try:
+            self.queue.put_nowait(record)
+        except Full:
+            self._handle_overflow(record)
+
+        if self._dropped_records:
+            self._report_dropped_records()
+
+    def close(self):
+        self._flush_all()
+        super().close()
+
+    def _flush_all(self):
+        self.flush()
+
+        self.acquire()
+        try:
+            if self._dropped_records:
+                self._report_dropped_records(timeout=_REPORT_TIMEOUT)
+        finally:
+            self.release()
+
+    def _handle_overflow(self, item: Any):
+        if self._overflow_policy == OverflowPolicy.BLOCK:
+            self.queue.put(item)
+        elif self._overflow_policy == OverflowPolicy.DROP_OLDEST:
+            self._drop_oldest(item)
+        elif self._overflow_policy == OverflowPolicy.DROP_BELOW_LEVEL:
+            if _level(item) >= self._drop_level:
+                self.queue.put(item)
+            else:
+                self._count_dropped(item)
+        else:
+            self._overflow_count += 1
+            if self._overflow_count % self._sample_rate == 0:
+                self.queue.put(item)
+            else:
+                self._count_dropped(item)
+
+    def _drop_oldest(self, item: Any):
+        for _ in range(_DROP_OLDEST_ATTEMPTS):
+            try:
+                self._count_dropped(self.queue.get_nowait())
+            except Empty:
+                # The host may be reading from the queue
+                pass
+
+            try:
+                self.queue.put_nowait(item)
+                return
+            except Full:
+                pass
+
+        self._count_dropped(item)
+
+    def _count_dropped(self, item: Any):
+        for record in item if isinstance(item, list) else [item]:
+            # The oldest item may have been another process's report
+            dropped_records = getattr(record, _DROPPED_RECORDS, {record.processName: 1})
+            for process_name, count in dropped_records.items():
+                self._dropped_records[process_name] = (
+                    self._dropped_records.get(process_name, 0) + count
+                )
+
+    def _report_dropped_records(self, timeout: Optional[float] = None):
+        total = sum(self._dropped_records.values())
+        record = logging.LogRecord(
+            SERPENTARIUM,
+            logging.WARNING,
+            __file__,
+            0,
+            f"Dropped {total} log records because the logging queue was full",
+            None,
+            None,
+        )
+        setattr(record, _DROPPED_RECORDS, self._dropped_records)
+
+        try:
+            if timeout is None:
+                self.queue.put_nowait(record)
+            else:
+                self.queue.put(record, timeout=timeout)
+            self._dropped_records = {}
+        except Full:
+            pass
+
+
+class BatchingQueueHandler(BoundedQueueHandler):
+    """
+    A QueueHandler that sends log records to a queue in batches
+
+    Records are buffered and put on the queue as a single list, which is pickled and sent to the
+    host process at once, when the batch reaches `max_batch_size` records or roughly
+    `max_batch_bytes` bytes of messages, or `flush_interval` seconds after the first record was
+    buffered. A record at or above `flush_level` is sent immediately along with the rest of the
+    batch. Any remaining records are sent when the process exits.
+
+    The queue must be serviced by a BatchingQueueListener, such as the one returned by
+    `configure_host_process_logger()`.
+    """
+
+    def __init__(
+        self,
+        queue: Queue,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+        flush_level: int = logging.ERROR,
+        **kwargs,
+    ):
+        """
+        :param queue: The queue to send batches of log records to
+        :param max_batch_size: The maximum number of records in a batch, defaults to 100
+        :param max_batch_bytes: The number of bytes of formatted messages after which a batch is
+                                sent, defaults to 64 KiB
+        :param flush_interval: The maximum number of seconds that a record is buffered, defaults to
+                               0.1
+        :param flush_level: The minimum level of records that are sent immediately, defaults to
+                            logging.ERROR
+        :param **kwargs: Options for BoundedQueueHandler. If the queue is full, the overflow policy
+                         is applied to the whole batch, as if it was a record with the highest level
+                         in the batch.
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if flush_interval <= 0:
+            raise ValueError("flush_interval must be positive")
+
+        super().__init__(queue, **kwargs)
+        self._max_batch_size = max_batch_size
+        self._max_batch_bytes = max_batch_bytes
+        self._flush_interval = flush_interval
+        self._flush_level = flush_level
+
+        self._batch: List[logging.LogRecord] = []
+        self._batch_bytes = 0
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_pid: Optional[int] = None
+        self._closed = threading.Event()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            record = self.prepare(record)
+            self._batch.append(record)
+            self._batch_bytes += len(record.msg)
+
+            if (
+                len(self._batch) >= self._max_batch_size
+                or self._batch_bytes >= self._max_batch_bytes
+                or record.levelno >= self._flush_level
+            ):
+                self.flush()
+            else:
+                self._start_flusher()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        self.acquire()
+        try:
+            if not self._batch:
+                return
+
+            batch = self._batch
+            self._batch = []
+            self._batch_bytes = 0
+            self.enqueue(batch)  # type: ignore[arg-type]
+        finally:
+            self.release()
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+    def _start_flusher(self):
+        # A thread that was started before the process forked does not exist in the child
+        if self._flusher_pid == os.getpid():
+            return
+
+        self._flusher_pid = os.getpid()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="BatchingQueueHandler", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self._flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                # There is no record to pass to `handleError()`, so the error is reported the way
+                # that `handleError()` would report it, and the flusher keeps running
+                if logging.raiseExceptions:
+                    traceback.print_exc()
+
+
+class BatchingQueueListener(QueueListener):
+    """
+    A QueueListener that handles both individual log records and batches of log records
+
+    The listener also counts the records that BoundedQueueHandlers report that they dropped. See
+    BatchingQueueHandler and BoundedQueueHandler.
+    """
+
+    def __init__(self, queue: Queue, *handlers: logging.Handler, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self._dropped_records: Dict[str, int] = {}
+        self._dropped_records_lock = threading.Lock()
+
+    @property
+    def dropped_records(self) -> Dict[str, int]:
+        """
+        The number of log records that were dropped because the queue was full, by process name
+
+        MultiprocessingPlugins name their processes after their plugins. Records that are dropped
+        with OverflowPolicy.DROP_OLDEST are counted for the process that logged them.
+        """
+        with self._dropped_records_lock:
+            return dict(self._dropped_records)
+
+    def handle(self, record):
+        if isinstance(record, list):
+            for batched_record in record:
+                self._handle_record(batched_record)
+        else:
+            self._handle_record(record)
+
+    def _handle_record(self, record: logging.LogRecord):
+        dropped_records = getattr(record, _DROPPED_RECORDS, None)
+        if dropped_records is not None:
+            with self._dropped_records_lock:
+                for process_name, count in dropped_records.items():
+                    self._dropped_records[process_name] = (
+                        self._dropped_records.get(process_name, 0) + count
+                    )
+
+        super().handle(record)
+
+
+def configure_child_process_logger(
+    ipc_logger_queue: Queue,
+    level: int = logging.NOTSET,
+    *,
+    max_batch_size: int = 1,
+    max_batch_bytes: int = DEFAULT_MAX_BATCH_BYTES,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+    drop_level: int = logging.WARNING,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+):
     """
     Configures a child process to send all log messages to a queue
 
@@ -25,24 +361,70 @@ def configure_child_process_logger(ipc_logger_queue: Queue, level: int = logging
                              process
     :param level: The minimum log level of statements to push to the queue; messages below this log
                   level will be dropped, defaults to logging.NOTSET
+    :param max_batch_size: If greater than 1, log messages are sent in batches of up to this many
+                           records by a BatchingQueueHandler. Errors are always sent immediately.
+                           Defaults to 1 (no batching).
+    :param max_batch_bytes: The number of bytes of formatted messages after which a batch is sent,
+                            defaults to 64 KiB
+    :param flush_interval: The maximum number of seconds that a log message is buffered before it
+                           is sent, defaults to 0.1
+    :param overflow_policy: What to do with a log message when `ipc_logger_queue` is bounded and
+                            full, defaults to OverflowPolicy.BLOCK
+    :param drop_level: With OverflowPolicy.DROP_BELOW_LEVEL, the minimum level of log messages that
+                       are not dropped, defaults to logging.WARNING
+    :param sample_rate: With OverflowPolicy.SAMPLE, one in every `sample_rate` log messages is
+                        kept, defaults to 10
     """
+    handler: QueueHandler
+    if max_batch_size > 1:
+        handler = BatchingQueueHandler(
+            ipc_logger_queue,
+            max_batch_size=max_batch_size,
+            max_batch_bytes=max_batch_bytes,
+            flush_interval=flush_interval,
+            overflow_policy=overflow_policy,
+            drop_level=drop_level,
+            sample_rate=sample_rate,
+        )
+    else:
+        handler = BoundedQueueHandler(
+            ipc_logger_queue,
+            overflow_policy=overflow_policy,
+            drop_level=drop_level,
+            sample_rate=sample_rate,
+        )
+
     root = logging.getLogger()
-    root.addHandler(QueueHandler(ipc_logger_queue))
+    root.addHandler(handler)
     root.setLevel(level)
 
 
 def configure_host_process_logger(
     ipc_logger_queue: Queue,
     handlers: Collection[logging.Handler] = [],
-) -> QueueListener:
+    *,
+    direct_host_logging: bool = False,
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK,
+    drop_level: int = logging.WARNING,
+    sample_rate: int = DEFAULT_SAMPLE_RATE,
+) -> BatchingQueueListener:
     """
     Configures the root logger to use a QueueListener
 
     A QueueListener can be used to process the log messages from a child process. This function
-    configures a QueueListener to use the provided `ipc_logger_queue` and handlers. It configures
+    configures a BatchingQueueListener, which also accepts batches of log messages sent by a
+    BatchingQueueHandler, to use the provided `ipc_logger_queue` and handlers. It configures
     the root logger to push log messages from the host process into the `ipc_logger_queue`. Finally,
     it returns the QueueListener.
 
+    If `direct_host_logging` is True, the handlers are added to the root logger instead, so log
+    messages from the host process are handled immediately by the thread that logs them, and only
+    log messages from child processes travel through the queue. The handlers must then be safe to
+    call from multiple threads at once, which is the case for the handlers in the standard library.
+
+    In either case, log messages from the host process are only formatted if at least one of the
+    handlers accepts their level.
+
     Note that you will need to call `QueueListener.start()`, otherwise the log messages will not be
     processed. See https://docs.python.org/3/library/logging.handlers.html#queuelistener for more
     information about QueueListener
@@ -50,10 +432,46 @@ def configure_host_process_logger(
     :param ipc_logger_queue: A Queue shared by the host and child process that stores log messages
     :param handlers: A Collection of LogHandler objects that the QueueListener will use to handle
                      log messages it pulls off of the ipc_logger_queue
+    :param direct_host_logging: Whether to handle the host process's log messages without
+                                sending them through `ipc_logger_queue`, defaults to False
+    :param overflow_policy: What to do with a host log message when `ipc_logger_queue` is bounded
+                            and full, defaults to OverflowPolicy.BLOCK
+    :param drop_level: With OverflowPolicy.DROP_BELOW_LEVEL, the minimum level of log messages that
+                       are not dropped, defaults to logging.WARNING
+    :param sample_rate: With OverflowPolicy.SAMPLE, one in every `sample_rate` log messages is
+                        kept, defaults to 10
 
     :return: An unstarted QueueListener object
     """
     root = logging.getLogger()
-    root.addHandler(logging.handlers.QueueHandler(ipc_logger_queue))
+    if direct_host_logging:
+        for handler in handlers:
+            root.addHandler(handler)
+    else:
+        queue_handler = BoundedQueueHandler(
+            ipc_logger_queue,
+            overflow_policy=overflow_policy,
+            drop_level=drop_level,
+            sample_rate=sample_rate,
+        )
+        # QueueHandler formats every record that it accepts, even if the listener's handlers will
+        # discard it
+        queue_handler.setLevel(_min_level(handlers))
+        root.addHandler(queue_handler)
+
+    return BatchingQueueListener(ipc_logger_queue, *handlers, respect_handler_level=True)
+
+
+def _level(item: Any) -> int:
+    if isinstance(item, list):
+        return max(record.levelno for record in item)
+
+    return item.levelno
+
+
+def _min_level(handlers: Collection[logging.Handler]) -> int:
+    if not handlers:
+        # Nothing will handle the records
+        return logging.CRITICAL + 1
 
-    return QueueListener(ipc_logger_queue, *handlers, respect_handler_level=True)
+    return min(handler.level for handler in handlers)
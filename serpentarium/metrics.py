@@ -0,0 +1,229 @@
+"""
+Runtime metrics for plugins
+
+PluginWrapper and MultiprocessingPlugin record how long each stage of running a plugin takes to a
+MetricsRecorder, if one is provided. Metrics that are measured in a plugin's process are sent to
+the host along with the plugin's return value and recorded there, so a recorder only ever runs in
+the host process and doesn't need to be picklable.
+
+InMemoryMetricsRecorder aggregates the metrics into a histogram per plugin and metric, and calls
+any hooks that it was given with every value, e.g. to push them into a telemetry system.
+"""
+
+import logging
+import math
+import threading
+from enum import Enum, auto
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from typing_extensions import Protocol
+
+from .constants import SERPENTARIUM
+
+logger = logging.getLogger(SERPENTARIUM)
+
+MetricsHook = Callable[[str, "Metric", float], None]
+MetricValue = Tuple[str, "Metric", float]
+
+
+class Metric(Enum):
+    """
+    A measurement of one stage of running a plugin
+
+    Durations are measured in seconds and sizes in bytes.
+
+    SPAWN_LATENCY is the time from when a MultiprocessingPlugin is started until its process begins
+    to run the plugin. IMPORT_TIME is the time that a PluginWrapper takes to import and construct
+    its plugin in isolation. RUN_TIME is the time that the plugin's `run()` method takes, without
+    the time that a PluginWrapper takes to import the plugin. RESULT_SIZE and SERIALIZATION_TIME are
+    the size of the serialized return value and the time it takes the plugin's process to send it,
+    as reported by the Transport. JOIN_WAIT is the total time that the host spends waiting in
+    `join()` or `join_async()`. PEAK_RSS and CPU_TIME are the peak resident set size and the user
+    and system CPU time of the plugin's process, on platforms that support resource accounting.
+    """
+
+    SPAWN_LATENCY = auto()
+    IMPORT_TIME = auto()
+    RUN_TIME = auto()
+    RESULT_SIZE = auto()
+    SERIALIZATION_TIME = auto()
+    JOIN_WAIT = auto()
+    PEAK_RSS = auto()
+    CPU_TIME = auto()
+
+
+class MetricsRecorder(Protocol):
+    """
+    A protocol for recording plugins' runtime metrics
+
+    `record()` may be called from multiple threads at once.
+    """
+
+    def record(self, plugin_name: str, metric: Metric, value: float):
+        """
+        Record a value
+
+        :param plugin_name: The name of the plugin that the value was measured for
+        :param metric: The Metric that was measured
+        :param value: The measured value
+        """
+
+
+class Histogram:
+    """
+    A histogram with exponentially growing buckets
+
+    Each bucket holds the values in `(2 ** (i - 1), 2 ** i]` for some integer `i`, so the histogram
+    can hold durations of microseconds and sizes of gigabytes alike with a relative error of at most
+    a factor of two. Zero and negative values are counted in a single bucket.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        # The upper bound of each non-empty bucket, mapped to the number of values in it
+        self.buckets: Dict[float, int] = {}
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else math.nan
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+        upper_bound = _bucket_upper_bound(value)
+        self.buckets[upper_bound] = self.buckets.get(upper_bound, 0) + 1
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimate a percentile of the recorded values
+
+        :param percent: The percentile, between 0 and 100
+        :return: The upper bound of the bucket that contains the percentile, clamped to the
+                 recorded minimum and maximum, or NaN if no values were recorded
+        """
+        if not 0 <= percent <= 100:
+            raise ValueError("percent must be between 0 and 100")
+        if self.count == 0:
+            return math.nan
+
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for upper_bound in sorted(self.buckets):
+            seen += self.buckets[upper_bound]
+            if seen >= rank:
+                return min(max(upper_bound, self.min), self.max)
+
+        return self.max
+
+    def copy(self) -> "Histogram":
+        histogram = Histogram()
+        histogram.count = self.count
+        histogram.total = self.total
+        histogram.min = self.min
+        histogram.max = self.max
+        histogram.buckets = dict(self.buckets)
+
+        return histogram
+
+
+class InMemoryMetricsRecorder(MetricsRecorder):
+    """
+    A MetricsRecorder that keeps a Histogram of each metric for each plugin
+    """
+
+    def __init__(self, hooks: Iterable[MetricsHook] = ()):
+        """
+        :param hooks: Callables that are called with the plugin's name, the Metric, and the value
+                      every time a value is recorded. Exceptions that they raise are logged.
+        """
+        self._hooks = list(hooks)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Metric, Histogram]] = {}
+
+    def record(self, plugin_name: str, metric: Metric, value: float):
+        with self._lock:
+            plugin_histograms = self._histograms.setdefault(plugin_name, {})
+            plugin_histograms.setdefault(metric, Histogram()).record(value)
+
+        for hook in self._hooks:
+            try:
+                hook(plugin_name, metric, value)
+            except Exception:
+                logger.exception(f"A metrics hook failed to record {metric.name} for {plugin_name}")
+
+    @property
+    def plugin_names(self) -> List[str]:
+        """The names of the plugins that metrics were recorded for"""
+        with self._lock:
+            return list(self._histograms)
+
+    def histograms(self, plugin_name: str) -> Dict[Metric, Histogram]:
+        """
+        Get copies of the histograms of a plugin's metrics
+
+        :param plugin_name: The name of the plugin
+        :return: A Histogram for each Metric that was recorded for the plugin
+        """
+        with self._lock:
+            return {
+                metric: histogram.copy()
+                for metric, histogram in self._histograms.get(plugin_name, {}).items()
+            }
+
+    def reset(self):
+        """
+        Discard all recorded metrics
+        """
+        with self._lock:
+            self._histograms.clear()
+
+
+class _ChildProcessRecorder(MetricsRecorder):
+    """Buffers the metrics recorded in a plugin's process until they are sent to the host"""
+
+    def record(self, plugin_name: str, metric: Metric, value: float):
+        _child_process_metrics.append((plugin_name, metric, value))
+
+
+_child_process_metrics: List[MetricValue] = []
+
+
+def child_process_recorder(recorder: Optional[MetricsRecorder]) -> Optional[MetricsRecorder]:
+    """
+    Get the MetricsRecorder that replaces a recorder when a plugin is sent to a child process
+
+    :param recorder: The host's MetricsRecorder, or None
+    :return: None if `recorder` is None, otherwise a recorder that buffers metrics in the child
+             process until `drain_child_process_metrics()` is called
+    """
+    return None if recorder is None else _ChildProcessRecorder()
+
+
+def drain_child_process_metrics() -> List[MetricValue]:
+    """
+    Remove and return the metrics that were recorded in this process by a child process recorder
+
+    :return: A list of (plugin name, Metric, value) tuples
+    """
+    metrics = list(_child_process_metrics)
+    _child_process_metrics.clear()
+
+    return metrics
+
+
+def _bucket_upper_bound(value: float) -> float:
+    if value <= 0:
+        return 0.0
+
+    mantissa, exponent = math.frexp(value)
+    # frexp() returns a mantissa in [0.5, 1), so powers of two belong to the bucket below
+    if mantissa == 0.5:
+        exponent -= 1
+
+    return math.ldexp(1.0, exponent)
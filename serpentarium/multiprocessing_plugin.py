@@ -1,13 +1,58 @@
 import logging
 import multiprocessing
-from threading import current_thread
-from typing import Any, Optional, Union
+import time
+import weakref
+from threading import RLock, current_thread
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
-from . import NamedPluginMixin, PluginThreadName, SingleUsePlugin
+from . import NamedPluginMixin, PluginThreadName, SingleUsePlugin, concurrency
+from .cancellation import DEFAULT_GRACE_PERIOD, DEFAULT_TERMINATE_TIMEOUT, CancellationOutcome
 from .constants import SERPENTARIUM
+from .cpu_affinity import (
+    CPUAffinity,
+    CPUPlacementPolicy,
+    get_cpu_allocator,
+    set_cpu_affinity,
+    validate_cpu_affinity,
+)
+from .metrics import (
+    Metric,
+    MetricsRecorder,
+    MetricValue,
+    child_process_recorder,
+    drain_child_process_metrics,
+)
 from .nop import NOP
+from .plugin_thread_name import set_main_thread_name
+from .plugin_wrapper import PluginWrapper
+from .process_start_method import ProcessStartMethod, get_multiprocessing_context
+from .resource_limits import (
+    ResourceLimits,
+    ResourceUsage,
+    apply_resource_limits,
+    get_resource_usage,
+)
+from .transport import PickleTransport, Transport
 from .types import ConfigureLoggerCallback as ConfigureLoggerCallback
 
+if TYPE_CHECKING:
+    import asyncio
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
 logger = logging.getLogger(SERPENTARIUM)
 
 
@@ -23,6 +68,13 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         main_thread_name: Union[PluginThreadName, str] = PluginThreadName.DEFAULT,
         daemon: bool = False,
         configure_child_process_logger: ConfigureLoggerCallback = NOP,
+        start_method: ProcessStartMethod = ProcessStartMethod.SPAWN,
+        transport: Optional[Transport] = None,
+        metrics_recorder: Optional[MetricsRecorder] = None,
+        resource_limits: Optional[ResourceLimits] = None,
+        cpu_affinity: Optional[CPUAffinity] = None,
+        cancellable: bool = False,
+        cancel_grace_period: Optional[float] = None,
         **kwargs,
     ):
         """
@@ -42,6 +94,34 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         :param daemon: Whether or not the process should be a daemon process
         :param configure_child_process_logger: A callable that will be run on the child process to
                                                confirgure concurrent logging
+        :param start_method: The method used to start the child process, defaults to
+                             `ProcessStartMethod.SPAWN`
+        :param transport: The Transport used to send the plugin's return value (or streamed items)
+                          from the child process to the host. Defaults to a `PickleTransport`.
+        :param metrics_recorder: A MetricsRecorder that records how long each stage of running the
+                                 plugin takes. Metrics that are measured in the child process,
+                                 including those of a wrapped PluginWrapper, are sent to the host
+                                 with the return value. Metrics are not recorded for the child
+                                 process of `stream()`. Defaults to `None`.
+        :param resource_limits: ResourceLimits that are applied to the child process before the
+                                plugin runs, or `None` to leave the child process's limits as they
+                                are. Resource limits are only supported on POSIX platforms.
+                                Defaults to `None`.
+        :param cpu_affinity: The CPUs that the child process is pinned to before the plugin runs.
+                             This can either be an iterable of CPU numbers or a
+                             `CPUPlacementPolicy`, which chooses a single CPU each time the plugin
+                             is started. If it is `None`, the child process may run on any CPU that
+                             the host may run on. CPU affinity is only supported on platforms that
+                             provide `os.sched_setaffinity()`, such as Linux. Defaults to `None`.
+        :param cancellable: Whether the plugin's `run()` method accepts a `cancel_event` keyword
+                            argument. If True, the plugin is passed an Event that is set when the
+                            plugin is cancelled, and it should return promptly once the Event is
+                            set. Defaults to `False`.
+        :param cancel_grace_period: If not `None`, `run()` and `run_async()` cancel the plugin when
+                                    their timeout expires, and wait up to this many seconds for a
+                                    cancellable plugin to stop before terminating its process. If
+                                    `None`, the plugin is left running when the timeout expires.
+                                    Defaults to `None`.
         """
         super().__init__(plugin_name=plugin.name)
         self._plugin = plugin
@@ -49,19 +129,52 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         self._daemon = daemon
         self._configure_child_process_logger = configure_child_process_logger
 
-        self._multiprocessing_context = multiprocessing.get_context("spawn")
+        self._multiprocessing_context = get_multiprocessing_context(start_method)
+        self._transport = PickleTransport() if transport is None else transport
         self._receiver, self._sender = multiprocessing.Pipe(duplex=False)
+        self._metrics_recorder = metrics_recorder
+        self._resource_limits = resource_limits
+        self._cpu_affinity = None if cpu_affinity is None else validate_cpu_affinity(cpu_affinity)
+        self._cpus: Optional[FrozenSet[int]] = None
+        # Releases the CPU that was allocated by a CPUPlacementPolicy
+        self._cpu_release: Optional[weakref.finalize] = None
+        self._cancel_grace_period = cancel_grace_period
+        # Creating an Event is relatively slow and starts the resource tracker, so it is only
+        # created for plugins that can receive it
+        self._cancel_event: Optional[concurrency.Event] = (
+            self._multiprocessing_context.Event() if cancellable else None
+        )
 
-        self._proc = None
-        self._calling_thread_name = None
+        self._proc: Optional["BaseProcess"] = None
+        self._calling_thread_name: Optional[str] = None
         self._return_value = None
+        self._return_value_received = False
+        self._stream_finished = False
+        # Held while the return value is read, which `join_async()` does in an executor thread
+        self._receive_lock = RLock()
+        self._resource_usage: Optional[ResourceUsage] = None
+
+        self._start_time: Optional[float] = None
+        self._join_wait = 0.0
+        self._join_wait_recorded = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The host's recorder may not be picklable. Metrics that are recorded in the child process
+        # are sent back with the return value instead.
+        state = self.__dict__.copy()
+        state["_metrics_recorder"] = child_process_recorder(self._metrics_recorder)
+        # The child process never receives a return value or releases a CPU
+        state["_receive_lock"] = None
+        state["_cpu_release"] = None
+
+        return state
 
     def run(self, *, timeout: Optional[float] = None, **kwargs) -> Any:
         """
         Run a plugin with the provided keyword arguments and returns the result
 
         When the timeout argument is not present or None, the operation will block until the
-        plugin stops.
+        plugin stops. See `join()` for how the timeout applies to a large return value.
 
         :param: A floating-point number of seconds to wait for the plugin to run
 
@@ -70,34 +183,210 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         self.start(**kwargs)
         self.join(timeout)
 
+        if self._cancel_grace_period is not None and self.is_alive():
+            logger.warning(f"{self.name} did not finish within {timeout} seconds")
+            self.cancel(self._cancel_grace_period)
+
         return self.return_value
 
+    async def run_async(self, *, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a plugin with the provided keyword arguments and return the result without blocking the
+        event loop
+
+        This coroutine behaves like `run()`, but waits for the plugin by watching the child
+        process's sentinel and the result Pipe through the running event loop instead of blocking a
+        thread. It requires an event loop that supports `add_reader()`, such as the default event
+        loop on POSIX platforms.
+
+        :param: A floating-point number of seconds to wait for the plugin to run
+
+        :return: The data that the plugin returned
+        """
+        self.start(**kwargs)
+        await self.join_async(timeout)
+
+        if self._cancel_grace_period is not None and self.is_alive():
+            logger.warning(f"{self.name} did not finish within {timeout} seconds")
+            await self.cancel_async(self._cancel_grace_period)
+
+        return self.return_value
+
+    def stream(self, *, max_buffered_items: int = 16, **kwargs) -> Iterator[Any]:
+        """
+        Run a plugin whose `run()` method returns an iterable, and yield the items as they arrive
+
+        Each item is sent to the host as soon as the plugin produces it, so neither process needs to
+        hold the entire result in memory. The plugin is paused when `max_buffered_items` items have
+        been sent but not yet consumed by the caller.
+
+        The plugin's process is started when iteration begins. If the plugin raises an exception,
+        the exception is re-raised in the calling process after the items that were produced before
+        it. If the caller stops iterating before the stream ends, the plugin's process is
+        terminated.
+
+        :param max_buffered_items: The maximum number of items that the plugin may produce ahead of
+                                   the caller, defaults to 16
+        :return: An iterator over the items that the plugin produces
+        :raises RuntimeError: If the plugin's process exited before the stream ended
+        """
+        if max_buffered_items < 1:
+            raise ValueError("max_buffered_items must be at least 1")
+
+        credits = self._multiprocessing_context.BoundedSemaphore(max_buffered_items)
+        self._stream_finished = False
+        self._start_process(target=self._stream, args=(credits,), kwargs=kwargs)
+
+        try:
+            yield from self._receive_stream(credits)
+        finally:
+            if not self._stream_finished and self.is_alive():
+                logger.warning(f"Terminating {self.name}, since its stream was abandoned")
+                self._started_process().terminate()
+
+            # Streamed items are not a return value, so there's nothing left to retrieve
+            self._return_value_received = True
+            self.join()
+
+    def _receive_stream(self, credits: concurrency.Semaphore) -> Iterator[Any]:
+        while True:
+            ready = _wait([self._receiver, self._started_process().sentinel])
+            if self._receiver not in ready and not self._receiver.poll():
+                self._stream_finished = True
+                raise RuntimeError(
+                    f"The process for {self.name} exited before it finished streaming"
+                )
+
+            item = self._transport.recv(self._receiver)
+            if isinstance(item, _EndOfStream):
+                self._stream_finished = True
+                return
+
+            if isinstance(item, _StreamError):
+                self._stream_finished = True
+                raise item.exception
+
+            credits.release()
+            yield item
+
     def start(self, **kwargs):
         """
         Launch a new process that runs this plugin
         """
+        self._start_process(target=self._run, kwargs=kwargs)
+
+    def _start_process(
+        self, target: Callable[..., None], args: Tuple = (), kwargs: Optional[Dict[str, Any]] = None
+    ):
         self._calling_thread_name = current_thread().name
+        # The monotonic clock is system-wide on every supported platform, so the child process can
+        # compare its own time to this one
+        self._start_time = time.monotonic()
+        self._place()
 
-        self._proc = self._multiprocessing_context.Process(
-            name=self.name, daemon=self._daemon, target=self._run, kwargs=kwargs
+        proc = self._multiprocessing_context.Process(
+            name=self.name, daemon=self._daemon, target=target, args=args, kwargs=kwargs or {}
         )
-        self._proc.start()
+        self._proc = proc
+        try:
+            proc.start()
+        except BaseException:
+            self._release_cpu()
+            raise
+
+    def _place(self):
+        if isinstance(self._cpu_affinity, CPUPlacementPolicy):
+            cpu_allocator = get_cpu_allocator()
+            cpu = cpu_allocator.allocate(self._cpu_affinity)
+            self._cpus = frozenset([cpu])
+            # The CPU is released once the process is found to have exited, or if the plugin is
+            # garbage collected before that
+            self._cpu_release = weakref.finalize(self, cpu_allocator.release, cpu)
+        else:
+            self._cpus = self._cpu_affinity
+
+    def _release_cpu(self):
+        if self._cpu_release is not None:
+            self._cpu_release()
+            self._cpu_release = None
 
     def _run(self, **kwargs):
+        spawn_latency = time.monotonic() - self._start_time
         self._set_main_thread_name()
         self._configure_child_process_logger()
+        self._apply_cpu_affinity()
+        self._apply_resource_limits()
+
+        run_start = time.perf_counter()
+        return_value = self._plugin.run(**self._plugin_kwargs(kwargs))
+        run_time = time.perf_counter() - run_start
 
-        return_value = self._plugin.run(**kwargs)
-        self._sender.send(return_value)
+        send_start = time.perf_counter()
+        result_size = self._transport.send(self._sender, return_value)
+        serialization_time = time.perf_counter() - send_start
+
+        if self._metrics_recorder is not None:
+            self._record(Metric.SPAWN_LATENCY, spawn_latency)
+            if not self._plugin_records_run_time():
+                self._record(Metric.RUN_TIME, run_time)
+            self._record(Metric.SERIALIZATION_TIME, serialization_time)
+            if result_size is not None:
+                self._record(Metric.RESULT_SIZE, result_size)
+
+        self._sender.send(
+            _ChildProcessReport(
+                metrics=drain_child_process_metrics(), resource_usage=get_resource_usage()
+            )
+        )
+
+    def _stream(self, credits: concurrency.Semaphore, **kwargs):
+        self._set_main_thread_name()
+        self._configure_child_process_logger()
+        self._apply_cpu_affinity()
+        self._apply_resource_limits()
+
+        try:
+            for item in self._plugin.run(**self._plugin_kwargs(kwargs)):
+                credits.acquire()
+                self._transport.send(self._sender, item)
+        except Exception as err:
+            logger.exception(f"{self.name} raised an exception")
+            self._send_stream_error(err)
+            return
+
+        self._transport.send(self._sender, _EndOfStream())
+
+    def _send_stream_error(self, err: Exception):
+        try:
+            self._transport.send(self._sender, _StreamError(err))
+        except Exception as send_err:
+            # The exception could not be pickled
+            error = RuntimeError(f"{self.name} failed to send its exception: {send_err}")
+            self._transport.send(self._sender, _StreamError(error))
+
+    def _plugin_records_run_time(self) -> bool:
+        # A PluginWrapper records the run time itself, without the time it takes to import the
+        # plugin
+        return isinstance(self._plugin, PluginWrapper) and self._plugin.metrics_recorder is not None
+
+    def _plugin_kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self._cancel_event is not None:
+            return {**kwargs, "cancel_event": self._cancel_event}
+
+        return kwargs
 
     def _set_main_thread_name(self):
-        if self._main_thread_name == PluginThreadName.DEFAULT:
-            # Do nothing, since the process's main thread will be the interpreter's default
-            pass
-        elif self._main_thread_name == PluginThreadName.CALLING_THREAD:
-            current_thread().name = self._calling_thread_name
-        else:
-            current_thread().name = self._main_thread_name
+        set_main_thread_name(self._main_thread_name, self._calling_thread_name)
+
+    def _apply_cpu_affinity(self):
+        if self._cpus is not None:
+            set_cpu_affinity(self._cpus)
+
+    def _apply_resource_limits(self):
+        # Limits are applied before the plugin runs, so that a wrapped PluginWrapper's imports are
+        # limited as well
+        if self._resource_limits is not None:
+            apply_resource_limits(self._resource_limits)
 
     def join(self, timeout: Optional[float] = None):
         """
@@ -106,18 +395,232 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         When the timeout argument is not present or None, the operation will block until the
         plugin stops.
 
+        The timeout only covers waiting for the plugin to send its return value or exit. Once the
+        plugin starts to send its return value, the whole value is received before this method
+        returns, which may take longer than the timeout if the value is large. Use `join_async()`,
+        which receives the value in a separate thread, if the timeout must be strict.
+
         :param: A floating-point number of seconds to wait for the plugin to run
         """
         if self._proc is None:
             raise AssertionError("can only join a started plugin")
 
-        self._proc.join(timeout)
+        start = time.monotonic()
+        exited = self._join(timeout)
+        self._join_wait += time.monotonic() - start
+
+        if exited:
+            self._release_cpu()
+
+        if exited and not self._join_wait_recorded:
+            self._join_wait_recorded = True
+            self._record(Metric.JOIN_WAIT, self._join_wait)
+
+    def _join(self, timeout: Optional[float]) -> bool:
+        """
+        :return: True if the process exited, False if the timeout expired first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        # The return value must be read while the process is running. Otherwise, a child that sends
+        # a value larger than the pipe's buffer will block until the timeout expires.
+        if not self._drain_return_value(deadline):
+            return False
+
+        proc = self._started_process()
+        proc.join(_remaining(deadline))
         if self.is_alive():
-            return
+            return False
 
-        logger.debug(f"{self.name} exited with code {self._proc.exitcode}")
+        logger.debug(f"{self.name} exited with code {proc.exitcode}")
 
         self._retrieve_return_value()
+        return True
+
+    def _drain_return_value(self, deadline: Optional[float]) -> bool:
+        """
+        Wait for the return value or for the process to exit, whichever happens first
+
+        The deadline is not checked while the return value is received, since a partially received
+        value can't be resumed by a later call.
+
+        :return: False if the deadline expired first, True otherwise
+        """
+        if not self._return_value_pending():
+            return True
+
+        ready = _wait([self._receiver, self._started_process().sentinel], _remaining(deadline))
+        if not ready:
+            return False
+
+        if self._receiver in ready or self._receiver.poll():
+            self._receive_return_value()
+
+        return True
+
+    async def join_async(self, timeout: Optional[float] = None):
+        """
+        Wait for this plugin and its process to exit without blocking the event loop
+
+        When the timeout argument is not present or None, the coroutine will wait until the plugin
+        stops.
+
+        :param: A floating-point number of seconds to wait for the plugin to run
+        """
+        if self._proc is None:
+            raise AssertionError("can only join a started plugin")
+
+        # asyncio is imported lazily since it noticeably increases the startup time of every child
+        # process, which imports this module.
+        import asyncio
+
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._wait_for_exit(), timeout)
+        except asyncio.TimeoutError:
+            return
+        finally:
+            self._join_wait += time.monotonic() - start
+
+        # The sentinel becomes ready as the process exits, so this will not block for long
+        self.join()
+
+    async def _wait_for_exit(self):
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        sentinel = self._proc.sentinel
+
+        if self._return_value_pending():
+            # The return value must be read while the process is running. Otherwise, a child that
+            # sends a value larger than the pipe's buffer will block forever and never exit.
+            ready = await _wait_readable(loop, [self._receiver.fileno(), sentinel])
+            if ready != sentinel or self._receiver.poll():
+                # Reading a large return value takes a while, so it is read in a thread to keep the
+                # event loop responsive
+                await loop.run_in_executor(None, self._receive_return_value)
+
+        await _wait_readable(loop, [sentinel])
+
+    def cancel(
+        self,
+        grace_period: float = DEFAULT_GRACE_PERIOD,
+        terminate_timeout: float = DEFAULT_TERMINATE_TIMEOUT,
+    ) -> CancellationOutcome:
+        """
+        Stop the plugin, escalating until its process exits
+
+        If the plugin is cancellable, its cancel event is set first, and if the plugin's process
+        does not exit within the grace period, it is terminated. A plugin that is not cancellable is
+        terminated right away. If the process does not exit within `terminate_timeout` of being
+        terminated, it is killed. The process is always joined before this
+        method returns, and each step is logged. Any return value that the plugin sent before it
+        stopped is retrieved.
+
+        :param grace_period: A floating-point number of seconds to wait for a cancellable plugin to
+                             stop after its cancel event is set, defaults to 5 seconds
+        :param terminate_timeout: A floating-point number of seconds to wait for the process to exit
+                                  after it is terminated, defaults to 5 seconds
+        :return: A CancellationOutcome that describes how the plugin stopped
+        """
+        if self._proc is None:
+            raise AssertionError("can only cancel a started plugin")
+
+        for outcome, timeout in self._cancellation_steps(grace_period, terminate_timeout):
+            self.join(timeout)
+            if not self.is_alive():
+                break
+
+        return self._cancelled(outcome)
+
+    async def cancel_async(
+        self,
+        grace_period: float = DEFAULT_GRACE_PERIOD,
+        terminate_timeout: float = DEFAULT_TERMINATE_TIMEOUT,
+    ) -> CancellationOutcome:
+        """
+        Stop the plugin like `cancel()`, without blocking the event loop
+
+        :param grace_period: A floating-point number of seconds to wait for the plugin to stop after
+                             its cancel event is set, defaults to 5 seconds
+        :param terminate_timeout: A floating-point number of seconds to wait for the process to exit
+                                  after it is terminated, defaults to 5 seconds
+        :return: A CancellationOutcome that describes how the plugin stopped
+        """
+        if self._proc is None:
+            raise AssertionError("can only cancel a started plugin")
+
+        for outcome, timeout in self._cancellation_steps(grace_period, terminate_timeout):
+            await self.join_async(timeout)
+            if not self.is_alive():
+                break
+
+        return self._cancelled(outcome)
+
+    def _cancellation_steps(
+        self, grace_period: float, terminate_timeout: float
+    ) -> Iterator[Tuple[CancellationOutcome, Optional[float]]]:
+        """
+        Escalate the cancellation one step at a time
+
+        :return: An iterator over the outcome of each step, if the process exits within the
+                 accompanying timeout
+        """
+        if not self.is_alive():
+            yield CancellationOutcome.NOT_RUNNING, 0
+            return
+
+        logger.info(f"Cancelling {self.name}")
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            yield CancellationOutcome.STOPPED, grace_period
+
+            logger.warning(
+                f"{self.name} did not stop within {grace_period} seconds of being cancelled, "
+                "terminating it"
+            )
+        else:
+            # The plugin can't be asked to stop, so waiting for it to do so would only delay
+            # terminating it
+            logger.warning(f"{self.name} is not cancellable, terminating it")
+
+        self._started_process().terminate()
+        yield CancellationOutcome.TERMINATED, terminate_timeout
+
+        logger.error(
+            f"{self.name} did not exit within {terminate_timeout} seconds of being terminated, "
+            "killing it"
+        )
+        self._started_process().kill()
+        yield CancellationOutcome.KILLED, None
+
+    def _cancelled(self, outcome: CancellationOutcome) -> CancellationOutcome:
+        logger.info(f"{self.name} was cancelled: {outcome.name}")
+        return outcome
+
+    def wait_handles(self) -> List[Union["Connection", int]]:
+        """
+        Return the objects that become ready when this plugin makes progress
+
+        The returned objects can be passed to `multiprocessing.connection.wait()` in order to wait
+        on many plugins at once. When any of them is ready, call `join(0)` to collect the plugin's
+        return value without blocking.
+
+        :return: The objects that become ready when the plugin returns a value or its process exits
+        """
+        if self._proc is None:
+            raise AssertionError("can only wait on a started plugin")
+
+        if self._return_value_pending():
+            return [self._receiver, self._proc.sentinel]
+
+        return [self._proc.sentinel]
+
+    def _started_process(self) -> "BaseProcess":
+        if self._proc is None:
+            raise AssertionError(f"{self.name} has not been started")
+
+        return self._proc
 
     def is_alive(self) -> bool:
         """
@@ -128,22 +631,67 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         if self._proc is None:
             return False
 
-        return self._proc.is_alive()
+        if self._proc.is_alive():
+            return True
+
+        # The process has been reaped, so its CPU is released even if the plugin is never joined
+        self._release_cpu()
+        return False
 
     def _retrieve_return_value(self):
+        with self._receive_lock:
+            try:
+                if self._return_value_received:
+                    pass
+                elif self._receiver.poll():
+                    self._receive_return_value()
+                else:
+                    logger.error(f"{self.name} did not return a value")
+            finally:
+                logger.debug(f"Closing Pipe to {self.name}")
+                self._receiver.close()
+                logger.debug(f"Pipe to {self.name} closed")
+
+    def _return_value_pending(self) -> bool:
+        return not (self._return_value_received or self._receiver.closed)
+
+    def _receive_return_value(self):
+        with self._receive_lock:
+            # The value may have been received by another thread while this one waited for the lock
+            if not self._return_value_received:
+                self._receive_return_value_and_report()
+
+    def _receive_return_value_and_report(self):
+        self._return_value = self._read_return_value()
+        self._return_value_received = True
+
+        report = self._read_child_process_report()
+        if report is None:
+            return
+
+        if self._metrics_recorder is not None:
+            for plugin_name, metric, value in report.metrics:
+                self._metrics_recorder.record(plugin_name, metric, value)
+
+        self._resource_usage = report.resource_usage
+        if self._resource_usage is not None:
+            self._record(Metric.PEAK_RSS, self._resource_usage.peak_rss)
+            self._record(Metric.CPU_TIME, self._resource_usage.cpu_time)
+
+    def _read_child_process_report(self) -> Optional["_ChildProcessReport"]:
         try:
-            if self._receiver.poll():
-                self._return_value = self._read_return_value()
-            else:
-                logger.error(f"{self.name} did not return a value")
-        finally:
-            logger.debug(f"Closing Pipe to {self.name}")
-            self._receiver.close()
-            logger.debug(f"Pipe to {self.name} closed")
+            # The child sends its report right after the return value
+            return self._receiver.recv()
+        except EOFError:
+            return None
+
+    def _record(self, metric: Metric, value: float):
+        if self._metrics_recorder is not None:
+            self._metrics_recorder.record(self.name, metric, value)
 
     def _read_return_value(self) -> Any:
         try:
-            return self._receiver.recv()
+            return self._transport.recv(self._receiver)
             logger.debug(f"{self.name} returned: {self.return_value}")
         except EOFError as err:
             logger.error(f"Error retrieving the return value for {self.name}: {err}")
@@ -156,3 +704,74 @@ class MultiprocessingPlugin(NamedPluginMixin, SingleUsePlugin):
         This property will be `None` until the plugin finishes running.
         """
         return self._return_value
+
+    @property
+    def return_value_received(self) -> bool:
+        """
+        Whether the plugin's return value has been received from its process
+        """
+        return self._return_value_received
+
+    @property
+    def resource_usage(self) -> Optional[ResourceUsage]:
+        """
+        The resources that the plugin's process used
+
+        This property will be `None` until the plugin finishes running, and if the platform does
+        not support resource accounting. It is not reported by `stream()`.
+        """
+        return self._resource_usage
+
+
+def _wait(object_list: List[Any], timeout: Optional[float] = None) -> List[Any]:
+    # multiprocessing.connection imports tempfile, subprocess, and several compression modules, so
+    # it is only imported once a plugin is waited on, rather than whenever serpentarium is imported
+    from multiprocessing.connection import wait
+
+    return wait(object_list, timeout)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+
+    return max(0, deadline - time.monotonic())
+
+
+class _ChildProcessReport(NamedTuple):
+    """Sent by `MultiprocessingPlugin.run()`'s child process after the return value"""
+
+    metrics: List[MetricValue]
+    resource_usage: Optional[ResourceUsage]
+
+
+class _EndOfStream:
+    """Marks the end of the items sent by `MultiprocessingPlugin.stream()`"""
+
+
+class _StreamError(NamedTuple):
+    """Sent by `MultiprocessingPlugin.stream()`'s child process when the plugin raises"""
+
+    exception: BaseException
+
+
+async def _wait_readable(loop: "asyncio.AbstractEventLoop", fds: Sequence[int]) -> int:
+    """
+    Wait until one of the provided file descriptors is readable
+
+    :return: The first file descriptor that became readable
+    """
+    readable: "asyncio.Future" = loop.create_future()
+
+    def on_readable(fd: int):
+        if not readable.done():
+            readable.set_result(fd)
+
+    for fd in fds:
+        loop.add_reader(fd, on_readable, fd)
+
+    try:
+        return await readable
+    finally:
+        for fd in fds:
+            loop.remove_reader(fd)
@@ -0,0 +1,252 @@
+import logging
+from threading import Lock, current_thread
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+
+from . import MultiUsePlugin, NamedPluginMixin, PluginThreadName
+from .constants import SERPENTARIUM
+from .metrics import MetricValue, drain_child_process_metrics
+from .nop import NOP
+from .plugin_thread_name import set_main_thread_name
+from .plugin_wrapper import PluginWrapper
+from .process_start_method import ProcessStartMethod, get_multiprocessing_context
+from .types import ConfigureLoggerCallback as ConfigureLoggerCallback
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+logger = logging.getLogger(SERPENTARIUM)
+
+SHUTDOWN_TIMEOUT = 5  # seconds
+
+
+class PersistentMultiprocessingPlugin(NamedPluginMixin, MultiUsePlugin):
+    """
+    A plugin that runs in a long-lived separate process
+
+    Unlike a MultiprocessingPlugin, which spawns a new process every time it is run, a
+    PersistentMultiprocessingPlugin starts a single child process that loads the plugin once and
+    then serves many calls to `run()` over a duplex Pipe. Call `shutdown()` to stop the child
+    process when the plugin is no longer needed.
+    """
+
+    def __init__(
+        self,
+        *,
+        plugin: MultiUsePlugin,
+        main_thread_name: Union[PluginThreadName, str] = PluginThreadName.DEFAULT,
+        daemon: bool = True,
+        configure_child_process_logger: ConfigureLoggerCallback = NOP,
+        start_method: ProcessStartMethod = ProcessStartMethod.SPAWN,
+        **kwargs,
+    ):
+        """
+        :param plugin: A MultiUsePlugin to run in a separate process
+        :param main_thread_name: The name of the child process's main thread. This can either be a
+                                 `PluginThreadName` or a string. If it is
+                                 `PluginThreadName.CALLING_THREAD`, then the child process's main
+                                 thread name will match the name of the thread that starts the
+                                 child process. Defaults to `PluginThreadName.DEFAULT`.
+        :param daemon: Whether or not the process should be a daemon process
+        :param configure_child_process_logger: A callable that will be run on the child process to
+                                               configure concurrent logging
+        :param start_method: The method used to start the child process, defaults to
+                             `ProcessStartMethod.SPAWN`
+        """
+        super().__init__(plugin_name=plugin.name)
+        self._plugin = plugin
+        self._main_thread_name = main_thread_name
+        self._daemon = daemon
+        self._configure_child_process_logger = configure_child_process_logger
+        # The child process buffers the metrics that a PluginWrapper records and sends them back
+        # with each response, so that they're recorded by the host's recorder
+        self._metrics_recorder = (
+            plugin.metrics_recorder if isinstance(plugin, PluginWrapper) else None
+        )
+
+        self._multiprocessing_context = get_multiprocessing_context(start_method)
+
+        self._lock = Lock()
+        self._proc: Optional["BaseProcess"] = None
+        self._connection: Optional["Connection"] = None
+        self._shutdown = False
+
+    def start(self):
+        """
+        Launch the child process and begin loading the plugin
+
+        Calling this method is optional, since `run()` starts the child process if it is not already
+        running. Starting the process ahead of time moves the cost of spawning the process and
+        importing the plugin out of the first call to `run()`.
+        """
+        with self._lock:
+            self._start()
+
+    def _start(self) -> "Connection":
+        if self._shutdown:
+            raise RuntimeError(f"{self.name} has been shut down")
+
+        if self._connection is not None:
+            return self._connection
+
+        connection, child_connection = self._multiprocessing_context.Pipe(duplex=True)
+        proc = self._multiprocessing_context.Process(
+            name=self.name,
+            daemon=self._daemon,
+            target=_serve,
+            args=(
+                self._plugin,
+                child_connection,
+                self._main_thread_name,
+                current_thread().name,
+                self._configure_child_process_logger,
+            ),
+        )
+        proc.start()
+        child_connection.close()
+
+        self._proc = proc
+        self._connection = connection
+
+        return connection
+
+    def run(self, **kwargs) -> Any:
+        """
+        Run the plugin in the child process with the provided keyword arguments
+
+        Calls from multiple threads are serialized. Exceptions raised by the plugin are re-raised in
+        the calling process.
+
+        :return: The data that the plugin returned
+        :raises RuntimeError: If the plugin has been shut down or the child process exited
+                              unexpectedly
+        """
+        with self._lock:
+            connection = self._start()
+
+            try:
+                connection.send(kwargs)
+                succeeded, value, metrics = connection.recv()
+            except (EOFError, OSError) as err:
+                self._stop()
+                raise RuntimeError(f"The process for {self.name} exited unexpectedly") from err
+            except BaseException:
+                # The request and response are no longer in sync, so the process can't be reused
+                self._stop()
+                raise
+
+        self._record_metrics(metrics)
+
+        if not succeeded:
+            raise value
+
+        return value
+
+    def _record_metrics(self, metrics: List[MetricValue]):
+        if self._metrics_recorder is None:
+            return
+
+        for plugin_name, metric, value in metrics:
+            self._metrics_recorder.record(plugin_name, metric, value)
+
+    def shutdown(self):
+        """
+        Stop the child process
+
+        The child process is asked to exit once it finishes any call that it is currently serving.
+        If it does not exit in a timely manner, it is terminated. After the plugin has been shut
+        down, calls to `run()` will fail.
+        """
+        with self._lock:
+            self._shutdown = True
+            self._stop()
+
+    def _stop(self):
+        if self._proc is None or self._connection is None:
+            return
+
+        try:
+            self._connection.send(None)
+        except OSError:
+            # The child process has already exited
+            pass
+
+        self._proc.join(SHUTDOWN_TIMEOUT)
+        if self._proc.is_alive():
+            logger.warning(f"{self.name} did not shut down; terminating it")
+            self._proc.terminate()
+            self._proc.join()
+
+        logger.debug(f"{self.name} exited with code {self._proc.exitcode}")
+        self._connection.close()
+
+        self._proc = None
+        self._connection = None
+
+    def is_alive(self) -> bool:
+        """
+        Return whether the child process is running
+
+        :return: True if the child process is running. False otherwise.
+        """
+        if self._proc is None:
+            return False
+
+        return self._proc.is_alive()
+
+    def __enter__(self) -> "PersistentMultiprocessingPlugin":
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+
+
+def _serve(
+    plugin: MultiUsePlugin,
+    connection: "Connection",
+    main_thread_name: Union[PluginThreadName, str],
+    calling_thread_name: str,
+    configure_child_process_logger: ConfigureLoggerCallback,
+):
+    set_main_thread_name(main_thread_name, calling_thread_name)
+    configure_child_process_logger()
+
+    if isinstance(plugin, PluginWrapper):
+        try:
+            plugin.load()
+        except Exception:
+            # The error will be raised again and reported to the host by the first call to `run()`
+            logger.exception(f"Failed to load {plugin.name}")
+
+    while True:
+        try:
+            kwargs = connection.recv()
+        except EOFError:
+            # The host closed its end of the pipe
+            break
+
+        if kwargs is None:
+            break
+
+        _handle_request(plugin, connection, kwargs)
+
+    connection.close()
+
+
+def _handle_request(plugin: MultiUsePlugin, connection: "Connection", kwargs: Dict[str, Any]):
+    try:
+        succeeded, value = True, plugin.run(**kwargs)
+    except Exception as err:
+        logger.exception(f"{plugin.name} raised an exception")
+        succeeded, value = False, err
+
+    # The metrics that were recorded while loading and running the plugin are sent with the response
+    # so that they don't accumulate in this process
+    metrics = drain_child_process_metrics()
+
+    try:
+        connection.send((succeeded, value, metrics))
+    except Exception as err:
+        # The return value or exception could not be pickled
+        error = RuntimeError(f"{plugin.name} failed to send its result: {err}")
+        connection.send((False, error, metrics))
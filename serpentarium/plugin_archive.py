@@ -0,0 +1,317 @@
+"""
+Single-file plugin archives
+
+A plugin archive is a zip file named `<plugin_name>.zip` that contains the contents of a plugin's
+directory, including its vendor directory. The archive is opened and memory-mapped once, and every
+module is read from the mapping, so loading a plugin from an archive performs no other filesystem
+operations. `build_plugin_archive()` compiles every module and stores its bytecode in the archive,
+so that modules don't need to be compiled when they are imported.
+
+Extension modules must be loaded from a file, so plugins that contain extension modules can't be
+archived.
+
+Usage: python -m serpentarium.plugin_archive PLUGIN_DIRECTORY [--output ARCHIVE]
+"""
+
+import importlib.util
+import marshal
+import os
+import struct
+import sys
+from importlib.abc import InspectLoader, MetaPathFinder
+from importlib.machinery import EXTENSION_SUFFIXES, ModuleSpec
+from pathlib import Path, PurePosixPath
+from types import CodeType, ModuleType
+from typing import IO, TYPE_CHECKING, Dict, NamedTuple, Optional, Sequence, Union, cast
+
+from .constants import PLUGIN_ARCHIVE_SUFFIX, VENDOR_DIRECTORY_NAME
+
+if TYPE_CHECKING:
+    import mmap
+
+
+_SOURCE_SUFFIX = ".py"
+_PYCACHE = "__pycache__"
+_PACKAGE_INIT = "__init__"
+# See PEP 552. Unchecked hash-based pycs are used without reading the source.
+_PYC_FLAGS = struct.Struct("<I")
+_UNCHECKED_HASH_PYC = 0b01
+_PYC_HEADER_SIZE = 16
+
+
+def is_plugin_archive(path: Path) -> bool:
+    """
+    Check whether a path refers to a plugin archive
+
+    :param path: The path to check
+    :return: True if the path is a plugin archive, False otherwise
+    """
+    return path.suffix == PLUGIN_ARCHIVE_SUFFIX and path.is_file()
+
+
+def build_plugin_archive(
+    plugin_directory: Path,
+    archive_path: Optional[Path] = None,
+    compile_bytecode: bool = True,
+    compression: Optional[int] = None,
+) -> Path:
+    """
+    Build a plugin archive from a plugin's directory
+
+    :param plugin_directory: The directory where the plugin is stored
+    :param archive_path: The path of the archive to create, defaults to `<plugin_name>.zip` next to
+                         the plugin directory
+    :param compile_bytecode: Whether to compile the plugin's modules and store their bytecode in the
+                             archive, defaults to True
+    :param compression: The zipfile compression method, defaults to `zipfile.ZIP_DEFLATED`
+    :raises ValueError: If the plugin contains extension modules
+    :return: The path to the archive
+    """
+    import zipfile
+
+    if compression is None:
+        compression = zipfile.ZIP_DEFLATED
+    if archive_path is None:
+        archive_path = plugin_directory.with_name(f"{plugin_directory.name}{PLUGIN_ARCHIVE_SUFFIX}")
+
+    source_files = []
+    for directory, directory_names, file_names in os.walk(plugin_directory):
+        directory_names[:] = sorted(name for name in directory_names if name != _PYCACHE)
+        for file_name in sorted(file_names):
+            if any(file_name.endswith(suffix) for suffix in EXTENSION_SUFFIXES):
+                raise ValueError(f"Plugins with extension modules can't be archived: {file_name}")
+
+            source_files.append(Path(directory, file_name))
+
+    with zipfile.ZipFile(archive_path, "w", compression=compression) as archive:
+        for path in source_files:
+            member = PurePosixPath(*path.relative_to(plugin_directory).parts)
+            archive.write(path, str(member))
+
+            if compile_bytecode and member.suffix == _SOURCE_SUFFIX:
+                archive.writestr(str(_bytecode_member(member)), _compile_pyc(path, member))
+
+    return archive_path
+
+
+class _MappedFile:
+    """A read-only file-like view of a memory mapping that zipfile can read from"""
+
+    def __init__(self, mapping: "mmap.mmap"):
+        self._mapping = mapping
+        self.read = mapping.read
+        self.seek = mapping.seek
+        self.tell = mapping.tell
+
+    def seekable(self) -> bool:
+        return True
+
+    def close(self):
+        self._mapping.close()
+
+
+class _ArchiveEntry(NamedTuple):
+    # The module's source member, or the directory of a namespace package
+    member: str
+    is_package: bool
+    is_namespace: bool
+
+
+class PluginArchive:
+    """
+    A memory-mapped plugin archive
+    """
+
+    def __init__(self, plugin_name: str, archive_path: Path):
+        """
+        :param plugin_name: The name of the plugin
+        :param archive_path: The path to the plugin archive
+        """
+        # mmap and zipfile, which imports several compression modules, are only imported once an
+        # archive is opened, so that they aren't imported by every plugin that uses a finder
+        import mmap
+        import zipfile
+
+        self.plugin_name = plugin_name
+        self.path = archive_path
+
+        with open(archive_path, "rb") as f:
+            self._mapping = _MappedFile(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        # _MappedFile implements the subset of a binary file's methods that zipfile reads with
+        self._zip_file = zipfile.ZipFile(cast(IO[bytes], self._mapping))
+        self._members = set(self._zip_file.namelist())
+        self.modules = self._index_modules()
+
+    def read(self, member: str) -> bytes:
+        return self._zip_file.read(member)
+
+    def has_member(self, member: str) -> bool:
+        return member in self._members
+
+    def _index_modules(self) -> Dict[str, _ArchiveEntry]:
+        vendor_modules: Dict[str, _ArchiveEntry] = {}
+        plugin_modules: Dict[str, _ArchiveEntry] = {self.plugin_name: self._package_entry("")}
+
+        for member in sorted(self._members):
+            path = PurePosixPath(member)
+            if path.suffix != _SOURCE_SUFFIX:
+                continue
+
+            if path.parts[0] == VENDOR_DIRECTORY_NAME:
+                self._index_module(
+                    vendor_modules,
+                    (),
+                    VENDOR_DIRECTORY_NAME,
+                    path.relative_to(VENDOR_DIRECTORY_NAME),
+                )
+            else:
+                self._index_module(plugin_modules, (self.plugin_name,), "", path)
+
+        # The plugin's package takes precedence over vendored modules with the same name
+        return {**vendor_modules, **plugin_modules}
+
+    def _index_module(
+        self,
+        modules: Dict[str, _ArchiveEntry],
+        prefix: Sequence[str],
+        root: str,
+        path: PurePosixPath,
+    ):
+        package_parts = path.parent.parts
+        if not all(part.isidentifier() for part in [*package_parts, path.stem]):
+            return
+
+        # Regular packages take precedence over modules with the same name, and modules take
+        # precedence over namespace packages, as they do with the default import system
+        for i in range(1, len(package_parts) + 1):
+            name = ".".join([*prefix, *package_parts[:i]])
+            existing_entry = modules.get(name)
+            if existing_entry is None or not existing_entry.is_package:
+                package_entry = self._package_entry(_join(root, *package_parts[:i]))
+                if existing_entry is None or not package_entry.is_namespace:
+                    modules[name] = package_entry
+
+        if path.stem != _PACKAGE_INIT:
+            name = ".".join([*prefix, *package_parts, path.stem])
+            existing_entry = modules.get(name)
+            if existing_entry is None or existing_entry.is_namespace:
+                modules[name] = _ArchiveEntry(_join(root, str(path)), False, False)
+
+    def _package_entry(self, directory: str) -> _ArchiveEntry:
+        init_member = _join(directory, f"{_PACKAGE_INIT}{_SOURCE_SUFFIX}")
+        if init_member in self._members:
+            return _ArchiveEntry(init_member, True, False)
+
+        return _ArchiveEntry(directory, True, True)
+
+
+class ArchiveFinder(MetaPathFinder):
+    """
+    A meta path finder that finds a plugin's modules in a plugin archive
+    """
+
+    def __init__(self, archive: PluginArchive):
+        """
+        :param archive: The plugin archive
+        """
+        self._archive = archive
+        self._loader = _ArchiveLoader(archive)
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[Union[bytes, str]]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        entry = self._archive.modules.get(fullname)
+        if entry is None:
+            return None
+
+        location = _join(str(self._archive.path), entry.member)
+        if entry.is_namespace:
+            spec = ModuleSpec(fullname, None, is_package=True)
+            spec.submodule_search_locations = [location]
+            return spec
+
+        spec = ModuleSpec(fullname, self._loader, origin=location, is_package=entry.is_package)
+        spec.has_location = True
+        if entry.is_package:
+            spec.submodule_search_locations = [str(PurePosixPath(location).parent)]
+
+        return spec
+
+
+class _ArchiveLoader(InspectLoader):
+    def __init__(self, archive: PluginArchive):
+        self._archive = archive
+
+    def is_package(self, fullname: str) -> bool:
+        return self._entry(fullname).is_package
+
+    def get_source(self, fullname: str) -> str:
+        source = self._archive.read(self._entry(fullname).member)
+        return importlib.util.decode_source(source)
+
+    def get_code(self, fullname: str) -> CodeType:
+        entry = self._entry(fullname)
+        bytecode_member = str(_bytecode_member(PurePosixPath(entry.member)))
+
+        if self._archive.has_member(bytecode_member):
+            data = self._archive.read(bytecode_member)
+            if (
+                data[:4] == importlib.util.MAGIC_NUMBER
+                and _PYC_FLAGS.unpack_from(data, 4)[0] == _UNCHECKED_HASH_PYC
+            ):
+                # Archives are trusted: they hold plugin code that the host chose to execute
+                return marshal.loads(data[_PYC_HEADER_SIZE:])  # nosec B302
+
+        origin = _join(str(self._archive.path), entry.member)
+        return compile(self._archive.read(entry.member), origin, "exec", dont_inherit=True)
+
+    def _entry(self, fullname: str) -> _ArchiveEntry:
+        entry = self._archive.modules.get(fullname)
+        if entry is None or entry.is_namespace:
+            raise ImportError(f"{fullname} is not in {self._archive.path}", name=fullname)
+
+        return entry
+
+
+def _bytecode_member(member: PurePosixPath) -> PurePosixPath:
+    return member.parent / _PYCACHE / f"{member.stem}.{sys.implementation.cache_tag}.pyc"
+
+
+def _compile_pyc(path: Path, member: PurePosixPath) -> bytes:
+    source = path.read_bytes()
+    code = compile(source, str(member), "exec", dont_inherit=True)
+
+    return b"".join(
+        [
+            importlib.util.MAGIC_NUMBER,
+            _PYC_FLAGS.pack(_UNCHECKED_HASH_PYC),
+            # typeshed declares that source_hash() returns an int, but it returns bytes
+            cast(bytes, importlib.util.source_hash(source)),
+            marshal.dumps(code),
+        ]
+    )
+
+
+def _join(*parts: str) -> str:
+    return "/".join(part for part in parts if part)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("plugin_directory", type=Path)
+    parser.add_argument("--output", type=Path, default=None, help="The archive to create")
+    parser.add_argument(
+        "--no-bytecode", action="store_true", help="Don't store compiled bytecode in the archive"
+    )
+    args = parser.parse_args()
+
+    print(build_plugin_archive(args.plugin_directory, args.output, not args.no_bytecode))
+
+
+if __name__ == "__main__":
+    main()
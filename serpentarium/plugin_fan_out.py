@@ -0,0 +1,129 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional
+
+from . import MultiprocessingPlugin
+from .constants import SERPENTARIUM
+
+logger = logging.getLogger(SERPENTARIUM)
+
+
+class PluginResult(NamedTuple):
+    """The outcome of running a plugin with `run_many()`"""
+
+    plugin_name: str
+    return_value: Any
+    timed_out: bool
+
+
+def run_many(
+    plugins: Iterable[MultiprocessingPlugin],
+    *,
+    timeout: Optional[float] = None,
+    timeouts: Optional[Mapping[str, float]] = None,
+    max_concurrency: Optional[int] = None,
+    cancel_grace_period: float = 0,
+    **kwargs,
+) -> Iterator[PluginResult]:
+    """
+    Run many MultiprocessingPlugins concurrently and yield their results as they complete
+
+    All running plugins are waited on at once with `multiprocessing.connection.wait()`, so a slow
+    plugin does not delay the results of faster plugins. Plugins are pulled from `plugins` lazily as
+    slots become available.
+
+    A plugin that does not finish within its timeout is cancelled with
+    `MultiprocessingPlugin.cancel()` and yielded with `timed_out` set to `True`. Plugins that are
+    still running when the caller stops iterating are cancelled as well.
+
+    :param plugins: The MultiprocessingPlugins to run
+    :param timeout: A floating-point number of seconds that each plugin is allowed to run, measured
+                    from when the plugin is started. If `None`, plugins may run indefinitely.
+                    Defaults to `None`.
+    :param timeouts: Per-plugin timeouts, keyed by plugin name, which override `timeout`
+    :param max_concurrency: The maximum number of plugins that run at the same time. If `None`, all
+                            plugins are started at once. Defaults to `None`.
+    :param cancel_grace_period: A floating-point number of seconds that a cancelled plugin is given
+                                to stop before its process is terminated, defaults to 0
+    :param kwargs: Keyword arguments to be passed to every plugin's `run()` method
+
+    :return: An iterator of PluginResults in the order that the plugins completed
+    """
+    if max_concurrency is not None and max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    if timeouts is None:
+        timeouts = {}
+
+    pending = iter(plugins)
+    deadlines: Dict[MultiprocessingPlugin, Optional[float]] = {}
+
+    try:
+        while True:
+            while max_concurrency is None or len(deadlines) < max_concurrency:
+                plugin = next(pending, None)
+                if plugin is None:
+                    break
+
+                plugin_timeout = timeouts.get(plugin.name, timeout)
+                plugin.start(**kwargs)
+                deadlines[plugin] = (
+                    None if plugin_timeout is None else time.monotonic() + plugin_timeout
+                )
+
+            if not deadlines:
+                return
+
+            for plugin in _wait_for_progress(deadlines):
+                del deadlines[plugin]
+                yield PluginResult(plugin.name, plugin.return_value, False)
+
+            now = time.monotonic()
+            expired = [
+                p for p, deadline in deadlines.items() if deadline is not None and deadline <= now
+            ]
+            for plugin in expired:
+                del deadlines[plugin]
+                yield _expire(plugin, cancel_grace_period)
+    finally:
+        for plugin in deadlines:
+            plugin.cancel(cancel_grace_period)
+
+
+def _expire(plugin: MultiprocessingPlugin, cancel_grace_period: float) -> PluginResult:
+    # The plugin may have returned during the round of waiting in which its deadline expired
+    plugin.join(0)
+    timed_out = not plugin.return_value_received
+    if timed_out:
+        logger.warning(f"{plugin.name} did not finish before its timeout expired")
+
+    if plugin.is_alive():
+        plugin.cancel(cancel_grace_period)
+
+    return PluginResult(plugin.name, None if timed_out else plugin.return_value, timed_out)
+
+
+def _wait_for_progress(
+    deadlines: Mapping[MultiprocessingPlugin, Optional[float]]
+) -> List[MultiprocessingPlugin]:
+    # Imported lazily, since multiprocessing.connection noticeably increases the import time of
+    # serpentarium
+    from multiprocessing.connection import wait
+
+    handles = {handle: plugin for plugin in deadlines for handle in plugin.wait_handles()}
+
+    finite_deadlines = [deadline for deadline in deadlines.values() if deadline is not None]
+    wait_timeout = None
+    if finite_deadlines:
+        wait_timeout = max(0, min(finite_deadlines) - time.monotonic())
+
+    ready_handles = set(wait(list(handles), wait_timeout))
+    ready_plugins = {plugin for handle, plugin in handles.items() if handle in ready_handles}
+
+    finished_plugins = []
+    for plugin in ready_plugins:
+        plugin.join(0)
+        if not plugin.is_alive():
+            finished_plugins.append(plugin)
+
+    return finished_plugins
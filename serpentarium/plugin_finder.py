@@ -0,0 +1,153 @@
+import os
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec, PathFinder
+from importlib.util import spec_from_file_location
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Mapping, Optional, Sequence, Union
+
+from .constants import VENDOR_DIRECTORY_NAME
+from .plugin_archive import ArchiveFinder, PluginArchive, is_plugin_archive
+from .vendor_manifest import VendorManifest, is_package_directory_name, load_manifest, module_name
+
+
+class PluginFinder(MetaPathFinder):
+    """
+    A meta path finder that finds a plugin's package and its vendored top-level modules
+
+    The finder is backed by an index that maps top-level module names to the directory that
+    contains them. Names that are not in the index are left to the other finders on
+    `sys.meta_path`, without touching the filesystem. Submodules are found by the default finders
+    using their parent package's `__path__`, which already points into the plugin's directories.
+    """
+
+    def __init__(self, index: Mapping[str, str]):
+        """
+        :param index: A mapping of top-level module names to the directories that contain them
+        """
+        self._index = dict(index)
+
+    @classmethod
+    def from_plugin_directory(cls, plugin_name: str, plugin_directory: Path) -> "PluginFinder":
+        """
+        Create a PluginFinder by scanning a plugin's directory
+
+        :param plugin_name: The name of the plugin
+        :param plugin_directory: The directory where the plugin is stored
+        :return: A PluginFinder for the plugin
+        """
+        return cls(build_index(plugin_name, plugin_directory))
+
+    @property
+    def index(self) -> Mapping[str, str]:
+        return self._index
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[Union[bytes, str]]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        if path is not None:
+            return None
+
+        directory = self._index.get(fullname)
+        if directory is None:
+            return None
+
+        return PathFinder.find_spec(fullname, [directory], target)
+
+
+class ManifestFinder(MetaPathFinder):
+    """
+    A meta path finder that finds all of a plugin's modules using the plugin's manifest
+
+    Every module in the plugin's package and its vendor directory, including submodules, is resolved
+    directly to its file, so the plugin's directories are never searched. See
+    `serpentarium.vendor_manifest`.
+    """
+
+    def __init__(self, manifest: VendorManifest, plugin_directory: Path):
+        """
+        :param manifest: The plugin's manifest
+        :param plugin_directory: The directory where the plugin is stored
+        """
+        self._modules = manifest.modules
+        self._plugin_directory = plugin_directory
+
+    def find_spec(
+        self,
+        fullname: str,
+        path: Optional[Sequence[Union[bytes, str]]],
+        target: Optional[ModuleType] = None,
+    ) -> Optional[ModuleSpec]:
+        entry = self._modules.get(fullname)
+        if entry is None:
+            return None
+
+        location = str(self._plugin_directory / entry.path)
+        if entry.sha256 is None:
+            # A namespace package
+            spec = ModuleSpec(fullname, None, is_package=True)
+            spec.submodule_search_locations = [location]
+            return spec
+
+        return spec_from_file_location(
+            fullname,
+            location,
+            submodule_search_locations=[os.path.dirname(location)] if entry.is_package else None,
+        )
+
+
+def create_plugin_finder(plugin_name: str, plugin_directory: Path) -> MetaPathFinder:
+    """
+    Create a meta path finder for a plugin
+
+    :param plugin_name: The name of the plugin
+    :param plugin_directory: The directory or plugin archive where the plugin is stored
+    :return: An ArchiveFinder if the plugin is a plugin archive, a ManifestFinder if the plugin has
+             an up-to-date manifest, otherwise a PluginFinder
+    """
+    if is_plugin_archive(plugin_directory):
+        return ArchiveFinder(PluginArchive(plugin_name, plugin_directory))
+
+    manifest = load_manifest(plugin_name, plugin_directory)
+    if manifest is not None:
+        return ManifestFinder(manifest, plugin_directory)
+
+    return PluginFinder.from_plugin_directory(plugin_name, plugin_directory)
+
+
+def build_index(plugin_name: str, plugin_directory: Path) -> Dict[str, str]:
+    """
+    Map the names of a plugin's package and its vendored top-level modules to their directories
+
+    :param plugin_name: The name of the plugin
+    :param plugin_directory: The directory where the plugin is stored
+    :return: A mapping of top-level module names to the directories that contain them
+    """
+    vendor_directory = plugin_directory / VENDOR_DIRECTORY_NAME
+    index: Dict[str, str] = {}
+
+    try:
+        with os.scandir(vendor_directory) as entries:
+            for entry in entries:
+                name = _module_name(entry)
+                if name is not None:
+                    index.setdefault(name, str(vendor_directory))
+    except FileNotFoundError:
+        pass
+
+    # The plugin's package takes precedence over vendored modules with the same name, as it does
+    # when the plugin's parent directory is first on `sys.path`
+    index[plugin_name] = str(plugin_directory.parent)
+
+    return index
+
+
+def _module_name(entry: os.DirEntry) -> Optional[str]:
+    if entry.is_dir():
+        return entry.name if is_package_directory_name(entry.name) else None
+
+    name_and_suffix = module_name(entry.name)
+    return None if name_and_suffix is None else name_and_suffix[0]
@@ -1,19 +1,43 @@
 from pathlib import Path
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Iterable, Iterator, Mapping, Optional, Union
 
-from . import MultiprocessingPlugin, MultiUsePlugin, PluginThreadName
+from . import IsolationMode, MultiprocessingPlugin, MultiUsePlugin, PluginThreadName
+from .constants import DEFAULT_POLL_INTERVAL, PLUGIN_ARCHIVE_SUFFIX
+from .cpu_affinity import CPUAffinity
+from .metrics import MetricsRecorder
 from .nop import NOP
+from .plugin_module_cache import PluginModuleCache
 from .plugin_wrapper import PluginWrapper
+from .process_start_method import ProcessStartMethod
+from .resource_limits import ResourceLimits
+from .thread_plugin import ThreadPlugin
+from .transport import Transport
 from .types import ConfigureLoggerCallback as ConfigureLoggerCallback
 
+if TYPE_CHECKING:
+    from .persistent_multiprocessing_plugin import PersistentMultiprocessingPlugin
+    from .plugin_fan_out import PluginResult
+    from .plugin_process_pool import PluginProcessPool
+    from .reloadable_plugin import ReloadablePlugin
+
 
 class PluginLoader:
     """
     Loads plugins from the provided plugin directory
+
+    Each plugin is either a directory named after the plugin or a plugin archive named
+    `<plugin_name>.zip` (see `serpentarium.plugin_archive`). If both exist, the directory is used.
     """
 
     def __init__(
-        self, plugin_directory: Path, configure_child_process_logger: ConfigureLoggerCallback = NOP
+        self,
+        plugin_directory: Path,
+        configure_child_process_logger: ConfigureLoggerCallback = NOP,
+        start_method: ProcessStartMethod = ProcessStartMethod.SPAWN,
+        module_cache_size: int = 0,
+        isolation_mode: IsolationMode = IsolationMode.SYS_PATH,
+        bytecode_cache_directory: Optional[Path] = None,
+        metrics_recorder: Optional[MetricsRecorder] = None,
     ):
         """
         :param plugin_directory: The directory where plugins are stored
@@ -21,9 +45,43 @@ class PluginLoader:
                                                by any MultiprocessingPlugin that this object loads.
                                                This can be overridden on each call to
                                                load_multiprocessing_plugin(). Defaults to a NOP.
+        :param start_method: The method used to start the processes of any MultiprocessingPlugin,
+                             PersistentMultiprocessingPlugin or PluginProcessPool that this object
+                             loads, defaults to `ProcessStartMethod.SPAWN`. The modules that
+                             are preloaded into the forkserver's template process are set for the
+                             whole interpreter with `set_forkserver_preload()`.
+        :param module_cache_size: The number of plugins whose modules are cached by `load()`. When a
+                                  plugin is loaded again, the modules that its previous load
+                                  imported are reused instead of being imported from disk, so
+                                  plugin objects that share a cache entry also share their modules'
+                                  global state. A value of 0 disables the cache. Defaults to 0.
+        :param isolation_mode: How plugins and their vendored dependencies are made importable,
+                               defaults to `IsolationMode.SYS_PATH`
+        :param bytecode_cache_directory: A writable directory where the bytecode of plugins and
+                                         their vendored dependencies is cached instead of in
+                                         `__pycache__` directories, which is useful when plugin
+                                         directories are read-only. The directory is used as
+                                         `sys.pycache_prefix` while plugins are loaded, so it also
+                                         caches any other modules that are first imported by a
+                                         plugin. Requires Python 3.8 or later. Defaults to `None`.
+        :param metrics_recorder: A MetricsRecorder that records the runtime metrics of the plugins
+                                 that are loaded with `load()` or `load_multiprocessing_plugin()`,
+                                 and the import time of any other plugins, defaults to `None`
         """
         self._plugin_directory = plugin_directory
         self._configure_child_process_logger = configure_child_process_logger
+        self._start_method = start_method
+        self._isolation_mode = isolation_mode
+        self._bytecode_cache_directory = bytecode_cache_directory
+        self._metrics_recorder = metrics_recorder
+
+        self._module_cache = None
+        if module_cache_size > 0:
+            self._module_cache = PluginModuleCache(module_cache_size)
+
+    @property
+    def plugin_directory(self) -> Path:
+        return self._plugin_directory
 
     def load(
         self, *, plugin_name: str, reset_modules_cache: bool = True, **kwargs
@@ -44,13 +102,62 @@ class PluginLoader:
 
         :return: A MultiUsePlugin
         """
+        return self._wrap_plugin(
+            plugin_name, reset_modules_cache, module_cache=self._module_cache, **kwargs
+        )
+
+    def _wrap_plugin(
+        self,
+        plugin_name: str,
+        reset_modules_cache: bool,
+        module_cache: Optional[PluginModuleCache] = None,
+        **kwargs,
+    ) -> PluginWrapper:
         return PluginWrapper(
             plugin_name=plugin_name,
-            plugin_directory=self._plugin_directory / plugin_name,
+            plugin_directory=self._plugin_path(plugin_name),
             reset_modules_cache=reset_modules_cache,
+            module_cache=module_cache,
+            isolation_mode=self._isolation_mode,
+            bytecode_cache_directory=self._bytecode_cache_directory,
+            metrics_recorder=self._metrics_recorder,
             **kwargs,
         )
 
+    def _plugin_path(self, plugin_name: str) -> Path:
+        plugin_directory = self._plugin_directory / plugin_name
+        if plugin_directory.exists():
+            return plugin_directory
+
+        plugin_archive = self._plugin_directory / f"{plugin_name}{PLUGIN_ARCHIVE_SUFFIX}"
+        if plugin_archive.is_file():
+            return plugin_archive
+
+        return plugin_directory
+
+    def precompile(self, plugin_name: str) -> bool:
+        """
+        Compile a plugin's modules and its vendored dependencies to bytecode ahead of time
+
+        The bytecode is written to the bytecode cache directory, if one was provided to the
+        constructor, so that processes that load the plugin don't need to compile it.
+
+        :param plugin_name: The name of the plugin (corresponds to the name of the directory where
+                            the plugin is stored)
+        :return: True if all modules were compiled successfully, False otherwise
+        """
+        return self._wrap_plugin(plugin_name, True).precompile()
+
+    def clear_module_cache(self, plugin_name: Optional[str] = None):
+        """
+        Remove cached plugin modules, so that they are imported from disk the next time they load
+
+        :param plugin_name: The name of the plugin whose modules should be removed. If `None`, the
+                            modules of all plugins are removed. Defaults to `None`.
+        """
+        if self._module_cache is not None:
+            self._module_cache.invalidate(plugin_name)
+
     def load_multiprocessing_plugin(
         self,
         *,
@@ -58,6 +165,11 @@ class PluginLoader:
         main_thread_name: Union[PluginThreadName, str] = PluginThreadName.DEFAULT,
         configure_child_process_logger: Optional[ConfigureLoggerCallback] = None,
         reset_modules_cache=True,
+        transport: Optional[Transport] = None,
+        resource_limits: Optional[ResourceLimits] = None,
+        cpu_affinity: Optional[CPUAffinity] = None,
+        cancellable: bool = False,
+        cancel_grace_period: Optional[float] = None,
         **kwargs,
     ) -> MultiprocessingPlugin:
         """
@@ -86,18 +198,25 @@ class PluginLoader:
         :param reset_modules_cache: Whether or not to reset the `sys.modules` cache to system
                                     defaults before executing the plugin. Setting this to `False`
                                     will have little to no effect in most cases since
-                                    `MultiprocessingPlugins` use the "spawn" method. Defaults to
-                                    `True`.
+                                    `MultiprocessingPlugins` start from a clean interpreter state.
+                                    Defaults to `True`.
+        :param transport: The Transport used to send the plugin's return value to the host, defaults
+                          to a `PickleTransport`
+        :param resource_limits: ResourceLimits that are applied to the plugin's process before the
+                                plugin is loaded, defaults to `None`
+        :param cpu_affinity: The CPUs that the plugin's process is pinned to, either as an
+                             iterable of CPU numbers or a `CPUPlacementPolicy`. Defaults to `None`.
+        :param cancellable: Whether the plugin's `run()` method accepts a `cancel_event` keyword
+                            argument, which is set when the plugin is cancelled. Defaults to
+                            `False`.
+        :param cancel_grace_period: If not `None`, the plugin is cancelled when the timeout of
+                                    `run()` expires, and given this many seconds to stop before its
+                                    process is terminated. Defaults to `None`.
         :param kwargs: Keyword arguments to be passed to the plugin's constructor
 
         :return: A MultiprocessingPlugin
         """
-        plugin = PluginWrapper(
-            plugin_name=plugin_name,
-            plugin_directory=self._plugin_directory / plugin_name,
-            reset_modules_cache=reset_modules_cache,
-            **kwargs,
-        )
+        plugin = self._wrap_plugin(plugin_name, reset_modules_cache, **kwargs)
 
         if configure_child_process_logger is None:
             configure_logger_fn = self._configure_child_process_logger
@@ -108,5 +227,246 @@ class PluginLoader:
             plugin=plugin,
             main_thread_name=main_thread_name,
             configure_child_process_logger=configure_logger_fn,
+            start_method=self._start_method,
+            transport=transport,
+            metrics_recorder=self._metrics_recorder,
+            resource_limits=resource_limits,
+            cpu_affinity=cpu_affinity,
+            cancellable=cancellable,
+            cancel_grace_period=cancel_grace_period,
+            **kwargs,
+        )
+
+    def load_thread_plugin(
+        self,
+        *,
+        plugin_name: str,
+        reset_modules_cache: bool = True,
+        cancellable: bool = False,
+        cancel_grace_period: Optional[float] = None,
+        **kwargs,
+    ) -> ThreadPlugin:
+        """
+        Load a plugin by name that runs in a separate thread of the host process
+
+        The plugin is imported and constructed in isolation before this method returns, so errors
+        that occur while importing it are raised here rather than in the plugin's thread. The
+        thread then runs the plugin with the host's import system in place, so it does not block
+        other plugins from being loaded.
+
+        :param plugin_name: The name of the plugin (corresponds to the name of the directory where
+                            the plugin is stored)
+        :param reset_modules_cache: Whether or not to reset the `sys.modules` cache to system
+                                    defaults before executing the plugin. Defaults to `True`.
+        :param cancellable: Whether the plugin's `run()` method accepts a `cancel_event` keyword
+                            argument, which is set when the plugin is cancelled. Defaults to
+                            `False`.
+        :param cancel_grace_period: If not `None`, the plugin is cancelled when the timeout of
+                                    `run()` expires, and given this many seconds to stop before it
+                                    is abandoned. Defaults to `None`.
+        :param kwargs: Keyword arguments to be passed to the plugin's constructor
+
+        :return: A ThreadPlugin
+        """
+        plugin = self._wrap_plugin(
+            plugin_name, reset_modules_cache, module_cache=self._module_cache, **kwargs
+        )
+        plugin.load()
+
+        return ThreadPlugin(
+            plugin=plugin, cancellable=cancellable, cancel_grace_period=cancel_grace_period
+        )
+
+    def run_many(
+        self,
+        plugin_names: Iterable[str],
+        *,
+        timeout: Optional[float] = None,
+        timeouts: Optional[Mapping[str, float]] = None,
+        max_concurrency: Optional[int] = None,
+        cancel_grace_period: float = 0,
+        **kwargs,
+    ) -> Iterator["PluginResult"]:
+        """
+        Run many plugins in separate processes and yield their results as they complete
+
+        Each plugin is loaded with `load_multiprocessing_plugin()` and the default options. See
+        `serpentarium.plugin_fan_out.run_many()` for more information.
+
+        :param plugin_names: The names of the plugins to run
+        :param timeout: A floating-point number of seconds that each plugin is allowed to run. If
+                        `None`, plugins may run indefinitely. Defaults to `None`.
+        :param timeouts: Per-plugin timeouts, keyed by plugin name, which override `timeout`
+        :param max_concurrency: The maximum number of plugins that run at the same time. If `None`,
+                                all plugins are started at once. Defaults to `None`.
+        :param cancel_grace_period: A floating-point number of seconds that a plugin that timed out
+                                    is given to stop before its process is terminated, defaults
+                                    to 0
+        :param kwargs: Keyword arguments to be passed to every plugin's `run()` method
+
+        :return: An iterator of PluginResults in the order that the plugins completed
+        """
+        # Imported lazily, like the other plugin types below that only some hosts use, to keep the
+        # import time of serpentarium down
+        from .plugin_fan_out import run_many
+
+        plugins = (
+            self.load_multiprocessing_plugin(plugin_name=plugin_name)
+            for plugin_name in plugin_names
+        )
+
+        return run_many(
+            plugins,
+            timeout=timeout,
+            timeouts=timeouts,
+            max_concurrency=max_concurrency,
+            cancel_grace_period=cancel_grace_period,
             **kwargs,
         )
+
+    def load_persistent_multiprocessing_plugin(
+        self,
+        *,
+        plugin_name: str,
+        main_thread_name: Union[PluginThreadName, str] = PluginThreadName.DEFAULT,
+        configure_child_process_logger: Optional[ConfigureLoggerCallback] = None,
+        reset_modules_cache=True,
+        **kwargs,
+    ) -> "PersistentMultiprocessingPlugin":
+        """
+        Load a plugin by name into a long-lived separate process
+
+        The child process loads the plugin once and then serves many calls to `run()`. Call
+        `PersistentMultiprocessingPlugin.shutdown()` to stop the child process when the plugin is no
+        longer needed.
+
+        :param plugin_name: The name of the plugin (corresponds to the name of the directory where
+                            the plugin is stored)
+        :param main_thread_name: The name of the child process's main thread. This can either be a
+                                 `PluginThreadName` or a string, defaults to
+                                 `PluginThreadName.DEFAULT`.
+        :param configure_child_process_logger: A callback to configure logging on the child process.
+                                               This overrides the callback provided to the
+                                               constructor. Defaults to `None`
+        :param reset_modules_cache: Whether or not to reset the `sys.modules` cache to system
+                                    defaults before loading the plugin. Defaults to `True`.
+        :param kwargs: Keyword arguments to be passed to the plugin's constructor
+
+        :return: A PersistentMultiprocessingPlugin
+        """
+        plugin = self._wrap_plugin(plugin_name, reset_modules_cache, **kwargs)
+
+        if configure_child_process_logger is None:
+            configure_logger_fn = self._configure_child_process_logger
+        else:
+            configure_logger_fn = configure_child_process_logger
+
+        from .persistent_multiprocessing_plugin import PersistentMultiprocessingPlugin
+
+        return PersistentMultiprocessingPlugin(
+            plugin=plugin,
+            main_thread_name=main_thread_name,
+            configure_child_process_logger=configure_logger_fn,
+            start_method=self._start_method,
+        )
+
+    def load_process_pool(
+        self,
+        *,
+        plugin_name: str,
+        min_workers: int = 1,
+        max_workers: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        configure_child_process_logger: Optional[ConfigureLoggerCallback] = None,
+        reset_modules_cache=True,
+        **kwargs,
+    ) -> "PluginProcessPool":
+        """
+        Load a plugin by name into a pool of long-lived worker processes
+
+        Each worker process imports the plugin once and then serves many calls to `run()`. Call
+        `PluginProcessPool.shutdown()` to stop the workers when the pool is no longer needed.
+
+        :param plugin_name: The name of the plugin (corresponds to the name of the directory where
+                            the plugin is stored)
+        :param min_workers: The number of worker processes that are kept alive even when they are
+                            idle, defaults to 1
+        :param max_workers: The maximum number of worker processes, defaults to the number of CPUs
+        :param idle_timeout: A floating-point number of seconds after which an idle worker in excess
+                             of `min_workers` is stopped, defaults to `None` (never)
+        :param max_tasks_per_worker: The number of calls to `run()` that a worker serves before it
+                                     is replaced by a fresh process, defaults to `None` (never)
+        :param configure_child_process_logger: A callback to configure logging on the worker
+                                               processes. This overrides the callback provided to
+                                               the constructor. Defaults to `None`
+        :param reset_modules_cache: Whether or not to reset the `sys.modules` cache to system
+                                    defaults before loading the plugin. Defaults to `True`.
+        :param kwargs: Keyword arguments to be passed to the plugin's constructor
+
+        :return: A PluginProcessPool
+        """
+        plugin = self._wrap_plugin(plugin_name, reset_modules_cache, **kwargs)
+
+        if configure_child_process_logger is None:
+            configure_logger_fn = self._configure_child_process_logger
+        else:
+            configure_logger_fn = configure_child_process_logger
+
+        from .plugin_process_pool import PluginProcessPool
+
+        return PluginProcessPool(
+            plugin=plugin,
+            min_workers=min_workers,
+            max_workers=max_workers,
+            idle_timeout=idle_timeout,
+            max_tasks_per_worker=max_tasks_per_worker,
+            configure_child_process_logger=configure_logger_fn,
+            start_method=self._start_method,
+        )
+
+    def load_reloadable_plugin(
+        self,
+        *,
+        plugin_name: str,
+        poll_interval: Optional[float] = DEFAULT_POLL_INTERVAL,
+        watch_recursively: bool = False,
+        reset_modules_cache: bool = True,
+        **kwargs,
+    ) -> "ReloadablePlugin":
+        """
+        Load a plugin by name that is reloaded when its files change
+
+        Call `ReloadablePlugin.stop()` to stop watching the plugin for changes when it is no longer
+        needed.
+
+        :param plugin_name: The name of the plugin (corresponds to the name of the directory where
+                            the plugin is stored)
+        :param poll_interval: A floating-point number of seconds between checks for changes. If
+                              `None`, the plugin is only reloaded when `ReloadablePlugin.reload()`
+                              is called. Defaults to 1 second.
+        :param watch_recursively: Whether to watch every file in the plugin's directory tree rather
+                                  than only the top level of its directory and vendor directory.
+                                  See `ReloadablePlugin`. Defaults to False.
+        :param reset_modules_cache: Whether or not to reset the `sys.modules` cache to system
+                                    defaults before loading the plugin. Setting this to `False`
+                                    will break plugin isolation, and reloaded plugins may reuse
+                                    stale modules. Defaults to `True`.
+        :param kwargs: Keyword arguments to be passed to the plugin's constructor
+
+        :return: A ReloadablePlugin
+        """
+
+        from .reloadable_plugin import ReloadablePlugin
+
+        def plugin_factory() -> PluginWrapper:
+            # Modules that were cached for an older version of the plugin must not be reused
+            self.clear_module_cache(plugin_name)
+            return self._wrap_plugin(plugin_name, reset_modules_cache, **kwargs)
+
+        return ReloadablePlugin(
+            plugin_factory=plugin_factory,
+            plugin_path=self._plugin_path(plugin_name),
+            poll_interval=poll_interval,
+            watch_recursively=watch_recursively,
+        )
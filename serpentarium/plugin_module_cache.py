@@ -0,0 +1,111 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from types import ModuleType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+from .constants import VENDOR_DIRECTORY_NAME
+
+ModuleSnapshot = Dict[str, ModuleType]
+
+
+class PluginModuleCache:
+    """
+    A least-recently-used cache of the modules that loading a plugin in isolation produced
+
+    Loading a plugin imports the plugin and its vendored dependencies from disk. When a plugin is
+    loaded again, its cached modules can be placed into the isolated `sys.modules` instead, so that
+    none of them are read from disk or executed again. Note that this means that plugin objects
+    loaded from the same cache entry share their modules' global state.
+
+    An entry is invalidated when the plugin directory, its vendor directory, or any of the cached
+    modules' files has been modified since the entry was stored.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        :param max_size: The maximum number of plugins whose modules are cached
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+
+        self._max_size = max_size
+        self._lock = Lock()
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, ...], ModuleSnapshot]]" = OrderedDict()
+
+    def get(self, plugin_name: str, plugin_directory: Path) -> Optional[ModuleSnapshot]:
+        """
+        Get the cached modules for a plugin
+
+        :param plugin_name: The name of the plugin
+        :param plugin_directory: The directory where the plugin is stored
+        :return: The cached modules, or None if there is no valid entry for the plugin
+        """
+        with self._lock:
+            entry = self._entries.get(plugin_name)
+            if entry is None:
+                return None
+
+            signature, modules = entry
+            if signature != _signature(plugin_directory, modules.values()):
+                del self._entries[plugin_name]
+                return None
+
+            self._entries.move_to_end(plugin_name)
+            return modules
+
+    def put(self, plugin_name: str, plugin_directory: Path, modules: Mapping[str, ModuleType]):
+        """
+        Store the modules that loading a plugin produced
+
+        :param plugin_name: The name of the plugin
+        :param plugin_directory: The directory where the plugin is stored
+        :param modules: The modules that were imported while the plugin was loaded
+        """
+        modules = dict(modules)
+        signature = _signature(plugin_directory, modules.values())
+
+        with self._lock:
+            self._entries[plugin_name] = (signature, modules)
+            self._entries.move_to_end(plugin_name)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, plugin_name: Optional[str] = None):
+        """
+        Remove a plugin's modules from the cache
+
+        :param plugin_name: The name of the plugin whose modules should be removed. If `None`, the
+                            entire cache is cleared. Defaults to `None`.
+        """
+        with self._lock:
+            if plugin_name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(plugin_name, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+def _signature(plugin_directory: Path, modules: Iterable[ModuleType]) -> Tuple[int, ...]:
+    # Adding, removing, or renaming a file changes the modification time of its directory, and
+    # editing a module changes the modification time of its file. Only the files of the modules
+    # that were actually imported are checked, which is far cheaper than re-importing them.
+    paths = [plugin_directory, plugin_directory / VENDOR_DIRECTORY_NAME]
+    for module in modules:
+        module_file = getattr(module, "__file__", None)
+        if module_file is not None:
+            paths.append(Path(module_file))
+
+    return tuple(_mtime_ns(path) for path in paths)
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
@@ -0,0 +1,295 @@
+import logging
+import os
+import time
+from threading import Condition, Lock, Thread
+from typing import Any, List, Optional
+
+from . import MultiUsePlugin, NamedPluginMixin
+from .constants import SERPENTARIUM
+from .nop import NOP
+from .persistent_multiprocessing_plugin import PersistentMultiprocessingPlugin
+from .process_start_method import ProcessStartMethod
+from .types import ConfigureLoggerCallback as ConfigureLoggerCallback
+
+logger = logging.getLogger(SERPENTARIUM)
+
+
+class PluginProcessPool(NamedPluginMixin, MultiUsePlugin):
+    """
+    A plugin that runs in a pool of long-lived worker processes
+
+    Spawning a new process and importing a plugin can take hundreds of milliseconds. A
+    PluginProcessPool keeps worker processes alive that have already imported the plugin, so that
+    each call to `run()` only costs an IPC round trip to an idle worker.
+    """
+
+    def __init__(
+        self,
+        *,
+        plugin: MultiUsePlugin,
+        min_workers: int = 1,
+        max_workers: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_tasks_per_worker: Optional[int] = None,
+        daemon: bool = True,
+        configure_child_process_logger: ConfigureLoggerCallback = NOP,
+        start_method: ProcessStartMethod = ProcessStartMethod.SPAWN,
+    ):
+        """
+        :param plugin: A MultiUsePlugin to run in the worker processes
+        :param min_workers: The number of worker processes that are kept alive even when they are
+                            idle. These workers are started when the pool is constructed, defaults
+                            to 1
+        :param max_workers: The maximum number of worker processes. Calls to `run()` block while
+                            all workers are busy. Defaults to the number of CPUs.
+        :param idle_timeout: A floating-point number of seconds after which an idle worker in excess
+                             of `min_workers` is stopped by a background thread. If `None`, idle
+                             workers are never stopped. Defaults to `None`.
+        :param max_tasks_per_worker: The number of calls to `run()` that a worker serves before it
+                                     is replaced by a fresh process. If `None`, workers are never
+                                     replaced. Defaults to `None`.
+        :param daemon: Whether or not the worker processes should be daemon processes
+        :param configure_child_process_logger: A callable that will be run on each worker process to
+                                               configure concurrent logging
+        :param start_method: The method used to start the worker processes, defaults to
+                             `ProcessStartMethod.SPAWN`
+        """
+        super().__init__(plugin_name=plugin.name)
+
+        if max_workers is None:
+            max_workers = max(os.cpu_count() or 1, min_workers, 1)
+
+        if min_workers < 0:
+            raise ValueError("min_workers must be greater than or equal to 0")
+        if max_workers < 1 or max_workers < min_workers:
+            raise ValueError("max_workers must be at least 1 and not less than min_workers")
+        if max_tasks_per_worker is not None and max_tasks_per_worker < 1:
+            raise ValueError("max_tasks_per_worker must be at least 1")
+
+        self._plugin = plugin
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        self._idle_timeout = idle_timeout
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._daemon = daemon
+        self._configure_child_process_logger = configure_child_process_logger
+        self._start_method = start_method
+
+        lock = Lock()
+        self._condition = Condition(lock)
+        # Notified when the set of idle workers that may expire changes
+        self._expiry_condition = Condition(lock)
+        self._idle_workers: List[_PluginWorker] = []
+        self._num_workers = 0
+        self._shutdown = False
+
+        self._reaper: Optional[Thread] = None
+
+        self._replenish()
+
+        if idle_timeout is not None:
+            self._reaper = Thread(
+                target=self._reap_idle_workers, name=f"{self.name}-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def run(self, **kwargs) -> Any:
+        """
+        Run the plugin on an idle worker process and return the result
+
+        If all workers are busy and the pool is at its maximum size, this method blocks until a
+        worker becomes available. Exceptions raised by the plugin are re-raised in the calling
+        process.
+
+        :return: The data that the plugin returned
+        :raises RuntimeError: If the pool has been shut down or the worker process exited
+                              unexpectedly
+        """
+        worker = self._acquire_worker()
+
+        try:
+            return worker.plugin.run(**kwargs)
+        finally:
+            # If the worker is no longer alive, the call failed in a way that left it unusable
+            if worker.plugin.is_alive():
+                self._release_worker(worker)
+            else:
+                self._discard_worker(worker)
+
+    def shutdown(self):
+        """
+        Stop all worker processes
+
+        Idle workers are stopped immediately. Busy workers are stopped as soon as their current call
+        to `run()` completes. After the pool has been shut down, calls to `run()` will fail.
+        """
+        with self._condition:
+            self._shutdown = True
+            idle_workers = self._idle_workers
+            self._idle_workers = []
+            self._num_workers -= len(idle_workers)
+            self._condition.notify_all()
+            self._expiry_condition.notify()
+
+        self._stop_workers(idle_workers)
+        if self._reaper is not None:
+            self._reaper.join()
+
+    def __enter__(self) -> "PluginProcessPool":
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+
+    @property
+    def num_workers(self) -> int:
+        """The number of worker processes that are currently alive, both busy and idle"""
+        with self._condition:
+            return self._num_workers
+
+    def _acquire_worker(self) -> "_PluginWorker":
+        worker: Optional["_PluginWorker"]
+
+        with self._condition:
+            while True:
+                if self._shutdown:
+                    raise RuntimeError(f"The process pool for {self.name} has been shut down")
+
+                expired_workers = self._remove_expired_workers()
+                if self._idle_workers:
+                    worker = self._idle_workers.pop()
+                    break
+
+                if self._num_workers < self._max_workers:
+                    self._num_workers += 1
+                    worker = None
+                    break
+
+                self._condition.wait()
+
+        self._stop_workers(expired_workers)
+
+        if worker is None:
+            worker = self._start_reserved_worker()
+
+        return worker
+
+    def _reap_idle_workers(self):
+        while True:
+            with self._condition:
+                if self._shutdown:
+                    return
+
+                expired_workers = self._remove_expired_workers()
+                if not expired_workers:
+                    self._expiry_condition.wait(self._time_until_expiry())
+
+            self._stop_workers(expired_workers)
+
+    def _remove_expired_workers(self) -> List["_PluginWorker"]:
+        # Must be called while holding self._condition
+        if self._idle_timeout is None:
+            return []
+
+        now = time.monotonic()
+        expired_workers = []
+        # Idle workers are used in LIFO order, so the workers that have been idle the longest are at
+        # the front of the list.
+        while (
+            self._num_workers > self._min_workers
+            and self._idle_workers
+            and now - self._idle_workers[0].last_used > self._idle_timeout
+        ):
+            expired_workers.append(self._idle_workers.pop(0))
+            self._num_workers -= 1
+
+        return expired_workers
+
+    def _time_until_expiry(self) -> Optional[float]:
+        # Must be called while holding self._condition
+        if (
+            self._idle_timeout is None
+            or self._num_workers <= self._min_workers
+            or not self._idle_workers
+        ):
+            return None
+
+        expiry = self._idle_workers[0].last_used + self._idle_timeout
+        return max(0, expiry - time.monotonic())
+
+    def _release_worker(self, worker: "_PluginWorker"):
+        worker.tasks_completed += 1
+        worker.last_used = time.monotonic()
+
+        worn_out = (
+            self._max_tasks_per_worker is not None
+            and worker.tasks_completed >= self._max_tasks_per_worker
+        )
+
+        with self._condition:
+            if not (self._shutdown or worn_out):
+                self._idle_workers.append(worker)
+                self._condition.notify()
+                self._expiry_condition.notify()
+                return
+
+        logger.debug(f"Retiring a worker process for {self.name}")
+        self._discard_worker(worker)
+
+    def _discard_worker(self, worker: "_PluginWorker"):
+        with self._condition:
+            self._num_workers -= 1
+            self._condition.notify()
+
+        self._stop_workers([worker])
+        self._replenish()
+
+    def _replenish(self):
+        # Keep at least `min_workers` warm workers so that the next call to `run()` doesn't have to
+        # wait for the plugin to be imported.
+        while True:
+            with self._condition:
+                if self._shutdown or self._num_workers >= self._min_workers:
+                    return
+                self._num_workers += 1
+
+            worker = self._start_reserved_worker()
+
+            with self._condition:
+                self._idle_workers.append(worker)
+                self._condition.notify()
+                self._expiry_condition.notify()
+
+    def _start_reserved_worker(self) -> "_PluginWorker":
+        try:
+            worker = _PluginWorker(
+                PersistentMultiprocessingPlugin(
+                    plugin=self._plugin,
+                    daemon=self._daemon,
+                    configure_child_process_logger=self._configure_child_process_logger,
+                    start_method=self._start_method,
+                )
+            )
+            worker.plugin.start()
+            return worker
+        except BaseException:
+            with self._condition:
+                self._num_workers -= 1
+                self._condition.notify()
+            raise
+
+    @staticmethod
+    def _stop_workers(workers: List["_PluginWorker"]):
+        for worker in workers:
+            worker.plugin.shutdown()
+
+
+class _PluginWorker:
+    """
+    Bookkeeping for a PersistentMultiprocessingPlugin that belongs to a PluginProcessPool
+    """
+
+    def __init__(self, plugin: PersistentMultiprocessingPlugin):
+        self.plugin = plugin
+        self.tasks_completed = 0
+        self.last_used = time.monotonic()
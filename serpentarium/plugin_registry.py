@@ -0,0 +1,240 @@
+import os
+import threading
+from pathlib import Path, PurePosixPath
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    TypeVar,
+    overload,
+)
+
+from . import MultiUsePlugin, SingleUsePlugin
+from .constants import PLUGIN_ARCHIVE_SUFFIX, VENDOR_DIRECTORY_NAME
+
+if TYPE_CHECKING:
+    from .plugin_loader import PluginLoader
+
+_IGNORED_DIRECTORIES = {"__pycache__"}
+
+PluginT = TypeVar("PluginT", bound=SingleUsePlugin)
+
+
+class PluginMetadata(NamedTuple):
+    """Information about a plugin that can be gathered without loading it"""
+
+    name: str
+    # The plugin's directory or plugin archive
+    path: Path
+    is_archive: bool
+    # The modification time of the plugin's directory or archive, in seconds since the epoch
+    mtime: float
+    # The total size, in bytes, of the files in the plugin's vendor directory
+    vendor_size: int
+
+
+class PluginRegistry(Mapping[str, PluginMetadata]):
+    """
+    A lazily populated registry of the plugins that a PluginLoader can load
+
+    A PluginRegistry is a read-only mapping of plugin names to PluginMetadata. Nothing is read from
+    the plugin directory until the registry is used: plugins are discovered the first time the
+    registry is iterated over, and a plugin's metadata is gathered the first time it is requested.
+    Metadata is cached until the plugin's directory or archive, or its vendor directory, is
+    modified.
+
+    Every plugin directory entry whose name is a valid Python identifier is considered to be a
+    plugin, as is every `<plugin_name>.zip` file. If both a directory and an archive exist for the
+    same plugin, the directory is used.
+    """
+
+    def __init__(self, plugin_loader: "PluginLoader"):
+        """
+        :param plugin_loader: The PluginLoader that loads the registered plugins
+        """
+        self._plugin_loader = plugin_loader
+        self._plugin_directory = plugin_loader.plugin_directory
+        self._lock = threading.Lock()
+        self._names: Optional[List[str]] = None
+        self._metadata: Dict[str, Tuple[Tuple[int, int], PluginMetadata]] = {}
+        self._plugins: Dict[str, MultiUsePlugin] = {}
+
+    def __iter__(self) -> Iterator[str]:
+        names = self._names
+        if names is not None:
+            yield from names
+            return
+
+        discovered_names = []
+        for name in self._discover():
+            discovered_names.append(name)
+            yield name
+
+        self._names = discovered_names
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, plugin_name: object) -> bool:
+        return self._plugin_path(plugin_name) is not None
+
+    def __getitem__(self, plugin_name: str) -> PluginMetadata:
+        plugin_path = self._plugin_path(plugin_name)
+        if plugin_path is None:
+            raise KeyError(plugin_name)
+
+        signature = _signature(plugin_path)
+        with self._lock:
+            cached = self._metadata.get(plugin_name)
+            if cached is not None and cached[0] == signature and cached[1].path == plugin_path:
+                return cached[1]
+
+        metadata = _gather_metadata(plugin_name, plugin_path)
+        with self._lock:
+            self._metadata[plugin_name] = (signature, metadata)
+
+        return metadata
+
+    def refresh(self):
+        """
+        Discard the cached list of plugins and their metadata
+        """
+        with self._lock:
+            self._names = None
+            self._metadata.clear()
+
+    @overload
+    def plugin(self, plugin_name: str) -> MultiUsePlugin:
+        ...
+
+    @overload
+    def plugin(self, plugin_name: str, plugin_factory: Callable[..., PluginT]) -> PluginT:
+        ...
+
+    def plugin(
+        self,
+        plugin_name: str,
+        plugin_factory: Optional[Callable[..., SingleUsePlugin]] = None,
+    ) -> SingleUsePlugin:
+        """
+        Get a registered plugin
+
+        By default, the plugin runs in the host process. It is constructed with
+        `PluginLoader.load()` the first time it is requested, and the same object is returned
+        afterwards.
+
+        If `plugin_factory` is provided, a new plugin is constructed by calling it with the
+        plugin's name as the `plugin_name` keyword argument every time this method is called, since
+        plugins such as MultiprocessingPlugins can only be run once. For example,
+        `registry.plugin(name, plugin_loader.load_multiprocessing_plugin)` runs the plugin in a
+        separate process. Use `functools.partial()` to pass other options to the factory.
+
+        :param plugin_name: The name of the plugin
+        :param plugin_factory: A callable, such as one of the PluginLoader's `load_*()` methods,
+                               that constructs the plugin, defaults to `None`
+        :raises KeyError: If the plugin does not exist
+        :return: The plugin
+        """
+        if plugin_name not in self:
+            raise KeyError(plugin_name)
+
+        if plugin_factory is not None:
+            return plugin_factory(plugin_name=plugin_name)
+
+        with self._lock:
+            plugin = self._plugins.get(plugin_name)
+            if plugin is None:
+                plugin = self._plugin_loader.load(plugin_name=plugin_name)
+                self._plugins[plugin_name] = plugin
+
+        return plugin
+
+    def _discover(self) -> Iterator[str]:
+        archive_names = []
+        seen_names = set()
+
+        with os.scandir(self._plugin_directory) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name.isidentifier() and entry.name not in _IGNORED_DIRECTORIES:
+                        seen_names.add(entry.name)
+                        yield entry.name
+                elif entry.name.endswith(PLUGIN_ARCHIVE_SUFFIX):
+                    name = entry.name[: -len(PLUGIN_ARCHIVE_SUFFIX)]
+                    if name.isidentifier():
+                        archive_names.append(name)
+
+        # Archives are yielded last, so that plugins that also have a directory are only yielded
+        # once
+        yield from (name for name in archive_names if name not in seen_names)
+
+    def _plugin_path(self, plugin_name: object) -> Optional[Path]:
+        if not isinstance(plugin_name, str) or not plugin_name.isidentifier():
+            return None
+
+        plugin_path = self._plugin_directory / plugin_name
+        if plugin_path.is_dir():
+            return plugin_path
+
+        plugin_path = self._plugin_directory / f"{plugin_name}{PLUGIN_ARCHIVE_SUFFIX}"
+        if plugin_path.is_file():
+            return plugin_path
+
+        return None
+
+
+def _signature(plugin_path: Path) -> Tuple[int, int]:
+    return (_mtime_ns(plugin_path), _mtime_ns(plugin_path / VENDOR_DIRECTORY_NAME))
+
+
+def _mtime_ns(path: Path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return -1
+
+
+def _gather_metadata(plugin_name: str, plugin_path: Path) -> PluginMetadata:
+    is_archive = plugin_path.is_file()
+    if is_archive:
+        vendor_size = _archive_vendor_size(plugin_path)
+    else:
+        vendor_size = _directory_size(plugin_path / VENDOR_DIRECTORY_NAME)
+
+    return PluginMetadata(
+        name=plugin_name,
+        path=plugin_path,
+        is_archive=is_archive,
+        mtime=os.stat(plugin_path).st_mtime,
+        vendor_size=vendor_size,
+    )
+
+
+def _directory_size(directory: Path) -> int:
+    size = 0
+    for root, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            try:
+                size += os.stat(os.path.join(root, file_name)).st_size
+            except OSError:
+                pass
+
+    return size
+
+
+def _archive_vendor_size(archive_path: Path) -> int:
+    # zipfile imports several compression modules, so it is only imported if archives are in use
+    import zipfile
+
+    with zipfile.ZipFile(archive_path) as archive:
+        return sum(
+            info.file_size
+            for info in archive.infolist()
+            if PurePosixPath(info.filename).parts[0] == VENDOR_DIRECTORY_NAME
+        )
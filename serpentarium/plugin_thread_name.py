@@ -1,6 +1,22 @@
 from enum import Enum, auto
+from threading import current_thread
+from typing import Union
 
 
 class PluginThreadName(Enum):
     DEFAULT = auto()
     CALLING_THREAD = auto()
+
+
+def set_main_thread_name(main_thread_name: Union[PluginThreadName, str], calling_thread_name: str):
+    """
+    Set the name of the current thread according to a `main_thread_name` option
+
+    :param main_thread_name: A `PluginThreadName` or a string
+    :param calling_thread_name: The name of the thread that launched the current process
+    """
+    if isinstance(main_thread_name, str):
+        current_thread().name = main_thread_name
+    elif main_thread_name == PluginThreadName.CALLING_THREAD:
+        current_thread().name = calling_thread_name
+    # Otherwise, the process's main thread keeps the interpreter's default name
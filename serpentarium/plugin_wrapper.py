@@ -1,12 +1,26 @@
 import contextlib
 import importlib
 import sys
+import threading
+import time
 from pathlib import Path
 from types import ModuleType
-from typing import Any, Dict, Optional
+from typing import TYPE_CHECKING, Any, Dict, Optional
 
 from . import CLEAN_SYS_MODULES, MultiUsePlugin, NamedPluginMixin
-from .constants import VENDOR_DIRECTORY_NAME
+from .constants import PLUGIN_ARCHIVE_SUFFIX, VENDOR_DIRECTORY_NAME
+from .isolation_mode import IsolationMode
+from .metrics import Metric, MetricsRecorder, child_process_recorder
+from .plugin_module_cache import PluginModuleCache
+
+if TYPE_CHECKING:
+    from importlib.abc import MetaPathFinder
+
+# `sys.modules` and `sys.path` are shared by every thread in the process, so only one plugin can be
+# imported in isolation at a time. The lock is held while the import system is swapped, which
+# includes a plugin's first run if it was not loaded beforehand. A reentrant lock allows a plugin to
+# load another plugin while it is isolated.
+_ISOLATION_LOCK = threading.RLock()
 
 
 class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
@@ -16,6 +30,13 @@ class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
     Plugins are isolated by manipulating the import system. This needs to be performed just before
     the plugin is run and the import system must be restored to how it was before it was manipulated
     by this component and the plugin.
+
+    PluginWrappers may be loaded and run from multiple threads. Isolated loads are serialized by a
+    process-wide lock, which is also held during a plugin's first `run()` if the plugin was not
+    loaded beforehand, so that the plugin can import its vendored dependencies from within `run()`.
+    Call `load()` ahead of time to keep the lock from being held while the plugin runs. A plugin
+    that is loaded ahead of time runs with the host's import system in place, so it must import its
+    dependencies when its modules are imported.
     """
 
     def __init__(
@@ -24,6 +45,10 @@ class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
         plugin_name: str,
         plugin_directory: Path,
         reset_modules_cache: bool = True,
+        module_cache: Optional[PluginModuleCache] = None,
+        isolation_mode: IsolationMode = IsolationMode.SYS_PATH,
+        bytecode_cache_directory: Optional[Path] = None,
+        metrics_recorder: Optional[MetricsRecorder] = None,
         **kwargs,
     ):
         super().__init__(plugin_name=plugin_name)
@@ -32,15 +57,30 @@ class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
         self._vendor_directory = self._plugin_directory / VENDOR_DIRECTORY_NAME
         self.plugin: Optional[MultiUsePlugin] = None
         self._reset_modules_cache = reset_modules_cache
+        # The cache only holds modules that were imported into a clean `sys.modules`
+        self._module_cache = module_cache if reset_modules_cache else None
+        self._isolation_mode = isolation_mode
+        self._finder: Optional["MetaPathFinder"] = None
+        self._bytecode_cache_directory = bytecode_cache_directory
+        self._metrics_recorder = metrics_recorder
 
         self._constructor_kwargs = kwargs
 
+    def __getstate__(self) -> Dict[str, Any]:
+        # Metrics that are recorded in a child process are sent to the host's recorder by the
+        # MultiprocessingPlugin that runs this plugin
+        state = self.__dict__.copy()
+        state["_metrics_recorder"] = child_process_recorder(self._metrics_recorder)
+
+        return state
+
     def run(self, **kwargs) -> Any:
         # After a plugin has been imported and run, it contains references to its own
         # modules/dependencies. Therefore, we don't need to use `self._plugin_import_context()` in
         # order to isolate after the initial run.
-        if self.plugin is not None:
-            return self.plugin.run(**kwargs)
+        plugin = self.plugin
+        if plugin is not None:
+            return self._run_plugin(plugin, **kwargs)
 
         return self._run_in_isolated_context(**kwargs)
 
@@ -50,8 +90,10 @@ class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
 
         with self._plugin_import_context():
             try:
-                self.plugin = self._load_plugin()
-                result = self.plugin.run(**kwargs)
+                # Another thread may have loaded the plugin while this one waited for the lock
+                plugin = self.plugin if self.plugin is not None else self._load_plugin()
+                self.plugin = plugin
+                result = self._run_plugin(plugin, **kwargs)
             except Exception as ex:
                 exception = ex
 
@@ -60,50 +102,208 @@ class PluginWrapper(NamedPluginMixin, MultiUsePlugin):
 
         return result
 
+    def _run_plugin(self, plugin: MultiUsePlugin, **kwargs) -> Any:
+        if self._metrics_recorder is None:
+            return plugin.run(**kwargs)
+
+        start = time.perf_counter()
+        return_value = plugin.run(**kwargs)
+        self._metrics_recorder.record(self.name, Metric.RUN_TIME, time.perf_counter() - start)
+
+        return return_value
+
+    @property
+    def metrics_recorder(self) -> Optional[MetricsRecorder]:
+        """The MetricsRecorder that the plugin's import and run times are recorded with, if any"""
+        return self._metrics_recorder
+
+    def load(self):
+        """
+        Import and construct the plugin in an isolated context without running it
+
+        Loading is normally performed the first time `run()` is called. Calling this method ahead of
+        time moves the cost of importing the plugin and its dependencies out of the first call to
+        `run()`, which then runs without holding the isolation lock. If the plugin has already been
+        loaded, this method does nothing.
+        """
+        if self.plugin is not None:
+            return
+
+        exception = None
+
+        with self._plugin_import_context():
+            try:
+                # Another thread may have loaded the plugin while this one waited for the lock
+                if self.plugin is None:
+                    self.plugin = self._load_plugin()
+            except Exception as ex:
+                exception = ex
+
+        if exception is not None:
+            raise exception
+
+    def precompile(self) -> bool:
+        """
+        Compile the plugin's modules and its vendored dependencies to bytecode
+
+        The bytecode is written to the bytecode cache directory, if one was provided, or to
+        `__pycache__` directories within the plugin's directory otherwise. Plugin archives already
+        contain bytecode, so they are not compiled.
+
+        :return: True if all modules were compiled successfully, False otherwise
+        """
+        if self._is_plugin_archive():
+            return True
+
+        # compileall imports importlib.resources, which is only needed if plugins are precompiled
+        import compileall
+
+        with _ISOLATION_LOCK:
+            with self._bytecode_cache_prefix():
+                return bool(compileall.compile_dir(str(self._plugin_directory), quiet=1, workers=1))
+
     @contextlib.contextmanager
     def _plugin_import_context(self):
         """
         This context manager performs the following:
 
-        1. Save the state of sys.modules
-        2. Reset sys.modules to the interpreter's defaults
-        3. Configure the import system to import the plugin and its dependencies
-        4. yield
-        5. Restore the state of the import system.
+        1. Acquire the isolation lock and set the bytecode cache directory
+        2. Save the state of sys.modules
+        3. Reset sys.modules to the interpreter's defaults
+        4. Configure the import system to import the plugin and its dependencies, either with
+           `sys.path` or `sys.meta_path` depending on the isolation mode
+        5. yield
+        6. Restore the state of the import system.
+        7. Release the isolation lock and restore the bytecode cache directory
         """
 
-        if self._reset_modules_cache:
-            with self._clean_system_modules():
-                with self._plugin_import_path():
+        with _ISOLATION_LOCK, self._bytecode_cache_prefix():
+            # The import hook is chosen before sys.modules is reset, since choosing it may import
+            # serpentarium's finders, which must be imported into the host's sys.modules
+            import_hook = self._plugin_import_hook()
+            if self._reset_modules_cache:
+                with self._clean_system_modules():
+                    with import_hook:
+                        yield
+            else:
+                with import_hook:
                     yield
-        else:
-            with self._plugin_import_path():
-                yield
+
+    @contextlib.contextmanager
+    def _bytecode_cache_prefix(self):
+        # NOTE: sys.pycache_prefix was added in Python 3.8. Setting it has no effect on Python 3.7.
+        if self._bytecode_cache_directory is None:
+            yield
+            return
+
+        host_pycache_prefix = getattr(sys, "pycache_prefix", None)
+        sys.pycache_prefix = str(self._bytecode_cache_directory)
+
+        try:
+            yield
+        finally:
+            sys.pycache_prefix = host_pycache_prefix
+
+    def _plugin_import_hook(self):
+        # Plugin archives can only be imported from with a meta path finder
+        if self._isolation_mode == IsolationMode.META_PATH or self._is_plugin_archive():
+            if self._finder is None:
+                # The finders import the modules needed to read manifests and archives, so they
+                # are only imported by plugins that use them
+                from .plugin_finder import create_plugin_finder
+
+                self._finder = create_plugin_finder(self.name, self._plugin_directory)
+
+            return self._plugin_meta_path()
+
+        return self._plugin_import_path()
+
+    def _is_plugin_archive(self) -> bool:
+        # The suffix is checked first so that plugin_archive, which imports the modules needed to
+        # read archives, is only imported if archives are in use
+        if self._plugin_directory.suffix != PLUGIN_ARCHIVE_SUFFIX:
+            return False
+
+        from .plugin_archive import is_plugin_archive
+
+        return is_plugin_archive(self._plugin_directory)
 
     @contextlib.contextmanager
     def _clean_system_modules(self):
         host_process_sys_modules = sys.modules.copy()
         PluginWrapper._set_sys_modules(CLEAN_SYS_MODULES)
 
-        yield
-
-        PluginWrapper._set_sys_modules(host_process_sys_modules)
+        try:
+            yield
+        finally:
+            PluginWrapper._set_sys_modules(host_process_sys_modules)
 
     @contextlib.contextmanager
     def _plugin_import_path(self):
-        sys.path = [str(self._plugin_directory.parent), str(self._vendor_directory), *sys.path]
+        plugin_import_paths = [str(self._plugin_directory.parent), str(self._vendor_directory)]
+        sys.path = [*plugin_import_paths, *sys.path]
 
-        yield
+        try:
+            yield
+        finally:
+            # The plugin may have modified sys.path, so remove exactly the entries that were added
+            for path in plugin_import_paths:
+                try:
+                    sys.path.remove(path)
+                except ValueError:
+                    pass
 
-        sys.path = sys.path[2:]
+    @contextlib.contextmanager
+    def _plugin_meta_path(self):
+        sys.meta_path.insert(0, self._finder)
+
+        try:
+            yield
+        finally:
+            try:
+                sys.meta_path.remove(self._finder)
+            except ValueError:
+                pass
 
     @staticmethod
     def _set_sys_modules(modules: Dict[str, ModuleType]):
         # WARNING: Attempting to set sys.modules like `sys.modules = modules` may cause Python to
         #          fail. See https://docs.python.org/3/library/sys.html#sys.modules
+        #
+        # NOTE: Updating an empty dict from another dict copies the other dict's hash table in one
+        #       step, so clearing and refilling sys.modules is several times faster than deleting
+        #       and restoring only the entries that differ, even when the host has imported many
+        #       thousands of modules. See benchmarks/isolation_overhead.py.
         sys.modules.clear()
         sys.modules.update(modules)
 
     def _load_plugin(self) -> MultiUsePlugin:
+        start = time.perf_counter()
+
+        cached_modules = None
+        if self._module_cache is not None:
+            cached_modules = self._module_cache.get(self.name, self._plugin_directory)
+
+        if cached_modules is not None:
+            sys.modules.update(cached_modules)
+
         plugin_class = importlib.import_module(f"{self.name}.plugin").Plugin
-        return plugin_class(plugin_name=self.name, **self._constructor_kwargs)
+        plugin = plugin_class(plugin_name=self.name, **self._constructor_kwargs)
+
+        if self._module_cache is not None and cached_modules is None:
+            self._module_cache.put(self.name, self._plugin_directory, self._plugin_modules())
+
+        if self._metrics_recorder is not None:
+            self._metrics_recorder.record(
+                self.name, Metric.IMPORT_TIME, time.perf_counter() - start
+            )
+
+        return plugin
+
+    @staticmethod
+    def _plugin_modules() -> Dict[str, ModuleType]:
+        return {
+            name: module
+            for name, module in sys.modules.items()
+            if CLEAN_SYS_MODULES.get(name) is not module
+        }
@@ -0,0 +1,69 @@
+import multiprocessing
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable, Union
+
+from .constants import SERPENTARIUM
+
+if TYPE_CHECKING:
+    from multiprocessing.context import ForkServerContext, SpawnContext
+
+    MultiprocessingContext = Union[SpawnContext, ForkServerContext]
+
+_forkserver_preload_configured = False
+
+
+class ProcessStartMethod(Enum):
+    """
+    The method used to start the processes that plugins run in
+
+    SPAWN starts a fresh interpreter for every plugin process. FORKSERVER starts a single clean
+    template process that has serpentarium and any other preloaded modules imported, and forks
+    every plugin process from it, which avoids booting an interpreter and re-importing modules each
+    time a plugin is run. FORKSERVER is only available on POSIX platforms.
+    """
+
+    SPAWN = "spawn"
+    FORKSERVER = "forkserver"
+
+
+def set_forkserver_preload(module_names: Iterable[str]):
+    """
+    Set the modules that are imported into the forkserver's template process
+
+    The preloaded modules are global to the interpreter: every plugin, and every PluginLoader, that
+    uses `ProcessStartMethod.FORKSERVER` shares the same template process, and calling this again
+    replaces the modules that were set before.
+
+    Serpentarium is always preloaded. The preloaded modules are imported before serpentarium, so
+    they become part of the clean import state that plugins are isolated into. This means that they
+    are shared by all plugins rather than being isolated between them, so only modules that are
+    common to the host and all plugins should be preloaded.
+
+    This must be called before the first plugin that uses `ProcessStartMethod.FORKSERVER` is
+    started, as the template process is started only once.
+
+    :param module_names: The names of the modules to preload
+    """
+    global _forkserver_preload_configured
+
+    multiprocessing.get_context("forkserver").set_forkserver_preload([*module_names, SERPENTARIUM])
+    _forkserver_preload_configured = True
+
+
+def get_multiprocessing_context(start_method: ProcessStartMethod) -> "MultiprocessingContext":
+    """
+    Get a multiprocessing context for a ProcessStartMethod
+
+    Any Locks, Events, or other synchronization primitives that are passed to a plugin must be
+    created by the context that matches the plugin's start method.
+
+    :param start_method: A ProcessStartMethod
+    :return: A multiprocessing context that uses the provided start method
+    """
+    if start_method == ProcessStartMethod.FORKSERVER:
+        if not _forkserver_preload_configured:
+            set_forkserver_preload([])
+
+        return multiprocessing.get_context("forkserver")
+
+    return multiprocessing.get_context("spawn")
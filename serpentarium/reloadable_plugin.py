@@ -0,0 +1,188 @@
+import logging
+import os
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from . import MultiUsePlugin, NamedPluginMixin
+from .constants import DEFAULT_POLL_INTERVAL, SERPENTARIUM, VENDOR_DIRECTORY_NAME
+from .plugin_wrapper import PluginWrapper
+
+logger = logging.getLogger(SERPENTARIUM)
+
+_IGNORED_DIRECTORIES = {"__pycache__"}
+
+# A path, its mtime in nanoseconds, and its size
+PathSignature = Tuple[str, int, int]
+TreeSignature = Tuple[PathSignature, ...]
+
+
+class ReloadablePlugin(NamedPluginMixin, MultiUsePlugin):
+    """
+    A plugin that is reloaded in the host process when its files change
+
+    A watcher thread polls the plugin's directory or archive. When a change is detected and the
+    plugin's files have stopped changing, a new instance of the plugin is loaded in isolation in the
+    background and then swapped in atomically. Calls to `run()` that start after the swap use the
+    new instance. Calls that are already in progress finish on the old instance, which is discarded,
+    along with its modules, once they complete. If the new instance fails to load, the error is
+    logged and the old instance remains in use.
+
+    By default, each poll only stats the plugin's directory, its vendor directory, and the entries
+    directly inside of them, which include the plugin's manifest. This detects a change to any file
+    at the top level of either directory and any file that is added to or removed from a
+    subdirectory, but not a file that is modified in place inside a subdirectory. Set
+    `watch_recursively` to stat every file in the plugin's directory tree instead, which detects
+    every change but costs one `stat()` call per file on every poll.
+
+    Call `stop()` to stop the watcher thread when the plugin is no longer needed.
+    """
+
+    def __init__(
+        self,
+        *,
+        plugin_factory: Callable[[], PluginWrapper],
+        plugin_path: Path,
+        poll_interval: Optional[float] = DEFAULT_POLL_INTERVAL,
+        watch_recursively: bool = False,
+    ):
+        """
+        :param plugin_factory: A callable that constructs a new, unloaded instance of the plugin
+        :param plugin_path: The plugin's directory or plugin archive, which is watched for changes
+        :param poll_interval: A floating-point number of seconds between checks for changes. If
+                              `None`, the plugin is only reloaded when `reload()` is called.
+                              Defaults to 1 second.
+        :param watch_recursively: Whether to watch every file in the plugin's directory tree rather
+                                  than only the top level of its directory and vendor directory,
+                                  defaults to False
+        """
+        plugin = plugin_factory()
+        super().__init__(plugin_name=plugin.name)
+
+        self._plugin_factory = plugin_factory
+        self._plugin_path = plugin_path
+        self._poll_interval = poll_interval
+        self._watch_recursively = watch_recursively
+
+        self._lock = Lock()
+        self._reload_lock = Lock()
+        self._signature = self._tree_signature()
+        self._plugin = plugin
+
+        self._stop_event = Event()
+        self._watcher: Optional[Thread] = None
+        if poll_interval is not None:
+            self._watcher = Thread(target=self._watch, name=f"{self.name}-reloader", daemon=True)
+            self._watcher.start()
+
+    def run(self, **kwargs) -> Any:
+        with self._lock:
+            plugin = self._plugin
+
+        return plugin.run(**kwargs)
+
+    def reload(self):
+        """
+        Load a new instance of the plugin and swap it in
+
+        :raises Exception: If the new instance fails to load. The old instance remains in use.
+        """
+        with self._reload_lock:
+            signature = self._tree_signature()
+            self._reload()
+            self._signature = signature
+
+    def _reload(self):
+        new_plugin = self._plugin_factory()
+        new_plugin.load()
+
+        with self._lock:
+            self._plugin = new_plugin
+
+        logger.info(f"Reloaded plugin {self.name}")
+
+    def _watch(self):
+        while not self._stop_event.wait(self._poll_interval):
+            signature = self._tree_signature()
+            if signature == self._signature:
+                continue
+
+            # Wait for the plugin's files to stop changing, e.g. while a new version is copied
+            # into place
+            if self._stop_event.wait(self._poll_interval):
+                break
+            if self._tree_signature() != signature:
+                continue
+
+            with self._reload_lock:
+                try:
+                    self._reload()
+                except Exception:
+                    logger.exception(f"Failed to reload plugin {self.name}")
+
+                # Don't retry until the plugin changes again
+                self._signature = signature
+
+    def _tree_signature(self) -> TreeSignature:
+        return _tree_signature(self._plugin_path, self._watch_recursively)
+
+    def stop(self):
+        """
+        Stop watching the plugin for changes
+
+        The plugin can still be run and reloaded with `reload()` after it has been stopped.
+        """
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join()
+
+    def __enter__(self) -> "ReloadablePlugin":
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+
+def _tree_signature(plugin_path: Path, recursive: bool) -> TreeSignature:
+    try:
+        if plugin_path.is_file():
+            return (_stat(str(plugin_path)),)
+    except OSError:
+        return ()
+
+    signature: List[PathSignature] = []
+    if recursive:
+        for root, directory_names, file_names in os.walk(plugin_path):
+            directory_names[:] = [
+                name for name in directory_names if name not in _IGNORED_DIRECTORIES
+            ]
+            signature.extend(_stat_all(os.path.join(root, name) for name in file_names))
+    else:
+        # A directory's mtime changes when an entry is added to, removed from, or renamed in it
+        directories = [str(plugin_path), str(plugin_path / VENDOR_DIRECTORY_NAME)]
+        signature.extend(_stat_all(directories))
+        for directory in directories:
+            signature.extend(_stat_all(_list_directory(directory)))
+
+    return tuple(sorted(signature))
+
+
+def _list_directory(directory: str) -> List[str]:
+    try:
+        with os.scandir(directory) as entries:
+            return [entry.path for entry in entries if entry.name not in _IGNORED_DIRECTORIES]
+    except OSError:
+        return []
+
+
+def _stat_all(paths: Iterable[str]) -> Iterator[PathSignature]:
+    for path in paths:
+        try:
+            yield _stat(path)
+        except OSError:
+            continue
+
+
+def _stat(path: str) -> PathSignature:
+    stat_result = os.stat(path)
+    return (path, stat_result.st_mtime_ns, stat_result.st_size)
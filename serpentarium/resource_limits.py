@@ -0,0 +1,94 @@
+"""
+Limits on, and accounting of, the resources that a plugin's process uses
+
+Resource limits are applied with `setrlimit()` and `setpriority()`, so they are only available on
+POSIX platforms.
+"""
+
+import os
+import sys
+from typing import NamedTuple, Optional
+
+
+class ResourceLimits(NamedTuple):
+    """
+    Limits on the resources that a plugin's process may use
+
+    A limit of None leaves the process's current limit in place. Limits are applied as both the soft
+    and the hard limit, so the plugin can't raise them again. A limit that is higher than the
+    process's current hard limit is lowered to the hard limit.
+    """
+
+    # The maximum size of the process's virtual memory in bytes. Allocations beyond it fail with a
+    # MemoryError.
+    address_space: Optional[int] = None
+    # The maximum resident set size in bytes. Only some platforms enforce this limit; Linux ignores
+    # it, so use `address_space` to cap the memory of a plugin on Linux.
+    rss: Optional[int] = None
+    # The maximum number of seconds of CPU time. The process is killed by SIGXCPU when it exceeds
+    # the limit.
+    cpu_time: Optional[int] = None
+    # The maximum number of open file descriptors
+    open_files: Optional[int] = None
+    # The process's niceness, from -20 (highest priority) to 19 (lowest priority). Raising a
+    # process's priority usually requires elevated privileges.
+    nice: Optional[int] = None
+
+
+class ResourceUsage(NamedTuple):
+    """The resources that a plugin's process used"""
+
+    # The peak resident set size in bytes
+    peak_rss: int
+    # The user and system CPU time in seconds
+    cpu_time: float
+
+
+def apply_resource_limits(limits: ResourceLimits):
+    """
+    Apply resource limits to the current process
+
+    :param limits: The limits to apply
+    :raises NotImplementedError: If the platform does not support resource limits
+    :raises OSError: If a limit could not be applied
+    """
+    try:
+        import resource
+    except ImportError:
+        raise NotImplementedError("Resource limits are only supported on POSIX platforms")
+
+    for resource_id, limit in [
+        (resource.RLIMIT_AS, limits.address_space),
+        (resource.RLIMIT_RSS, limits.rss),
+        (resource.RLIMIT_CPU, limits.cpu_time),
+        (resource.RLIMIT_NOFILE, limits.open_files),
+    ]:
+        if limit is None:
+            continue
+
+        _, hard_limit = resource.getrlimit(resource_id)
+        if hard_limit != resource.RLIM_INFINITY:
+            limit = min(limit, hard_limit)
+
+        resource.setrlimit(resource_id, (limit, limit))
+
+    if limits.nice is not None:
+        os.setpriority(os.PRIO_PROCESS, 0, limits.nice)
+
+
+def get_resource_usage() -> Optional[ResourceUsage]:
+    """
+    Get the resources that the current process has used so far
+
+    :return: The process's ResourceUsage, or None if the platform does not support it
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    # ru_maxrss is in bytes on macOS and in kibibytes elsewhere
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+
+    return ResourceUsage(peak_rss=peak_rss, cpu_time=usage.ru_utime + usage.ru_stime)
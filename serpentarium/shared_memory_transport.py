@@ -0,0 +1,175 @@
+"""
+A Transport that moves large buffers between processes through shared memory
+
+This module requires Python 3.8 or later.
+"""
+
+import io
+import pickle  # nosec B403  # Only data pickled by a plugin that the host runs is unpickled
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Tuple
+
+from .transport import Transport
+
+DEFAULT_THRESHOLD = 1024 * 1024  # bytes
+
+# Persistent IDs that describe a bytes-like object, see _SharedMemoryPickler.persistent_id()
+_SHARED = "shared"
+_INLINE = "inline"
+
+_BUFFER_TYPES: Dict[type, str] = {
+    bytes: "bytes",
+    bytearray: "bytearray",
+    memoryview: "memoryview",
+}
+
+SegmentDescriptor = Tuple[str, int]
+
+
+class SharedMemoryTransport(Transport):
+    """
+    A Transport that sends large buffers through shared memory instead of a Pipe
+
+    Normally, a plugin's return value is pickled, written to a Pipe, read by the host, and
+    unpickled, which copies every buffer several times. SharedMemoryTransport copies any bytes,
+    bytearray, or memoryview that is at least `threshold` bytes long into its own
+    `multiprocessing.shared_memory.SharedMemory` segment, as well as any out-of-band buffer that an
+    object provides to pickle protocol 5 (e.g. a `pickle.PickleBuffer` or a numpy array). Only the
+    segments' names and the rest of the pickled object are sent through the Pipe.
+
+    This is not zero-copy. The plugin's process copies each buffer into a segment, and the host
+    copies it out of the segment again, so that the object that is returned doesn't depend on the
+    segment staying open. What is saved is pickling the buffers and writing them through the Pipe.
+
+    The host owns the segments: it closes and unlinks each segment as soon as its buffer has been
+    copied out, so the caller never needs to release them.
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD):
+        """
+        :param threshold: The minimum size, in bytes, of a buffer that is sent through shared
+                          memory. Smaller buffers are pickled as usual. Defaults to 1 MiB.
+        """
+        if threshold < 1:
+            raise ValueError("threshold must be at least 1")
+
+        self._threshold = threshold
+
+    def send(self, connection: Connection, obj: Any) -> int:
+        segments: List[SharedMemory] = []
+        try:
+            out_of_band_buffers: List[SegmentDescriptor] = []
+            payload = io.BytesIO()
+            pickler = _SharedMemoryPickler(
+                payload, self._threshold, segments, out_of_band_buffers.append
+            )
+            pickler.dump(obj)
+
+            connection.send_bytes(payload.getbuffer())
+            connection.send(out_of_band_buffers)
+
+            return payload.getbuffer().nbytes + pickler.shared_bytes
+        except BaseException:
+            # The host will never receive the segments, so they must be cleaned up here
+            for segment in segments:
+                segment.unlink()
+            raise
+        finally:
+            for segment in segments:
+                segment.close()
+
+    def recv(self, connection: Connection) -> Any:
+        payload = connection.recv_bytes()
+        out_of_band_buffers = connection.recv()
+        buffers = [_read_segment(descriptor, bytearray) for descriptor in out_of_band_buffers]
+
+        return _SharedMemoryUnpickler(io.BytesIO(payload), buffers=buffers).load()
+
+
+class _SharedMemoryPickler(pickle.Pickler):
+    def __init__(
+        self,
+        file: io.BytesIO,
+        threshold: int,
+        segments: List[SharedMemory],
+        add_out_of_band_buffer: Callable[[SegmentDescriptor], None],
+    ):
+        super().__init__(file, protocol=5, buffer_callback=self._buffer_callback)
+        self._threshold = threshold
+        self._segments = segments
+        self._add_out_of_band_buffer = add_out_of_band_buffer
+        # The number of bytes that were copied into shared memory
+        self.shared_bytes = 0
+
+    def persistent_id(self, obj: Any) -> Any:
+        # bytes, bytearray, and memoryview objects are always pickled in-band (or not at all), so
+        # they are intercepted here instead of in the buffer callback.
+        buffer_type = _BUFFER_TYPES.get(type(obj))
+        if buffer_type is None:
+            return None
+
+        view = memoryview(obj)
+        if view.nbytes < self._threshold:
+            if buffer_type != "memoryview":
+                return None
+
+            # memoryviews can't be pickled, so small ones are copied in-band
+            return (_INLINE, buffer_type, view.tobytes(), view.format, view.shape)
+
+        return (_SHARED, buffer_type, self._write_segment(view), view.format, view.shape)
+
+    def _buffer_callback(self, buffer: pickle.PickleBuffer) -> bool:
+        view = buffer.raw()
+        if view.nbytes < self._threshold:
+            # Serialize the buffer in-band
+            return True
+
+        self._add_out_of_band_buffer(self._write_segment(view))
+        return False
+
+    def _write_segment(self, view: memoryview) -> SegmentDescriptor:
+        if not view.contiguous:
+            view = memoryview(view.tobytes())
+
+        view = view.cast("B")
+        segment = SharedMemory(create=True, size=max(view.nbytes, 1))
+        self._segments.append(segment)
+        segment.buf[: view.nbytes] = view
+        self.shared_bytes += view.nbytes
+
+        return (segment.name, view.nbytes)
+
+
+class _SharedMemoryUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid: Any) -> Any:
+        location, buffer_type, data, format, shape = pid
+
+        if location == _SHARED:
+            factory = bytes if buffer_type == "bytes" else bytearray
+            data = _read_segment(data, factory)
+
+        if buffer_type == "memoryview":
+            view = memoryview(data)
+            if format != "B" or len(shape) != 1:
+                view = view.cast(format, shape)
+            return view
+
+        return data
+
+
+def _read_segment(descriptor: SegmentDescriptor, factory: Callable[[memoryview], Any]) -> Any:
+    name, size = descriptor
+    segment = SharedMemory(name=name)
+    try:
+        # The name is no longer needed once the segment has been opened, and unlinking it right away
+        # ensures that it isn't leaked if reconstructing the object fails.
+        segment.unlink()
+
+        view = segment.buf[:size]
+        try:
+            return factory(view)
+        finally:
+            view.release()
+    finally:
+        segment.close()
@@ -0,0 +1,151 @@
+import logging
+from threading import Event, Thread
+from typing import Any, Optional
+
+from . import NamedPluginMixin, SingleUsePlugin
+from .cancellation import DEFAULT_GRACE_PERIOD, CancellationOutcome
+from .constants import SERPENTARIUM
+
+logger = logging.getLogger(SERPENTARIUM)
+
+
+class ThreadPlugin(NamedPluginMixin, SingleUsePlugin):
+    """
+    A plugin that runs concurrently in a separate thread of the host process
+
+    A ThreadPlugin can run a PluginWrapper, or any other plugin, in the background so that it can be
+    waited on with a timeout and cancelled. Unlike a process, a thread can't be stopped forcibly, so
+    cancellation relies on the plugin returning promptly once its cancel event is set. A plugin that
+    doesn't is abandoned: it is left running in a daemon thread, which does not keep the host from
+    exiting.
+    """
+
+    def __init__(
+        self,
+        *,
+        plugin: SingleUsePlugin,
+        cancellable: bool = False,
+        cancel_grace_period: Optional[float] = None,
+        **kwargs,
+    ):
+        """
+        :param plugin: A Plugin to run in a separate thread
+        :param cancellable: Whether the plugin's `run()` method accepts a `cancel_event` keyword
+                            argument. If True, the plugin is passed an Event that is set when the
+                            plugin is cancelled, and it should return promptly once the Event is
+                            set. Defaults to `False`.
+        :param cancel_grace_period: If not `None`, `run()` cancels the plugin when its timeout
+                                    expires, and waits up to this many seconds for it to stop. If
+                                    `None`, the plugin is left running when the timeout expires.
+                                    Defaults to `None`.
+        """
+        super().__init__(plugin_name=plugin.name)
+        self._plugin = plugin
+        self._cancellable = cancellable
+        self._cancel_grace_period = cancel_grace_period
+        self._cancel_event = Event()
+
+        self._thread: Optional[Thread] = None
+        self._return_value = None
+
+    def run(self, *, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Run a plugin with the provided keyword arguments and returns the result
+
+        When the timeout argument is not present or None, the operation will block until the
+        plugin stops.
+
+        :param: A floating-point number of seconds to wait for the plugin to run
+
+        :return: The data that the plugin returned
+        """
+        self.start(**kwargs)
+        self.join(timeout)
+
+        if self._cancel_grace_period is not None and self.is_alive():
+            logger.warning(f"{self.name} did not finish within {timeout} seconds")
+            self.cancel(self._cancel_grace_period)
+
+        return self.return_value
+
+    def start(self, **kwargs):
+        """
+        Launch a new thread that runs this plugin
+        """
+        if self._cancellable:
+            kwargs["cancel_event"] = self._cancel_event
+
+        self._thread = Thread(name=self.name, target=self._run, kwargs=kwargs, daemon=True)
+        self._thread.start()
+
+    def _run(self, **kwargs):
+        try:
+            self._return_value = self._plugin.run(**kwargs)
+        except Exception:
+            logger.exception(f"{self.name} raised an exception")
+
+    def join(self, timeout: Optional[float] = None):
+        """
+        Wait for this plugin to stop
+
+        When the timeout argument is not present or None, the operation will block until the
+        plugin stops.
+
+        :param: A floating-point number of seconds to wait for the plugin to run
+        """
+        if self._thread is None:
+            raise AssertionError("can only join a started plugin")
+
+        self._thread.join(timeout)
+
+    def cancel(self, grace_period: float = DEFAULT_GRACE_PERIOD) -> CancellationOutcome:
+        """
+        Stop the plugin by setting its cancel event
+
+        Each step is logged. If the plugin does not stop within the grace period, it is abandoned.
+
+        :param grace_period: A floating-point number of seconds to wait for the plugin to stop after
+                             its cancel event is set, defaults to 5 seconds
+        :return: A CancellationOutcome that describes how the plugin stopped
+        """
+        if self._thread is None:
+            raise AssertionError("can only cancel a started plugin")
+
+        if not self.is_alive():
+            outcome = CancellationOutcome.NOT_RUNNING
+        else:
+            logger.info(f"Cancelling {self.name}")
+            self._cancel_event.set()
+            self.join(grace_period)
+
+            if not self.is_alive():
+                outcome = CancellationOutcome.STOPPED
+            else:
+                logger.error(
+                    f"{self.name} did not stop within {grace_period} seconds of being cancelled, "
+                    "abandoning its thread"
+                )
+                outcome = CancellationOutcome.ABANDONED
+
+        logger.info(f"{self.name} was cancelled: {outcome.name}")
+        return outcome
+
+    def is_alive(self) -> bool:
+        """
+        Return whether the plugin is alive (thread is still running)
+
+        :return: True if the thread/plugin is running. False otherwise.
+        """
+        if self._thread is None:
+            return False
+
+        return self._thread.is_alive()
+
+    @property
+    def return_value(self) -> Any:
+        """
+        The return value of the plugin
+
+        This property will be `None` until the plugin finishes running.
+        """
+        return self._return_value
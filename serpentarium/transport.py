@@ -0,0 +1,79 @@
+import struct
+from multiprocessing.reduction import ForkingPickler
+from typing import TYPE_CHECKING, Any, Optional
+
+from typing_extensions import Protocol
+
+DEFAULT_CHUNK_SIZE = 16 * 1024 * 1024  # bytes
+
+_HEADER = struct.Struct("!Q")
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+
+class Transport(Protocol):
+    """
+    A protocol for sending a plugin's results from a child process to the host process
+
+    A Transport is sent to the child process along with the plugin, so it must be picklable.
+    """
+
+    def send(self, connection: "Connection", obj: Any) -> Optional[int]:
+        """
+        Send an object through a Connection
+
+        :param connection: The Connection to send the object through
+        :param obj: The object to send
+        :return: The size of the serialized object in bytes, or None if it is not known
+        """
+
+    def recv(self, connection: "Connection") -> Any:
+        """
+        Receive an object that was sent through a Connection with `send()`
+
+        :param connection: The Connection to receive the object from
+        :return: The object that was received
+        """
+
+
+class PickleTransport(Transport):
+    """
+    A Transport that pickles objects and sends them through a Connection in chunks
+
+    The pickled object is preceded by its length and split into chunks of at most `chunk_size`
+    bytes. The receiver allocates a single buffer for the whole object and reads each chunk directly
+    into it, so the size of a message is not limited by the Connection and large objects aren't
+    copied while they are reassembled.
+
+    This is the default Transport.
+    """
+
+    def __init__(self, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        :param chunk_size: The maximum number of bytes that are sent in a single message, defaults
+                           to 16 MiB
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        self._chunk_size = chunk_size
+
+    def send(self, connection: "Connection", obj: Any) -> int:
+        payload = memoryview(ForkingPickler.dumps(obj))
+
+        connection.send_bytes(_HEADER.pack(payload.nbytes))
+        for offset in range(0, payload.nbytes, self._chunk_size):
+            connection.send_bytes(payload[offset : offset + self._chunk_size])
+
+        return payload.nbytes
+
+    def recv(self, connection: "Connection") -> Any:
+        (size,) = _HEADER.unpack(connection.recv_bytes(_HEADER.size))
+
+        payload = bytearray(size)
+        offset = 0
+        while offset < size:
+            offset += connection.recv_bytes_into(payload, offset)
+
+        return ForkingPickler.loads(payload)
@@ -0,0 +1,377 @@
+"""
+Precomputed manifests of the modules in a plugin's directory
+
+A manifest maps the full name of every module in a plugin's package and its vendor directory to
+the file that contains it, along with a SHA-256 hash of the file's contents. When a plugin is
+loaded with `IsolationMode.META_PATH`, its modules are resolved from the manifest, so the plugin's
+directories do not need to be searched for each import.
+
+A manifest is considered out of date if any module file or package directory has been added,
+removed, or renamed since it was written. Editing a module in place does not invalidate a manifest,
+since the module is still imported from the same file. Use `verify_manifest()` to detect modified
+files.
+
+Usage: python -m serpentarium.vendor_manifest [--check] PLUGIN_DIRECTORY [PLUGIN_DIRECTORY ...]
+"""
+
+import logging
+import os
+import sys
+from importlib.machinery import BYTECODE_SUFFIXES, EXTENSION_SUFFIXES, SOURCE_SUFFIXES
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .constants import SERPENTARIUM, VENDOR_DIRECTORY_NAME
+
+logger = logging.getLogger(SERPENTARIUM)
+
+MANIFEST_FILE_NAME = "serpentarium_manifest.json"
+MANIFEST_VERSION = 1
+
+# The order in which the default import system prefers a module's files
+_SUFFIX_PRIORITY = [*EXTENSION_SUFFIXES, *SOURCE_SUFFIXES, *BYTECODE_SUFFIXES]
+# Longer suffixes must be checked first, e.g. ".cpython-311-x86_64-linux-gnu.so" before ".so"
+_MODULE_SUFFIXES = sorted(_SUFFIX_PRIORITY, key=len, reverse=True)
+_IGNORED_DIRECTORIES = {"__pycache__"}
+_PACKAGE_INIT = "__init__"
+_HASH_CHUNK_SIZE = 1024 * 1024  # bytes
+
+
+class ManifestEntry(NamedTuple):
+    """A module in a manifest"""
+
+    # The module's file, or the directory of a namespace package, relative to the plugin directory
+    path: str
+    is_package: bool
+    # None for namespace packages
+    sha256: Optional[str]
+
+
+class DirectoryEntry(NamedTuple):
+    """A directory that was scanned to build a manifest"""
+
+    mtime_ns: int
+    # A hash of the names of the modules and packages in the directory
+    listing: str
+
+
+class VendorManifest(NamedTuple):
+    """The modules in a plugin's package and its vendor directory"""
+
+    plugin_name: str
+    modules: Dict[str, ManifestEntry]
+    directories: Dict[str, DirectoryEntry]
+
+
+def build_manifest(plugin_name: str, plugin_directory: Path) -> VendorManifest:
+    """
+    Scan a plugin's directory and build a manifest of its modules
+
+    :param plugin_name: The name of the plugin
+    :param plugin_directory: The directory where the plugin is stored
+    :return: A manifest of the plugin's modules
+    """
+    modules: Dict[str, ManifestEntry] = {}
+    directories: Dict[str, DirectoryEntry] = {}
+
+    vendor_directory = plugin_directory / VENDOR_DIRECTORY_NAME
+    if vendor_directory.is_dir():
+        _scan_directory(plugin_directory, vendor_directory, "", modules, directories)
+
+    # The plugin's package takes precedence over vendored modules with the same name, as it does
+    # when the plugin's parent directory is first on `sys.path`
+    for name in [name for name in modules if _is_same_or_submodule(name, plugin_name)]:
+        del modules[name]
+
+    modules[plugin_name] = _package_entry(plugin_directory, plugin_directory)
+    _scan_directory(
+        plugin_directory,
+        plugin_directory,
+        f"{plugin_name}.",
+        modules,
+        directories,
+        excluded_names={VENDOR_DIRECTORY_NAME},
+    )
+
+    return VendorManifest(plugin_name, modules, directories)
+
+
+def write_manifest(plugin_directory: Path, plugin_name: Optional[str] = None) -> Path:
+    """
+    Build a manifest of a plugin's modules and write it to the plugin's directory
+
+    :param plugin_directory: The directory where the plugin is stored
+    :param plugin_name: The name of the plugin, defaults to the name of the plugin directory
+    :return: The path to the manifest file
+    """
+    if plugin_name is None:
+        plugin_name = plugin_directory.name
+
+    manifest = build_manifest(plugin_name, plugin_directory)
+    manifest_path = plugin_directory / MANIFEST_FILE_NAME
+
+    _dump_manifest(manifest, manifest_path)
+
+    # Creating the manifest file modified the plugin directory. Record the new modification time,
+    # so that loading the manifest does not need to list the plugin directory again. Overwriting
+    # the file does not modify the directory.
+    manifest.directories["."] = manifest.directories["."]._replace(
+        mtime_ns=os.stat(plugin_directory).st_mtime_ns
+    )
+    _dump_manifest(manifest, manifest_path)
+
+    return manifest_path
+
+
+def _dump_manifest(manifest: VendorManifest, manifest_path: Path):
+    import json
+
+    with open(manifest_path, "w") as f:
+        json.dump(
+            {
+                "version": MANIFEST_VERSION,
+                "plugin_name": manifest.plugin_name,
+                "modules": {name: entry._asdict() for name, entry in manifest.modules.items()},
+                "directories": {
+                    path: entry._asdict() for path, entry in manifest.directories.items()
+                },
+            },
+            f,
+            indent=1,
+        )
+
+
+def load_manifest(plugin_name: str, plugin_directory: Path) -> Optional[VendorManifest]:
+    """
+    Read a plugin's manifest, if it exists and is up to date
+
+    Only the directories that were scanned to build the manifest are checked. A directory whose
+    modification time changed is listed again, so that changes that don't affect any modules, such
+    as the creation of a `__pycache__` directory, don't invalidate the manifest.
+
+    :param plugin_name: The name of the plugin
+    :param plugin_directory: The directory where the plugin is stored
+    :return: The plugin's manifest, or None if it does not exist or is out of date
+    """
+    try:
+        with open(plugin_directory / MANIFEST_FILE_NAME) as f:
+            # json is only imported if the plugin has a manifest
+            import json
+
+            raw_manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as err:
+        logger.warning(f"Failed to read the manifest for plugin {plugin_name}: {err}")
+        return None
+
+    if (
+        raw_manifest.get("version") != MANIFEST_VERSION
+        or raw_manifest.get("plugin_name") != plugin_name
+    ):
+        logger.warning(f"The manifest for plugin {plugin_name} is incompatible")
+        return None
+
+    manifest = VendorManifest(
+        plugin_name,
+        {name: ManifestEntry(**entry) for name, entry in raw_manifest["modules"].items()},
+        {path: DirectoryEntry(**entry) for path, entry in raw_manifest["directories"].items()},
+    )
+
+    if not _directories_unchanged(plugin_directory, manifest.directories):
+        logger.warning(f"The manifest for plugin {plugin_name} is out of date")
+        return None
+
+    return manifest
+
+
+def verify_manifest(manifest: VendorManifest, plugin_directory: Path) -> List[str]:
+    """
+    Find the modules whose files no longer match the hashes in a manifest
+
+    :param manifest: The manifest to verify
+    :param plugin_directory: The directory where the plugin is stored
+    :return: The names of the modules whose files are missing or have been modified
+    """
+    return [
+        name
+        for name, entry in manifest.modules.items()
+        if entry.sha256 is not None
+        and _sha256(plugin_directory / entry.path, missing_ok=True) != entry.sha256
+    ]
+
+
+def module_name(file_name: str) -> Optional[Tuple[str, str]]:
+    """
+    Get the name of the module that a file contains
+
+    :param file_name: The name of a file
+    :return: The module's name and the file's suffix, or None if the file is not an importable
+             module
+    """
+    for suffix in _MODULE_SUFFIXES:
+        if file_name.endswith(suffix):
+            name = file_name[: -len(suffix)]
+            return (name, suffix) if name.isidentifier() else None
+
+    return None
+
+
+def is_package_directory_name(directory_name: str) -> bool:
+    return directory_name not in _IGNORED_DIRECTORIES and directory_name.isidentifier()
+
+
+def _scan_directory(
+    plugin_directory: Path,
+    directory: Path,
+    prefix: str,
+    modules: Dict[str, ManifestEntry],
+    directories: Dict[str, DirectoryEntry],
+    excluded_names=frozenset(),
+):
+    module_files: Dict[str, Tuple[int, Path]] = {}
+    package_directories: List[Path] = []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name in excluded_names:
+                continue
+
+            if entry.is_dir():
+                if is_package_directory_name(entry.name):
+                    package_directories.append(Path(entry.path))
+                continue
+
+            name_and_suffix = module_name(entry.name)
+            if name_and_suffix is None or name_and_suffix[0] == _PACKAGE_INIT:
+                continue
+
+            name, suffix = name_and_suffix
+            priority = _SUFFIX_PRIORITY.index(suffix)
+            if name not in module_files or priority < module_files[name][0]:
+                module_files[name] = (priority, Path(entry.path))
+
+    directories[_relative_path(plugin_directory, directory)] = DirectoryEntry(
+        os.stat(directory).st_mtime_ns, _listing_hash(directory, excluded_names)
+    )
+
+    for name, (_, path) in module_files.items():
+        modules[f"{prefix}{name}"] = ManifestEntry(
+            _relative_path(plugin_directory, path), False, _sha256(path)
+        )
+
+    # Regular packages take precedence over modules with the same name, and modules take
+    # precedence over namespace packages, as they do with the default import system
+    for package_directory in package_directories:
+        package_entry = _package_entry(plugin_directory, package_directory)
+        if package_entry.sha256 is None and package_directory.name in module_files:
+            continue
+
+        package_name = f"{prefix}{package_directory.name}"
+        modules[package_name] = package_entry
+        _scan_directory(
+            plugin_directory, package_directory, f"{package_name}.", modules, directories
+        )
+
+
+def _package_entry(plugin_directory: Path, package_directory: Path) -> ManifestEntry:
+    for suffix in _SUFFIX_PRIORITY:
+        init_file = package_directory / f"{_PACKAGE_INIT}{suffix}"
+        if init_file.is_file():
+            return ManifestEntry(
+                _relative_path(plugin_directory, init_file), True, _sha256(init_file)
+            )
+
+    # A namespace package
+    return ManifestEntry(_relative_path(plugin_directory, package_directory), True, None)
+
+
+def _directories_unchanged(plugin_directory: Path, directories: Dict[str, DirectoryEntry]) -> bool:
+    for relative_path, entry in directories.items():
+        directory = plugin_directory / relative_path
+        try:
+            if os.stat(directory).st_mtime_ns == entry.mtime_ns:
+                continue
+
+            excluded_names = {VENDOR_DIRECTORY_NAME} if relative_path == "." else frozenset()
+            if _listing_hash(directory, excluded_names) != entry.listing:
+                return False
+        except OSError:
+            return False
+
+    return True
+
+
+def _listing_hash(directory: Path, excluded_names) -> str:
+    import hashlib
+
+    names = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name in excluded_names:
+                continue
+
+            if entry.is_dir():
+                if is_package_directory_name(entry.name):
+                    names.append(f"{entry.name}/")
+            elif module_name(entry.name) is not None:
+                names.append(entry.name)
+
+    return hashlib.sha256("\n".join(sorted(names)).encode()).hexdigest()
+
+
+def _sha256(path: Path, missing_ok: bool = False) -> Optional[str]:
+    import hashlib
+
+    file_hash = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                file_hash.update(chunk)
+    except FileNotFoundError:
+        if missing_ok:
+            return None
+        raise
+
+    return file_hash.hexdigest()
+
+
+def _relative_path(plugin_directory: Path, path: Path) -> str:
+    return Path(os.path.relpath(path, plugin_directory)).as_posix()
+
+
+def _is_same_or_submodule(name: str, package_name: str) -> bool:
+    return name == package_name or name.startswith(f"{package_name}.")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("plugin_directories", nargs="+", type=Path, metavar="PLUGIN_DIRECTORY")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Verify the existing manifests instead of writing new ones",
+    )
+    args = parser.parse_args()
+
+    exit_code = 0
+    for plugin_directory in args.plugin_directories:
+        if not args.check:
+            print(write_manifest(plugin_directory))
+            continue
+
+        manifest = load_manifest(plugin_directory.name, plugin_directory)
+        modified_modules = [] if manifest is None else verify_manifest(manifest, plugin_directory)
+        if manifest is None or modified_modules:
+            exit_code = 1
+            print(f"{plugin_directory}: out of date {' '.join(modified_modules)}".rstrip())
+        else:
+            print(f"{plugin_directory}: ok")
+
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from threading import Event
+from typing import Optional
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(  # type: ignore[override]
+        self,
+        started: Event,
+        release: Optional[Event] = None,
+        cancel_event: Optional[Event] = None,
+        **_,
+    ) -> str:
+        started.set()
+        stop = release or cancel_event
+        if stop is not None:
+            stop.wait()
+
+        return "released"
@@ -0,0 +1,8 @@
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **kwargs) -> str:
+        import looking_glass
+
+        return looking_glass.reflect("Alice")
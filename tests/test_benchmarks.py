@@ -0,0 +1,63 @@
+from typing import Any, Dict
+
+import pytest
+
+from benchmarks.__main__ import RESULTS_VERSION, compare
+
+
+def make_results(benchmarks: Dict[str, Any]) -> Dict[str, Any]:
+    return {"version": RESULTS_VERSION, "benchmarks": benchmarks}
+
+
+def test_compare__regression():
+    baseline = make_results({"spawn_latency": [{"start_method": "spawn", "seconds": 0.1}]})
+    results = make_results({"spawn_latency": [{"start_method": "spawn", "seconds": 0.2}]})
+
+    (comparison,) = compare(results, baseline, threshold=0.1)
+
+    assert comparison.benchmark == "spawn_latency"
+    assert comparison.parameters == {"start_method": "spawn"}
+    assert comparison.speedup == pytest.approx(0.5)
+    assert comparison.regressed
+
+
+def test_compare__improvement():
+    baseline = make_results(
+        {"return_value_size": [{"transport": "pickle", "size": 1024, "bytes_per_second": 100}]}
+    )
+    results = make_results(
+        {"return_value_size": [{"transport": "pickle", "size": 1024, "bytes_per_second": 200}]}
+    )
+
+    (comparison,) = compare(results, baseline, threshold=0.1)
+
+    assert comparison.speedup == pytest.approx(2)
+    assert not comparison.regressed
+
+
+def test_compare__within_threshold():
+    baseline = make_results({"spawn_latency": [{"start_method": "spawn", "seconds": 0.100}]})
+    results = make_results({"spawn_latency": [{"start_method": "spawn", "seconds": 0.105}]})
+
+    (comparison,) = compare(results, baseline, threshold=0.1)
+
+    assert not comparison.regressed
+
+
+def test_compare__missing_from_baseline():
+    baseline = make_results({"spawn_latency": [{"start_method": "spawn", "seconds": 0.1}]})
+    results = make_results(
+        {
+            "spawn_latency": [{"start_method": "forkserver", "seconds": 0.1}],
+            "isolation_overhead": [{"added_modules": 0, "seconds": 0.001}],
+        }
+    )
+
+    assert compare(results, baseline) == []
+
+
+def test_compare__incompatible_baseline():
+    baseline = {"version": RESULTS_VERSION + 1, "benchmarks": {}}
+
+    with pytest.raises(ValueError):
+        compare(make_results({}), baseline)
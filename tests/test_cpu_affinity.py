@@ -0,0 +1,128 @@
+import gc
+import os
+import time
+from threading import Event
+from typing import List
+
+import pytest
+
+from serpentarium import (
+    CPUPlacementPolicy,
+    MultiprocessingPlugin,
+    NamedPluginMixin,
+    SingleUsePlugin,
+)
+from serpentarium.cpu_affinity import CPUAllocator, get_cpu_allocator, validate_cpu_affinity
+
+requires_sched_setaffinity = pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="CPU affinity is not supported on this platform"
+)
+
+CPUS = [0, 2, 3]
+
+
+class AffinityPlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, **_) -> List[int]:
+        return sorted(os.sched_getaffinity(0))
+
+
+class WaitingPlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, *, cancel_event: Event, **_):  # type: ignore[override]
+        cancel_event.wait()
+
+
+@pytest.fixture
+def cpu_allocator(monkeypatch) -> CPUAllocator:
+    monkeypatch.setattr("serpentarium.cpu_affinity._available_cpus", lambda: CPUS)
+    return CPUAllocator()
+
+
+def test_round_robin(cpu_allocator: CPUAllocator):
+    cpus = [cpu_allocator.allocate(CPUPlacementPolicy.ROUND_ROBIN) for _ in range(5)]
+
+    assert cpus == [0, 2, 3, 0, 2]
+    assert cpu_allocator.load == {0: 2, 2: 2, 3: 1}
+
+
+def test_least_loaded(cpu_allocator: CPUAllocator):
+    cpus = [cpu_allocator.allocate(CPUPlacementPolicy.LEAST_LOADED) for _ in range(3)]
+    cpu_allocator.release(2)
+
+    assert cpus == [0, 2, 3]
+    assert cpu_allocator.allocate(CPUPlacementPolicy.LEAST_LOADED) == 2
+
+
+def test_release(cpu_allocator: CPUAllocator):
+    cpu = cpu_allocator.allocate(CPUPlacementPolicy.LEAST_LOADED)
+    cpu_allocator.release(cpu)
+    cpu_allocator.release(cpu)
+
+    assert cpu_allocator.load == {}
+
+
+@requires_sched_setaffinity
+def test_validate_cpu_affinity():
+    assert validate_cpu_affinity([1, 0, 1]) == frozenset([0, 1])
+    assert validate_cpu_affinity(CPUPlacementPolicy.ROUND_ROBIN) == CPUPlacementPolicy.ROUND_ROBIN
+
+    with pytest.raises(ValueError):
+        validate_cpu_affinity([])
+
+
+@requires_sched_setaffinity
+def test_explicit_cpus():
+    cpu = min(os.sched_getaffinity(0))
+    plugin = MultiprocessingPlugin(
+        plugin=AffinityPlugin(plugin_name="affinity"), cpu_affinity={cpu}
+    )
+
+    assert plugin.run(timeout=30) == [cpu]
+
+
+@requires_sched_setaffinity
+@pytest.mark.parametrize(
+    "policy", [CPUPlacementPolicy.ROUND_ROBIN, CPUPlacementPolicy.LEAST_LOADED]
+)
+def test_placement_policy(policy: CPUPlacementPolicy):
+    plugin = MultiprocessingPlugin(
+        plugin=AffinityPlugin(plugin_name="affinity"), cpu_affinity=policy
+    )
+
+    cpus = plugin.run(timeout=30)
+
+    assert len(cpus) == 1
+    assert cpus[0] in os.sched_getaffinity(0)
+    assert get_cpu_allocator().load.get(cpus[0], 0) == 0
+
+
+@requires_sched_setaffinity
+def test_cpu_released__plugin_not_joined():
+    plugin = MultiprocessingPlugin(
+        plugin=AffinityPlugin(plugin_name="affinity"), cpu_affinity=CPUPlacementPolicy.LEAST_LOADED
+    )
+    plugin.start()
+
+    deadline = time.monotonic() + 30
+    while plugin.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert get_cpu_allocator().load == {}
+
+
+@requires_sched_setaffinity
+def test_cpu_released__plugin_garbage_collected():
+    plugin = MultiprocessingPlugin(
+        plugin=WaitingPlugin(plugin_name="waiting"),
+        cpu_affinity=CPUPlacementPolicy.LEAST_LOADED,
+        cancellable=True,
+    )
+    plugin.start()
+    process = plugin._proc
+    assert sum(get_cpu_allocator().load.values()) == 1
+
+    del plugin
+    gc.collect()
+
+    assert get_cpu_allocator().load == {}
+    process.terminate()
+    process.join()
@@ -1,12 +1,28 @@
 import logging
 import logging.handlers
+import threading
+from functools import partial
 from queue import Queue
-from typing import Iterable, Tuple
+from typing import Iterable, List, Tuple
 
-from serpentarium.logging import configure_host_process_logger
+import pytest
+
+from serpentarium.logging import (
+    BatchingQueueHandler,
+    BatchingQueueListener,
+    BoundedQueueHandler,
+    OverflowPolicy,
+    configure_child_process_logger,
+    configure_host_process_logger,
+)
 from serpentarium.types import ConfigureLoggerCallback as ConfigureLoggerCallback
 from tests.logging_utils import assert_queue_equals, get_logger_config_callback
 
+# The number of seconds to wait for a spawned process to log its messages and exit. Spawning a
+# process that imports this module can take well over 100ms, and joining returns as soon as the
+# process exits.
+CHILD_PROCESS_TIMEOUT = 5
+
 LOG_MESSAGES = [
     (logging.DEBUG, "log1"),
     (logging.INFO, "log2"),
@@ -32,7 +48,7 @@ def test_child_process_logger__level_notset():
 
     proc = spawn_context.Process(target=run, args=(configure_logger_fn, LOG_MESSAGES))
     proc.start()
-    proc.join(0.15)
+    proc.join(CHILD_PROCESS_TIMEOUT)
 
     assert_queue_equals(ipc_logger_queue, LOG_MESSAGES)
 
@@ -44,7 +60,7 @@ def test_child_process_logger__level_warning():
 
     proc = spawn_context.Process(target=run, args=(configure_logger_fn, LOG_MESSAGES))
     proc.start()
-    proc.join(0.15)
+    proc.join(CHILD_PROCESS_TIMEOUT)
 
     assert_queue_equals(ipc_logger_queue, LOG_MESSAGES[2:])
 
@@ -59,6 +75,8 @@ def test_configure_queue_listener():
         ipc_logger_queue=ipc_logger_queue, handlers=[test_queue_handler]
     )
 
+    assert isinstance(queue_listener, BatchingQueueListener)
+
     try:
         queue_listener.start()
         log_messages(LOG_MESSAGES)
@@ -67,3 +85,350 @@ def test_configure_queue_listener():
 
     assert ipc_logger_queue.empty()
     assert_queue_equals(test_queue, LOG_MESSAGES[1:])
+
+
+def get_batches(queue: Queue) -> List[List[str]]:
+    batches = []
+    while not queue.empty():
+        batches.append([record.msg for record in queue.get_nowait()])
+
+    return batches
+
+
+def test_child_process_logger__batched():
+    spawn_context, ipc_logger_queue, _ = get_logger_config_callback()
+    configure_logger_fn = partial(
+        configure_child_process_logger, ipc_logger_queue, max_batch_size=3, flush_interval=60
+    )
+
+    proc = spawn_context.Process(
+        target=run, args=(configure_logger_fn, LOG_MESSAGES + LOG_MESSAGES[:2])
+    )
+    proc.start()
+    proc.join(5)
+
+    # Batches are flushed when they are full, when a critical message is logged, and when the
+    # process exits
+    batches = [ipc_logger_queue.get(timeout=5) for _ in range(3)]
+    assert [[record.msg for record in batch] for batch in batches] == [
+        ["log1", "log2", "log3"],
+        ["log4"],
+        ["log1", "log2"],
+    ]
+
+
+def test_batching_queue_handler__flush_on_batch_size():
+    queue: Queue = Queue()
+    handler = BatchingQueueHandler(queue, max_batch_size=2, flush_interval=60)
+    logger = logging.getLogger("test_batching_queue_handler__flush_on_batch_size")
+    logger.addHandler(handler)
+
+    try:
+        for msg in ["log1", "log2", "log3"]:
+            logger.info(msg)
+
+        assert get_batches(queue) == [["log1", "log2"]]
+
+        handler.flush()
+        assert get_batches(queue) == [["log3"]]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_batching_queue_handler__flush_on_batch_bytes():
+    queue: Queue = Queue()
+    handler = BatchingQueueHandler(queue, max_batch_bytes=8, flush_interval=60)
+    logger = logging.getLogger("test_batching_queue_handler__flush_on_batch_bytes")
+    logger.addHandler(handler)
+
+    try:
+        for msg in ["log1", "log2", "log3"]:
+            logger.info(msg)
+
+        assert get_batches(queue) == [["log1", "log2"]]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+@pytest.mark.parametrize("level", [logging.ERROR, logging.CRITICAL])
+def test_batching_queue_handler__flush_on_error(level):
+    queue: Queue = Queue()
+    handler = BatchingQueueHandler(queue, flush_interval=60)
+    logger = logging.getLogger("test_batching_queue_handler__flush_on_error")
+    logger.addHandler(handler)
+
+    try:
+        logger.info("log1")
+        logger.log(level, "log2")
+
+        assert get_batches(queue) == [["log1", "log2"]]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_batching_queue_handler__flush_on_interval():
+    queue: Queue = Queue()
+    handler = BatchingQueueHandler(queue, flush_interval=0.01)
+    logger = logging.getLogger("test_batching_queue_handler__flush_on_interval")
+    logger.addHandler(handler)
+
+    try:
+        logger.info("log1")
+
+        batch = queue.get(timeout=5)
+        assert [record.msg for record in batch] == ["log1"]
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_batching_queue_handler__flush_on_close():
+    queue: Queue = Queue()
+    handler = BatchingQueueHandler(queue, flush_interval=60)
+    logger = logging.getLogger("test_batching_queue_handler__flush_on_close")
+    logger.addHandler(handler)
+
+    logger.info("log1")
+    logger.removeHandler(handler)
+    handler.close()
+
+    assert get_batches(queue) == [["log1"]]
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"max_batch_size": 0}, {"flush_interval": 0}, {"flush_interval": -1}]
+)
+def test_batching_queue_handler__invalid_arguments(kwargs):
+    with pytest.raises(ValueError):
+        BatchingQueueHandler(Queue(), **kwargs)
+
+
+def test_batching_queue_listener():
+    ipc_logger_queue: Queue = Queue()
+    test_queue: Queue = Queue()
+    listener = BatchingQueueListener(
+        ipc_logger_queue, logging.handlers.QueueHandler(test_queue), respect_handler_level=True
+    )
+    records = [
+        logging.LogRecord("test", level, __file__, 0, msg, None, None)
+        for level, msg in LOG_MESSAGES
+    ]
+
+    try:
+        listener.start()
+        ipc_logger_queue.put(records[:3])
+        ipc_logger_queue.put(records[3])
+    finally:
+        listener.stop()
+
+    assert_queue_equals(test_queue, LOG_MESSAGES)
+
+
+@pytest.fixture
+def get_logger(request):
+    handlers = []
+    logger = logging.getLogger(request.node.name)
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+
+    def _get_logger(handler: logging.Handler) -> logging.Logger:
+        handlers.append(handler)
+        logger.addHandler(handler)
+        return logger
+
+    yield _get_logger
+
+    for handler in handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def log_in_thread(logger: logging.Logger, level: int, msg: str) -> threading.Thread:
+    thread = threading.Thread(target=logger.log, args=(level, msg), daemon=True)
+    thread.start()
+    thread.join(0.1)
+
+    return thread
+
+
+def drain(queue: Queue) -> List[logging.LogRecord]:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+
+    return items
+
+
+def test_bounded_queue_handler__block(get_logger):
+    queue: Queue = Queue(maxsize=1)
+    logger = get_logger(BoundedQueueHandler(queue, overflow_policy=OverflowPolicy.BLOCK))
+
+    logger.info("log1")
+    thread = log_in_thread(logger, logging.INFO, "log2")
+    assert thread.is_alive()
+
+    assert queue.get_nowait().msg == "log1"
+    thread.join(5)
+    assert [record.msg for record in drain(queue)] == ["log2"]
+
+
+def test_bounded_queue_handler__drop_oldest(get_logger):
+    queue: Queue = Queue(maxsize=2)
+    logger = get_logger(BoundedQueueHandler(queue, overflow_policy=OverflowPolicy.DROP_OLDEST))
+
+    for msg in ["log1", "log2", "log3"]:
+        logger.info(msg)
+    assert [record.msg for record in drain(queue)] == ["log2", "log3"]
+
+    logger.info("log4")
+    log_record, report = drain(queue)
+    assert log_record.msg == "log4"
+    assert report.levelno == logging.WARNING
+    assert report.serpentarium_dropped_records == {"MainProcess": 1}
+
+
+def test_bounded_queue_handler__drop_oldest_batch(get_logger):
+    queue: Queue = Queue(maxsize=2)
+    handler = BatchingQueueHandler(
+        queue, max_batch_size=2, flush_interval=60, overflow_policy=OverflowPolicy.DROP_OLDEST
+    )
+    logger = get_logger(handler)
+
+    for msg in ["log1", "log2", "log3", "log4", "log5", "log6"]:
+        logger.info(msg)
+    assert get_batches(queue) == [["log3", "log4"], ["log5", "log6"]]
+
+    logger.info("log7")
+    handler.flush()
+    batch, report = drain(queue)
+    assert [record.msg for record in batch] == ["log7"]
+    assert report.serpentarium_dropped_records == {"MainProcess": 2}
+
+
+def test_bounded_queue_handler__drop_below_level(get_logger):
+    queue: Queue = Queue(maxsize=2)
+    logger = get_logger(
+        BoundedQueueHandler(
+            queue, overflow_policy=OverflowPolicy.DROP_BELOW_LEVEL, drop_level=logging.WARNING
+        )
+    )
+
+    logger.info("log1")
+    logger.info("log2")
+    logger.info("log3")
+    logger.debug("log4")
+    thread = log_in_thread(logger, logging.WARNING, "log5")
+    assert thread.is_alive()
+
+    assert queue.get_nowait().msg == "log1"
+    thread.join(5)
+    assert [record.msg for record in drain(queue)] == ["log2", "log5"]
+
+    logger.error("log6")
+    log_record, report = drain(queue)
+    assert log_record.msg == "log6"
+    assert report.serpentarium_dropped_records == {"MainProcess": 2}
+
+
+def test_bounded_queue_handler__sample(get_logger):
+    queue: Queue = Queue(maxsize=2)
+    logger = get_logger(
+        BoundedQueueHandler(queue, overflow_policy=OverflowPolicy.SAMPLE, sample_rate=3)
+    )
+
+    for msg in ["log1", "log2", "log3", "log4"]:
+        logger.info(msg)
+    thread = log_in_thread(logger, logging.INFO, "log5")
+    assert thread.is_alive()
+
+    assert queue.get_nowait().msg == "log1"
+    thread.join(5)
+    assert [record.msg for record in drain(queue)] == ["log2", "log5"]
+
+    logger.info("log6")
+    log_record, report = drain(queue)
+    assert log_record.msg == "log6"
+    assert report.serpentarium_dropped_records == {"MainProcess": 2}
+
+
+def test_bounded_queue_handler__invalid_sample_rate():
+    with pytest.raises(ValueError):
+        BoundedQueueHandler(Queue(), sample_rate=0)
+
+
+def test_batching_queue_listener__dropped_records():
+    ipc_logger_queue: Queue = Queue()
+    test_queue: Queue = Queue()
+    listener = BatchingQueueListener(ipc_logger_queue, logging.handlers.QueueHandler(test_queue))
+
+    reports = []
+    for dropped_records in [{"plugin1": 3}, {"plugin1": 1, "plugin2": 2}]:
+        report = logging.LogRecord("test", logging.WARNING, __file__, 0, "dropped", None, None)
+        report.serpentarium_dropped_records = dropped_records
+        reports.append(report)
+
+    try:
+        listener.start()
+        ipc_logger_queue.put(reports[0])
+        ipc_logger_queue.put([reports[1]])
+    finally:
+        listener.stop()
+
+    assert listener.dropped_records == {"plugin1": 4, "plugin2": 2}
+    assert_queue_equals(test_queue, [(logging.WARNING, "dropped")] * 2)
+
+
+@pytest.fixture
+def restore_root_handlers():
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+
+    yield
+
+    for handler in root.handlers:
+        if handler not in handlers:
+            root.removeHandler(handler)
+
+
+@pytest.mark.usefixtures("restore_root_handlers")
+def test_configure_host_process_logger__direct():
+    ipc_logger_queue: Queue = Queue()
+    test_queue: Queue = Queue()
+    test_queue_handler = logging.handlers.QueueHandler(test_queue)
+    test_queue_handler.setLevel(logging.INFO)
+
+    configure_host_process_logger(
+        ipc_logger_queue=ipc_logger_queue,
+        handlers=[test_queue_handler],
+        direct_host_logging=True,
+    )
+    log_messages(LOG_MESSAGES)
+
+    assert ipc_logger_queue.empty()
+    assert_queue_equals(test_queue, LOG_MESSAGES[1:])
+
+
+@pytest.mark.usefixtures("restore_root_handlers")
+def test_configure_host_process_logger__skip_unhandled_levels():
+    ipc_logger_queue: Queue = Queue()
+    handlers = [logging.NullHandler(), logging.NullHandler()]
+    handlers[0].setLevel(logging.WARNING)
+    handlers[1].setLevel(logging.CRITICAL)
+
+    configure_host_process_logger(ipc_logger_queue=ipc_logger_queue, handlers=handlers)
+    log_messages(LOG_MESSAGES)
+
+    assert_queue_equals(ipc_logger_queue, LOG_MESSAGES[2:])
+
+
+@pytest.mark.usefixtures("restore_root_handlers")
+def test_configure_host_process_logger__no_handlers():
+    ipc_logger_queue: Queue = Queue()
+
+    configure_host_process_logger(ipc_logger_queue=ipc_logger_queue)
+    log_messages(LOG_MESSAGES)
+
+    assert ipc_logger_queue.empty()
@@ -0,0 +1,116 @@
+import math
+
+import pytest
+
+from serpentarium import InMemoryMetricsRecorder, Metric
+from serpentarium.metrics import Histogram, child_process_recorder, drain_child_process_metrics
+
+
+def test_histogram():
+    histogram = Histogram()
+    for value in [0.5, 1, 3, 4, 100]:
+        histogram.record(value)
+
+    assert histogram.count == 5
+    assert histogram.total == 108.5
+    assert histogram.min == 0.5
+    assert histogram.max == 100
+    assert histogram.mean == 108.5 / 5
+    assert histogram.buckets == {0.5: 1, 1: 1, 4: 2, 128: 1}
+
+
+def test_histogram__zero_and_negative_values():
+    histogram = Histogram()
+    histogram.record(0)
+    histogram.record(-1)
+
+    assert histogram.buckets == {0: 2}
+
+
+@pytest.mark.parametrize("percent,expected", [(0, 1), (50, 16), (90, 256), (99, 1024), (100, 1024)])
+def test_histogram_percentile(percent, expected):
+    histogram = Histogram()
+    for value in [1, 2, 4, 8, 16, 32, 64, 128, 256, 1024]:
+        histogram.record(value)
+
+    assert histogram.percentile(percent) == expected
+
+
+def test_histogram_percentile__clamped_to_max():
+    histogram = Histogram()
+    histogram.record(3)
+
+    assert histogram.percentile(50) == 3
+
+
+def test_histogram_percentile__empty():
+    assert math.isnan(Histogram().percentile(50))
+    assert math.isnan(Histogram().mean)
+
+
+@pytest.mark.parametrize("percent", [-1, 101])
+def test_histogram_percentile__invalid(percent):
+    with pytest.raises(ValueError):
+        Histogram().percentile(percent)
+
+
+def test_in_memory_metrics_recorder():
+    recorder = InMemoryMetricsRecorder()
+
+    recorder.record("plugin1", Metric.RUN_TIME, 1)
+    recorder.record("plugin1", Metric.RUN_TIME, 2)
+    recorder.record("plugin1", Metric.RESULT_SIZE, 1024)
+    recorder.record("plugin2", Metric.RUN_TIME, 3)
+
+    assert sorted(recorder.plugin_names) == ["plugin1", "plugin2"]
+    histograms = recorder.histograms("plugin1")
+    assert set(histograms) == {Metric.RUN_TIME, Metric.RESULT_SIZE}
+    assert histograms[Metric.RUN_TIME].count == 2
+    assert histograms[Metric.RESULT_SIZE].total == 1024
+    assert recorder.histograms("plugin2")[Metric.RUN_TIME].max == 3
+    assert recorder.histograms("plugin3") == {}
+
+
+def test_in_memory_metrics_recorder__histograms_are_copies():
+    recorder = InMemoryMetricsRecorder()
+    recorder.record("plugin1", Metric.RUN_TIME, 1)
+
+    recorder.histograms("plugin1")[Metric.RUN_TIME].record(2)
+
+    assert recorder.histograms("plugin1")[Metric.RUN_TIME].count == 1
+
+
+def test_in_memory_metrics_recorder__reset():
+    recorder = InMemoryMetricsRecorder()
+    recorder.record("plugin1", Metric.RUN_TIME, 1)
+
+    recorder.reset()
+
+    assert recorder.plugin_names == []
+
+
+def test_in_memory_metrics_recorder__hooks():
+    recorded = []
+
+    def failing_hook(*_):
+        raise Exception()
+
+    recorder = InMemoryMetricsRecorder(hooks=[failing_hook, lambda *args: recorded.append(args)])
+    recorder.record("plugin1", Metric.JOIN_WAIT, 0.5)
+
+    assert recorded == [("plugin1", Metric.JOIN_WAIT, 0.5)]
+    assert recorder.histograms("plugin1")[Metric.JOIN_WAIT].count == 1
+
+
+def test_child_process_recorder():
+    assert child_process_recorder(None) is None
+
+    recorder = child_process_recorder(InMemoryMetricsRecorder())
+    recorder.record("plugin1", Metric.IMPORT_TIME, 0.25)
+    recorder.record("plugin1", Metric.RUN_TIME, 1)
+
+    assert drain_child_process_metrics() == [
+        ("plugin1", Metric.IMPORT_TIME, 0.25),
+        ("plugin1", Metric.RUN_TIME, 1),
+    ]
+    assert drain_child_process_metrics() == []
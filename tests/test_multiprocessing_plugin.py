@@ -1,17 +1,28 @@
+import asyncio
 import logging
 import multiprocessing
+import os
+import sys
 import threading
+import time
+from typing import List, Optional
 
 import pytest
 
 from serpentarium import (
+    CancellationOutcome,
+    InMemoryMetricsRecorder,
+    Metric,
     MultiprocessingPlugin,
     MultiUsePlugin,
     NamedPluginMixin,
+    PickleTransport,
     PluginThreadName,
+    ProcessStartMethod,
     SingleUsePlugin,
     concurrency,
 )
+from serpentarium.metrics import MetricsRecorder
 from tests.logging_utils import assert_queue_equals, get_logger_config_callback
 from tests.plugins.logger.plugin import Plugin as LoggerPlugin
 
@@ -177,7 +188,7 @@ def test_main_thread_name__calling_thread():
 
     thread = threading.Thread(name=thread_name, target=run_plugin, args=(plugin,), daemon=True)
     thread.start()
-    thread.join(0.1)
+    thread.join(5)
     assert not thread.is_alive()
 
     assert return_value == thread_name
@@ -201,3 +212,368 @@ def test_child_process_logger_configuration():
     plugin.run(log_messages=LOG_MESSAGES)
 
     assert_queue_equals(ipc_logger_queue, LOG_MESSAGES)
+
+
+def test_forkserver_start_method():
+    plugin = MultiprocessingPlugin(
+        plugin=MyPlugin("plugin1", value=42), start_method=ProcessStartMethod.FORKSERVER
+    )
+
+    assert plugin.run() == 42
+
+
+def test_run_async():
+    plugin = MultiprocessingPlugin(plugin=MyPlugin("plugin1", value=42))
+
+    assert asyncio.run(plugin.run_async()) == 42
+
+
+def test_run_async__concurrent():
+    plugins = [MultiprocessingPlugin(plugin=MyPlugin(f"plugin{i}", value=i)) for i in range(8)]
+
+    async def run_all():
+        return await asyncio.gather(*(plugin.run_async() for plugin in plugins))
+
+    assert asyncio.run(run_all()) == list(range(8))
+
+
+def test_join_async_timeout(interrupt: concurrency.Event, blocking_plugin: MultiprocessingPlugin):
+    async def join():
+        blocking_plugin.start()
+        await blocking_plugin.join_async(0.002)
+        assert blocking_plugin.is_alive()
+
+        interrupt.set()
+        await blocking_plugin.join_async()
+
+    asyncio.run(join())
+
+    assert not blocking_plugin.is_alive()
+    assert blocking_plugin.return_value == BLOCKING_PLUGIN_RETURN_VALUE
+
+
+class LargeReturnValuePlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, size: int, **_) -> bytes:  # type: ignore[override]
+        return b"x" * size
+
+
+def test_run__large_return_value():
+    # Larger than the OS's pipe buffer, so the child can't exit until the host reads the value
+    size = 64 * 1024 * 1024
+    plugin = MultiprocessingPlugin(plugin=LargeReturnValuePlugin(plugin_name="large"))
+
+    start = time.monotonic()
+    return_value = plugin.run(size=size, timeout=60)
+
+    assert len(return_value) == size
+    assert time.monotonic() - start < 60
+    assert not plugin.is_alive()
+
+
+def test_join_timeout__large_return_value():
+    plugin = MultiprocessingPlugin(plugin=LargeReturnValuePlugin(plugin_name="large"))
+
+    plugin.start(size=64 * 1024 * 1024)
+    plugin.join(60)
+
+    assert not plugin.is_alive()
+
+
+def test_run_async__large_return_value():
+    size = 16 * 1024 * 1024
+    plugin = MultiprocessingPlugin(plugin=LargeReturnValuePlugin(plugin_name="large"))
+
+    assert len(asyncio.run(plugin.run_async(size=size, timeout=30))) == size
+
+
+class SlowReceiveTransport(PickleTransport):
+    def recv(self, connection):
+        time.sleep(0.5)
+        return super().recv(connection)
+
+
+def test_join_async__event_loop_responsive():
+    plugin = MultiprocessingPlugin(
+        plugin=MyPlugin("plugin1", value=1), transport=SlowReceiveTransport()
+    )
+
+    async def run():
+        longest_gap = 0.0
+        task = asyncio.ensure_future(plugin.run_async(timeout=30))
+        while not task.done():
+            tick = time.monotonic()
+            await asyncio.sleep(0.01)
+            longest_gap = max(longest_gap, time.monotonic() - tick)
+
+        return await task, longest_gap
+
+    return_value, longest_gap = asyncio.run(run())
+
+    assert return_value == 1
+    # The transport blocks for 0.5 seconds while it receives the return value
+    assert longest_gap < 0.25
+
+
+class GeneratorPlugin(NamedPluginMixin, MultiUsePlugin):
+    def __init__(self, plugin_name: str, produced=None):
+        super().__init__(plugin_name=plugin_name)
+        self._produced = produced
+
+    def run(  # type: ignore[override]
+        self,
+        count: int,
+        fail_after: Optional[int] = None,
+        exit_after: Optional[int] = None,
+        **_,
+    ):
+        for i in range(count):
+            if i == fail_after:
+                raise ValueError("Off with their heads!")
+            if i == exit_after:
+                os._exit(1)
+
+            if self._produced is not None:
+                self._produced.value += 1
+
+            yield i
+
+
+def test_stream():
+    plugin = MultiprocessingPlugin(plugin=GeneratorPlugin(plugin_name="generator"))
+
+    assert list(plugin.stream(count=100)) == list(range(100))
+    assert not plugin.is_alive()
+
+
+def test_stream__backpressure():
+    produced = multiprocessing.get_context("spawn").Value("i", 0)
+    plugin = MultiprocessingPlugin(plugin=GeneratorPlugin("generator", produced=produced))
+
+    stream = plugin.stream(count=100, max_buffered_items=4)
+    assert next(stream) == 0
+    time.sleep(0.5)
+
+    # The item that was consumed, the items that are buffered and one that is waiting for a slot
+    assert produced.value <= 1 + 4 + 1
+    assert list(stream) == list(range(1, 100))
+
+
+def test_stream__plugin_raises_exception():
+    plugin = MultiprocessingPlugin(plugin=GeneratorPlugin(plugin_name="generator"))
+
+    items = []
+    with pytest.raises(ValueError, match="Off with their heads!"):
+        for item in plugin.stream(count=10, fail_after=3):
+            items.append(item)
+
+    assert items == [0, 1, 2]
+    assert not plugin.is_alive()
+
+
+def test_stream__process_exits():
+    plugin = MultiprocessingPlugin(plugin=GeneratorPlugin(plugin_name="generator"))
+
+    items = []
+    with pytest.raises(RuntimeError):
+        for item in plugin.stream(count=10, exit_after=3):
+            items.append(item)
+
+    assert items == [0, 1, 2]
+    assert not plugin.is_alive()
+
+
+def test_stream__abandoned():
+    plugin = MultiprocessingPlugin(plugin=GeneratorPlugin(plugin_name="generator"))
+
+    stream = plugin.stream(count=100, max_buffered_items=1)
+    assert next(stream) == 0
+    stream.close()
+
+    assert not plugin.is_alive()
+
+
+class RecordingPlugin(NamedPluginMixin, MultiUsePlugin):
+    """Records a metric through the child process's recorder, as a PluginWrapper would"""
+
+    def __init__(self, plugin_name: str, metrics_recorder: MetricsRecorder):
+        super().__init__(plugin_name=plugin_name)
+        self._metrics_recorder = metrics_recorder
+
+    def __getstate__(self):
+        from serpentarium.metrics import child_process_recorder
+
+        return {
+            **self.__dict__,
+            "_metrics_recorder": child_process_recorder(self._metrics_recorder),
+        }
+
+    def run(self, size: int, **_) -> bytes:  # type: ignore[override]
+        self._metrics_recorder.record(self.name, Metric.IMPORT_TIME, 0.5)
+        return bytes(size)
+
+
+def test_metrics():
+    recorder = InMemoryMetricsRecorder()
+    plugin = MultiprocessingPlugin(
+        plugin=RecordingPlugin(plugin_name="recording", metrics_recorder=recorder),
+        metrics_recorder=recorder,
+    )
+
+    assert plugin.run(size=1024, timeout=30) == bytes(1024)
+
+    histograms = recorder.histograms("recording")
+    assert set(histograms) == set(Metric)
+    for histogram in histograms.values():
+        assert histogram.count == 1
+    assert histograms[Metric.IMPORT_TIME].total == 0.5
+    assert histograms[Metric.RESULT_SIZE].total > 1024
+    assert 0 < histograms[Metric.SPAWN_LATENCY].total < 30
+    assert 0 < histograms[Metric.JOIN_WAIT].total < 30
+
+
+def test_metrics__join_wait_recorded_once(interrupt: concurrency.Event):
+    recorder = InMemoryMetricsRecorder()
+    plugin = MultiprocessingPlugin(
+        plugin=BlockingPlugin(plugin_name="blocking_plugin", interrupt=interrupt),
+        metrics_recorder=recorder,
+    )
+
+    plugin.start()
+    plugin.join(0.1)
+    assert recorder.histograms("blocking_plugin") == {}
+
+    interrupt.set()
+    plugin.join()
+    plugin.join()
+
+    join_wait = recorder.histograms("blocking_plugin")[Metric.JOIN_WAIT]
+    assert join_wait.count == 1
+    assert join_wait.total >= 0.1
+
+
+def test_metrics__run_async():
+    recorder = InMemoryMetricsRecorder()
+    plugin = MultiprocessingPlugin(plugin=MyPlugin("plugin1", value=1), metrics_recorder=recorder)
+
+    assert asyncio.run(plugin.run_async(timeout=30)) == 1
+
+    histograms = recorder.histograms("plugin1")
+    assert histograms[Metric.RUN_TIME].count == 1
+    assert histograms[Metric.JOIN_WAIT].count == 1
+
+
+class CancellablePlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(  # type: ignore[override]
+        self, *, cancel_event: concurrency.Event, ignore_sigterm: bool = False, **_
+    ) -> str:
+        if ignore_sigterm:
+            import signal
+
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)
+            while True:
+                time.sleep(0.01)
+
+        cancel_event.wait()
+        return "cancelled"
+
+
+class UncooperativePlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, **_):
+        while True:
+            time.sleep(0.01)
+
+
+class KeywordArgumentsPlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, **kwargs) -> List[str]:
+        return sorted(kwargs)
+
+
+@pytest.mark.parametrize("cancellable, expected_kwargs", [(False, []), (True, ["cancel_event"])])
+def test_cancel_event_passed_if_cancellable(cancellable: bool, expected_kwargs: List[str]):
+    plugin = MultiprocessingPlugin(
+        plugin=KeywordArgumentsPlugin(plugin_name="kwargs"), cancellable=cancellable
+    )
+
+    assert plugin.run(timeout=30) == expected_kwargs
+
+
+def test_cancel():
+    plugin = MultiprocessingPlugin(
+        plugin=CancellablePlugin(plugin_name="cancellable"), cancellable=True
+    )
+
+    plugin.start()
+
+    assert plugin.cancel(grace_period=30) == CancellationOutcome.STOPPED
+    assert not plugin.is_alive()
+    assert plugin.return_value == "cancelled"
+
+
+def test_cancel__not_running():
+    plugin = MultiprocessingPlugin(plugin=MyPlugin("plugin1", value=1))
+
+    plugin.start()
+    plugin.join()
+
+    assert plugin.cancel() == CancellationOutcome.NOT_RUNNING
+    assert plugin.return_value == 1
+
+
+def test_cancel__process_not_started():
+    plugin = MultiprocessingPlugin(plugin=MyPlugin("plugin1", value=0))
+
+    with pytest.raises(AssertionError):
+        plugin.cancel()
+
+
+def test_cancel__terminate():
+    plugin = MultiprocessingPlugin(plugin=UncooperativePlugin(plugin_name="uncooperative"))
+
+    plugin.start()
+
+    assert plugin.cancel(grace_period=0.1) == CancellationOutcome.TERMINATED
+    assert not plugin.is_alive()
+
+
+def test_cancel__not_cancellable():
+    plugin = MultiprocessingPlugin(plugin=UncooperativePlugin(plugin_name="uncooperative"))
+
+    plugin.start()
+    start = time.monotonic()
+
+    assert plugin.cancel(grace_period=30) == CancellationOutcome.TERMINATED
+    assert time.monotonic() - start < 5
+    assert not plugin.is_alive()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="SIGTERM can't be ignored on Windows")
+def test_cancel__kill():
+    plugin = MultiprocessingPlugin(
+        plugin=CancellablePlugin(plugin_name="cancellable"), cancellable=True
+    )
+
+    plugin.start(ignore_sigterm=True)
+
+    assert plugin.cancel(grace_period=1, terminate_timeout=0.1) == CancellationOutcome.KILLED
+    assert not plugin.is_alive()
+    assert plugin.return_value is None
+
+
+def test_run__cancel_on_timeout():
+    plugin = MultiprocessingPlugin(
+        plugin=UncooperativePlugin(plugin_name="uncooperative"), cancel_grace_period=0.1
+    )
+
+    assert plugin.run(timeout=0.5) is None
+    assert not plugin.is_alive()
+
+
+def test_run_async__cancel_on_timeout():
+    plugin = MultiprocessingPlugin(
+        plugin=CancellablePlugin(plugin_name="cancellable"),
+        cancellable=True,
+        cancel_grace_period=30,
+    )
+
+    assert asyncio.run(plugin.run_async(timeout=0.5)) == "cancelled"
+    assert not plugin.is_alive()
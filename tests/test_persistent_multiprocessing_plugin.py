@@ -0,0 +1,97 @@
+import os
+import threading
+
+import pytest
+
+from serpentarium import (
+    MultiUsePlugin,
+    NamedPluginMixin,
+    PersistentMultiprocessingPlugin,
+    PluginThreadName,
+)
+
+
+class CounterPlugin(NamedPluginMixin, MultiUsePlugin):
+    def __init__(self, plugin_name: str):
+        super().__init__(plugin_name=plugin_name)
+        self._count = 0
+
+    def run(self, **_):
+        self._count += 1
+        return (os.getpid(), self._count)
+
+
+class ExceptionPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_):
+        raise ValueError("Curiouser and curiouser!")
+
+
+class ExitPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_):
+        os._exit(1)
+
+
+class MainThreadNamePlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_):
+        return threading.current_thread().name
+
+
+def test_run_in_same_process():
+    with PersistentMultiprocessingPlugin(plugin=CounterPlugin(plugin_name="counter")) as plugin:
+        pid_1, count_1 = plugin.run()
+        pid_2, count_2 = plugin.run()
+
+    assert pid_1 == pid_2 != os.getpid()
+    assert (count_1, count_2) == (1, 2)
+
+
+def test_start():
+    with PersistentMultiprocessingPlugin(plugin=CounterPlugin(plugin_name="counter")) as plugin:
+        assert not plugin.is_alive()
+
+        plugin.start()
+
+        assert plugin.is_alive()
+
+
+def test_shutdown():
+    plugin = PersistentMultiprocessingPlugin(plugin=CounterPlugin(plugin_name="counter"))
+    plugin.run()
+
+    plugin.shutdown()
+
+    assert not plugin.is_alive()
+    with pytest.raises(RuntimeError):
+        plugin.run()
+
+
+def test_plugin_raises_exception():
+    with PersistentMultiprocessingPlugin(plugin=ExceptionPlugin(plugin_name="test")) as plugin:
+        with pytest.raises(ValueError):
+            plugin.run()
+
+        assert plugin.is_alive()
+
+
+def test_child_process_exits_unexpectedly():
+    with PersistentMultiprocessingPlugin(plugin=ExitPlugin(plugin_name="test")) as plugin:
+        with pytest.raises(RuntimeError):
+            plugin.run()
+
+        assert not plugin.is_alive()
+
+
+def test_main_thread_name():
+    plugin_thread_name = "Cheshire"
+
+    with PersistentMultiprocessingPlugin(
+        plugin=MainThreadNamePlugin(plugin_name="test"), main_thread_name=plugin_thread_name
+    ) as plugin:
+        assert plugin.run() == plugin_thread_name
+
+
+def test_main_thread_name__default():
+    with PersistentMultiprocessingPlugin(
+        plugin=MainThreadNamePlugin(plugin_name="test"), main_thread_name=PluginThreadName.DEFAULT
+    ) as plugin:
+        assert plugin.run() == "MainThread"
@@ -0,0 +1,170 @@
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from serpentarium import PluginLoader
+from serpentarium.plugin_archive import (
+    ArchiveFinder,
+    PluginArchive,
+    build_plugin_archive,
+    is_plugin_archive,
+)
+
+PLUGIN_DIR = Path(__file__).parent / "plugins"
+
+
+@pytest.fixture
+def archive_directory(tmp_path: Path) -> Path:
+    for plugin_name in ("plugin1", "plugin2"):
+        build_plugin_archive(PLUGIN_DIR / plugin_name, tmp_path / f"{plugin_name}.zip")
+
+    return tmp_path
+
+
+@pytest.fixture
+def package_plugin_directory(tmp_path: Path) -> Path:
+    plugin_directory = tmp_path / "src" / "package_plugin"
+    files = {
+        plugin_directory / "__init__.py": "",
+        plugin_directory
+        / "plugin.py": (
+            "from serpentarium import MultiUsePlugin, NamedPluginMixin\n"
+            "import pkg.sub.mod\n"
+            "from . import helper\n"
+            "class Plugin(NamedPluginMixin, MultiUsePlugin):\n"
+            "    def run(self, **kwargs):\n"
+            "        return (pkg.sub.mod.VALUE, helper.VALUE, pkg.__file__)\n"
+        ),
+        plugin_directory / "helper.py": "VALUE = 'helper'",
+        plugin_directory / "vendor" / "pkg" / "__init__.py": "",
+        plugin_directory / "vendor" / "pkg" / "sub" / "mod.py": "VALUE = 'pkg.sub.mod'",
+        plugin_directory / "vendor" / "pkg-1.0.dist-info" / "METADATA": "",
+    }
+    for path, contents in files.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+
+    return plugin_directory
+
+
+def test_is_plugin_archive(archive_directory: Path):
+    assert is_plugin_archive(archive_directory / "plugin1.zip")
+    assert not is_plugin_archive(archive_directory / "plugin3.zip")
+    assert not is_plugin_archive(PLUGIN_DIR / "plugin1")
+
+
+def test_build_plugin_archive__bytecode(archive_directory: Path):
+    with zipfile.ZipFile(archive_directory / "plugin1.zip") as archive:
+        names = archive.namelist()
+
+    assert "plugin.py" in names
+    assert "vendor/wonderland.py" in names
+    assert f"vendor/__pycache__/wonderland.{sys.implementation.cache_tag}.pyc" in names
+
+
+def test_build_plugin_archive__no_bytecode(tmp_path: Path):
+    archive_path = build_plugin_archive(
+        PLUGIN_DIR / "plugin1", tmp_path / "plugin1.zip", compile_bytecode=False
+    )
+
+    with zipfile.ZipFile(archive_path) as archive:
+        assert not any(name.endswith(".pyc") for name in archive.namelist())
+
+
+def test_build_plugin_archive__extension_module(tmp_path: Path):
+    plugin_directory = tmp_path / "my_plugin"
+    plugin_directory.mkdir()
+    (plugin_directory / "ext.so").touch()
+
+    with pytest.raises(ValueError):
+        build_plugin_archive(plugin_directory)
+
+
+def test_archive_index(package_plugin_directory: Path):
+    archive_path = build_plugin_archive(package_plugin_directory)
+
+    archive = PluginArchive("package_plugin", archive_path)
+
+    assert set(archive.modules) == {
+        "package_plugin",
+        "package_plugin.plugin",
+        "package_plugin.helper",
+        "pkg",
+        "pkg.sub",
+        "pkg.sub.mod",
+    }
+    assert archive.modules["pkg.sub"].is_namespace
+    assert archive.modules["package_plugin"].member == "__init__.py"
+
+
+def test_archive_index__precedence(tmp_path: Path):
+    plugin_directory = tmp_path / "my_plugin"
+    vendor_directory = plugin_directory / "vendor"
+    for path in [
+        plugin_directory / "plugin.py",
+        vendor_directory / "regular.py",
+        vendor_directory / "regular" / "__init__.py",
+        vendor_directory / "shadowed.py",
+        vendor_directory / "shadowed" / "inner.py",
+    ]:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    archive_path = build_plugin_archive(plugin_directory)
+
+    archive = PluginArchive("my_plugin", archive_path)
+
+    assert archive.modules["regular"].member == "vendor/regular/__init__.py"
+    assert archive.modules["shadowed"].member == "vendor/shadowed.py"
+
+
+def test_archive_finder__unknown_module(archive_directory: Path):
+    finder = ArchiveFinder(PluginArchive("plugin1", archive_directory / "plugin1.zip"))
+
+    assert finder.find_spec("json", None) is None
+
+
+@pytest.mark.parametrize("compile_bytecode", [True, False])
+def test_load_package_plugin(package_plugin_directory: Path, compile_bytecode: bool):
+    archive_path = build_plugin_archive(
+        package_plugin_directory,
+        package_plugin_directory.parent.parent / "package_plugin.zip",
+        compile_bytecode=compile_bytecode,
+    )
+    plugin_loader = PluginLoader(archive_path.parent)
+
+    return_value = plugin_loader.load(plugin_name="package_plugin").run()
+
+    assert return_value == ("pkg.sub.mod", "helper", f"{archive_path}/vendor/pkg/__init__.py")
+
+
+def test_archive_plugin_isolation(archive_directory: Path):
+    plugin_loader = PluginLoader(archive_directory)
+
+    plugin1 = plugin_loader.load(plugin_name="plugin1")
+    plugin2 = plugin_loader.load(plugin_name="plugin2")
+
+    assert "Tweedledee" in plugin1.run()
+    assert "Tweedledum" in plugin2.run()
+    assert "Tweedledee" in plugin1.run()
+
+
+def test_archive_import_system_restored(archive_directory: Path):
+    original_sys_path = sys.path.copy()
+    original_meta_path = sys.meta_path.copy()
+    original_sys_modules = sys.modules.copy()
+
+    PluginLoader(archive_directory).load(plugin_name="plugin1").run()
+
+    assert sys.path == original_sys_path
+    assert sys.meta_path == original_meta_path
+    assert sys.modules == original_sys_modules
+
+
+def test_multiprocessing_archive_plugin(archive_directory: Path):
+    plugin_loader = PluginLoader(archive_directory)
+
+    plugin = plugin_loader.load_multiprocessing_plugin(plugin_name="plugin2")
+
+    assert "Tweedledum" in plugin.run()
@@ -0,0 +1,92 @@
+import time
+
+import pytest
+
+from serpentarium import MultiprocessingPlugin, MultiUsePlugin, NamedPluginMixin, PluginResult
+from serpentarium.plugin_fan_out import run_many
+
+
+class SleepPlugin(NamedPluginMixin, MultiUsePlugin):
+    def __init__(self, plugin_name: str, delay: float):
+        super().__init__(plugin_name=plugin_name)
+        self._delay = delay
+
+    def run(self, value=None, **_):
+        time.sleep(self._delay)
+        return (self.name, value)
+
+
+def sleep_plugin(plugin_name: str, delay: float) -> MultiprocessingPlugin:
+    return MultiprocessingPlugin(plugin=SleepPlugin(plugin_name, delay), daemon=True)
+
+
+def test_results_in_completion_order():
+    plugins = [sleep_plugin("slow", 1), sleep_plugin("fast", 0)]
+
+    results = list(run_many(plugins, value=7))
+
+    assert results == [
+        PluginResult("fast", ("fast", 7), False),
+        PluginResult("slow", ("slow", 7), False),
+    ]
+
+
+def test_timeout():
+    plugins = [sleep_plugin("slow", 5), sleep_plugin("fast", 0)]
+
+    results = list(run_many(plugins, timeout=1))
+
+    assert results == [
+        PluginResult("fast", ("fast", None), False),
+        PluginResult("slow", None, True),
+    ]
+    assert not any(plugin.is_alive() for plugin in plugins)
+
+
+def test_timeout__result_ready_at_deadline(monkeypatch):
+    def wait_past_deadline(deadlines):
+        time.sleep(max(deadline for deadline in deadlines.values()) - time.monotonic() + 1)
+        return []
+
+    monkeypatch.setattr("serpentarium.plugin_fan_out._wait_for_progress", wait_past_deadline)
+    plugins = [sleep_plugin("fast", 0)]
+
+    results = list(run_many(plugins, timeout=1))
+
+    assert results == [PluginResult("fast", ("fast", None), False)]
+    assert not plugins[0].is_alive()
+
+
+def test_abandoned_iteration_cancels_plugins():
+    plugins = [sleep_plugin("slow", 30), sleep_plugin("fast", 0)]
+
+    results = run_many(plugins)
+    assert next(results).plugin_name == "fast"
+    results.close()
+
+    assert not plugins[0].is_alive()
+
+
+def test_per_plugin_timeouts():
+    plugins = [sleep_plugin("slow", 0.5), sleep_plugin("slower", 5)]
+
+    results = list(run_many(plugins, timeout=2, timeouts={"slower": 0.1}))
+
+    assert results == [
+        PluginResult("slower", None, True),
+        PluginResult("slow", ("slow", None), False),
+    ]
+
+
+def test_max_concurrency():
+    plugins = [sleep_plugin("slow", 0.5), sleep_plugin("fast", 0)]
+
+    results = list(run_many(plugins, max_concurrency=1))
+
+    # With only one slot, the fast plugin can't start until the slow plugin has finished
+    assert [result.plugin_name for result in results] == ["slow", "fast"]
+
+
+def test_invalid_max_concurrency():
+    with pytest.raises(ValueError):
+        list(run_many([], max_concurrency=0))
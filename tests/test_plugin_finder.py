@@ -0,0 +1,101 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+from serpentarium import IsolationMode
+from serpentarium.plugin_finder import PluginFinder, build_index
+from serpentarium.plugin_wrapper import PluginWrapper
+
+PLUGIN_DIR = Path(__file__).parent / "plugins"
+
+
+@pytest.fixture
+def vendored_plugin_directory(tmp_path: Path) -> Path:
+    plugin_directory = tmp_path / "my_plugin"
+    vendor_directory = plugin_directory / "vendor"
+    for directory in ["package", "__pycache__", "package-1.0.dist-info", "bin"]:
+        (vendor_directory / directory).mkdir(parents=True)
+    for file in ["module.py", "compiled.pyc", "README.txt", "my_plugin.py", "not-a-module.py"]:
+        (vendor_directory / file).touch()
+
+    return plugin_directory
+
+
+def test_build_index(vendored_plugin_directory: Path):
+    vendor_directory = str(vendored_plugin_directory / "vendor")
+
+    index = build_index("my_plugin", vendored_plugin_directory)
+
+    assert index == {
+        "package": vendor_directory,
+        "bin": vendor_directory,
+        "module": vendor_directory,
+        "compiled": vendor_directory,
+        "my_plugin": str(vendored_plugin_directory.parent),
+    }
+
+
+def test_build_index__no_vendor_directory(tmp_path: Path):
+    index = build_index("my_plugin", tmp_path / "my_plugin")
+
+    assert index == {"my_plugin": str(tmp_path)}
+
+
+def test_find_spec__unindexed_module():
+    finder = PluginFinder.from_plugin_directory("plugin1", PLUGIN_DIR / "plugin1")
+
+    assert finder.find_spec("json", None) is None
+
+
+def test_find_spec__submodule():
+    finder = PluginFinder.from_plugin_directory("plugin1", PLUGIN_DIR / "plugin1")
+
+    assert finder.find_spec("wonderland", path=[str(PLUGIN_DIR)]) is None
+
+
+def test_find_spec__vendored_module():
+    finder = PluginFinder.from_plugin_directory("plugin1", PLUGIN_DIR / "plugin1")
+
+    spec = finder.find_spec("wonderland", None)
+
+    assert Path(spec.origin) == PLUGIN_DIR / "plugin1" / "vendor" / "wonderland.py"
+
+
+def test_meta_path_isolation():
+    plugin1 = PluginWrapper(
+        plugin_name="plugin1",
+        plugin_directory=PLUGIN_DIR / "plugin1",
+        isolation_mode=IsolationMode.META_PATH,
+    )
+    plugin2 = PluginWrapper(
+        plugin_name="plugin2",
+        plugin_directory=PLUGIN_DIR / "plugin2",
+        isolation_mode=IsolationMode.META_PATH,
+    )
+
+    assert "Tweedledee" in plugin1.run()
+    assert "Tweedledum" in plugin2.run()
+
+    # Run again to ensure plugin2 didn't overwrite plugin1's imports
+    assert "Tweedledee" in plugin1.run()
+    assert "Tweedledum" in plugin2.run()
+
+
+def test_meta_path_isolation__import_system_restored():
+    original_sys_path = sys.path.copy()
+    original_meta_path = sys.meta_path.copy()
+    plugin = PluginWrapper(
+        plugin_name="plugin1",
+        plugin_directory=PLUGIN_DIR / "plugin1",
+        isolation_mode=IsolationMode.META_PATH,
+    )
+
+    with plugin._plugin_import_context():
+        assert sys.path == original_sys_path
+        assert isinstance(sys.meta_path[0], PluginFinder)
+
+        plugin._load_plugin()
+
+    assert sys.path == original_sys_path
+    assert sys.meta_path == original_meta_path
@@ -1,9 +1,21 @@
 import logging
+import shutil
+import sys
+import threading
 from pathlib import Path
+from typing import List
 
 import pytest
 
-from serpentarium import PluginLoader
+from serpentarium import (
+    CancellationOutcome,
+    InMemoryMetricsRecorder,
+    IsolationMode,
+    Metric,
+    PluginLoader,
+    ProcessStartMethod,
+)
+from serpentarium.plugin_wrapper import PluginWrapper
 from tests.logging_utils import assert_queue_equals, get_logger_config_callback
 
 PLUGIN_DIR = Path(__file__).parent / "plugins"
@@ -61,6 +73,27 @@ def test_multiprocessing_plugin_isolation(plugin_loader: PluginLoader):
     assert "Tweedledum" in plugin2.run()
 
 
+def test_multiprocessing_plugin_isolation__forkserver():
+    plugin_loader = PluginLoader(PLUGIN_DIR, start_method=ProcessStartMethod.FORKSERVER)
+    plugin1 = plugin_loader.load_multiprocessing_plugin(plugin_name="plugin1")
+    plugin2 = plugin_loader.load_multiprocessing_plugin(plugin_name="plugin2")
+
+    assert "Tweedledee" in plugin1.run()
+    assert "Tweedledum" in plugin2.run()
+
+
+def test_vendored_import_in_run(plugin_loader: PluginLoader):
+    plugin = plugin_loader.load(plugin_name="import_in_run")
+
+    assert plugin.run() == "ecilA"
+
+
+def test_multiprocessing_plugin_vendored_import_in_run(plugin_loader: PluginLoader):
+    plugin = plugin_loader.load_multiprocessing_plugin(plugin_name="import_in_run")
+
+    assert plugin.run() == "ecilA"
+
+
 LOG_MESSAGES = [
     (logging.DEBUG, "log1"),
     (logging.INFO, "log2"),
@@ -95,3 +128,187 @@ def test_child_process_logger_configuration__override():
 
     assert default_ipc_logger_queue.empty()
     assert_queue_equals(override_ipc_logger_queue, LOG_MESSAGES)
+
+
+def test_process_pool_isolation(plugin_loader: PluginLoader):
+    with plugin_loader.load_process_pool(plugin_name="plugin1") as pool1:
+        with plugin_loader.load_process_pool(plugin_name="plugin2") as pool2:
+            assert "Tweedledee" in pool1.run()
+            assert "Tweedledum" in pool2.run()
+            assert "Tweedledee" in pool1.run()
+
+
+def test_process_pool_run_parameters(plugin_loader: PluginLoader):
+    with plugin_loader.load_process_pool(plugin_name="run_parameters") as pool:
+        assert pool.run(my_param=MY_PARAM) == MY_PARAM
+
+
+def test_persistent_multiprocessing_plugin_isolation(plugin_loader: PluginLoader):
+    with plugin_loader.load_persistent_multiprocessing_plugin(plugin_name="plugin1") as plugin1:
+        with plugin_loader.load_persistent_multiprocessing_plugin(plugin_name="plugin2") as plugin2:
+            assert "Tweedledee" in plugin1.run()
+            assert "Tweedledum" in plugin2.run()
+            assert "Tweedledee" in plugin1.run()
+
+
+def test_run_many(plugin_loader: PluginLoader):
+    results = plugin_loader.run_many(["plugin1", "plugin2", "run_parameters"], my_param=MY_PARAM)
+
+    return_values = {result.plugin_name: result.return_value for result in results}
+
+    assert "Tweedledee" in return_values["plugin1"]
+    assert "Tweedledum" in return_values["plugin2"]
+    assert return_values["run_parameters"] == MY_PARAM
+
+
+def test_meta_path_isolation():
+    plugin_loader = PluginLoader(PLUGIN_DIR, isolation_mode=IsolationMode.META_PATH)
+
+    plugin1 = plugin_loader.load(plugin_name="plugin1")
+    plugin2 = plugin_loader.load(plugin_name="plugin2")
+
+    assert "Tweedledee" in plugin1.run()
+    assert "Tweedledum" in plugin2.run()
+
+
+def test_multiprocessing_plugin_meta_path_isolation():
+    plugin_loader = PluginLoader(PLUGIN_DIR, isolation_mode=IsolationMode.META_PATH)
+
+    assert "Tweedledee" in plugin_loader.load_multiprocessing_plugin(plugin_name="plugin1").run()
+
+
+@pytest.fixture
+def writable_plugin_directory(tmp_path: Path) -> Path:
+    plugin_directory = tmp_path / "plugins"
+    shutil.copytree(
+        PLUGIN_DIR / "plugin1",
+        plugin_directory / "plugin1",
+        ignore=shutil.ignore_patterns("__pycache__"),
+    )
+
+    return plugin_directory
+
+
+def cached_bytecode_files(bytecode_cache_directory: Path, plugin_directory: Path) -> List[Path]:
+    return list(
+        (bytecode_cache_directory / plugin_directory.resolve().relative_to("/")).rglob("*.pyc")
+    )
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Requires sys.pycache_prefix")
+def test_bytecode_cache_directory(monkeypatch, tmp_path: Path, writable_plugin_directory: Path):
+    monkeypatch.setattr(sys, "dont_write_bytecode", False)
+    bytecode_cache_directory = tmp_path / "bytecode"
+    original_pycache_prefix = sys.pycache_prefix
+    plugin_loader = PluginLoader(
+        writable_plugin_directory, bytecode_cache_directory=bytecode_cache_directory
+    )
+
+    assert "Tweedledee" in plugin_loader.load(plugin_name="plugin1").run()
+
+    assert sys.pycache_prefix == original_pycache_prefix
+    assert not list(writable_plugin_directory.rglob("__pycache__"))
+    assert len(cached_bytecode_files(bytecode_cache_directory, writable_plugin_directory)) == 2
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Requires sys.pycache_prefix")
+def test_bytecode_cache_directory__plugin_raises(tmp_path: Path, writable_plugin_directory: Path):
+    (writable_plugin_directory / "plugin1" / "plugin.py").write_text("raise KeyboardInterrupt")
+    original_pycache_prefix = sys.pycache_prefix
+    original_sys_path = sys.path.copy()
+    original_sys_modules = sys.modules.copy()
+    plugin_loader = PluginLoader(
+        writable_plugin_directory, bytecode_cache_directory=tmp_path / "bytecode"
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        plugin_loader.load(plugin_name="plugin1").run()
+
+    assert sys.pycache_prefix == original_pycache_prefix
+    assert sys.path == original_sys_path
+    assert sys.modules == original_sys_modules
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="Requires sys.pycache_prefix")
+def test_precompile(tmp_path: Path, writable_plugin_directory: Path):
+    bytecode_cache_directory = tmp_path / "bytecode"
+    plugin_loader = PluginLoader(
+        writable_plugin_directory, bytecode_cache_directory=bytecode_cache_directory
+    )
+
+    assert plugin_loader.precompile("plugin1")
+
+    assert not list(writable_plugin_directory.rglob("__pycache__"))
+    assert len(cached_bytecode_files(bytecode_cache_directory, writable_plugin_directory)) == 2
+    assert "Tweedledee" in plugin_loader.load_multiprocessing_plugin(plugin_name="plugin1").run()
+
+
+def test_precompile__no_bytecode_cache_directory(writable_plugin_directory: Path):
+    plugin_loader = PluginLoader(writable_plugin_directory)
+
+    assert plugin_loader.precompile("plugin1")
+
+    assert len(list(writable_plugin_directory.rglob("__pycache__/*.pyc"))) == 2
+
+
+def test_metrics_recorder():
+    recorder = InMemoryMetricsRecorder()
+    plugin_loader = PluginLoader(PLUGIN_DIR, metrics_recorder=recorder)
+
+    plugin_loader.load(plugin_name="plugin1").run()
+    plugin_loader.load_multiprocessing_plugin(plugin_name="plugin2").run()
+
+    assert set(recorder.histograms("plugin1")) == {Metric.IMPORT_TIME, Metric.RUN_TIME}
+    assert set(recorder.histograms("plugin2")) == set(Metric)
+    assert recorder.histograms("plugin2")[Metric.RUN_TIME].count == 1
+
+
+def test_metrics_recorder__process_pool():
+    recorder = InMemoryMetricsRecorder()
+    plugin_loader = PluginLoader(PLUGIN_DIR, metrics_recorder=recorder)
+
+    with plugin_loader.load_process_pool(plugin_name="plugin1", max_workers=1) as pool:
+        pool.run()
+        pool.run()
+
+    histograms = recorder.histograms("plugin1")
+    assert set(histograms) == {Metric.IMPORT_TIME, Metric.RUN_TIME}
+    assert histograms[Metric.IMPORT_TIME].count == 1
+    assert histograms[Metric.RUN_TIME].count == 2
+
+
+def test_thread_plugin(plugin_loader: PluginLoader):
+    plugin = plugin_loader.load_thread_plugin(plugin_name="plugin1", cancellable=True)
+
+    assert "Tweedledee" in plugin.run(timeout=30)
+
+
+def test_thread_plugin__loaded_eagerly(plugin_loader: PluginLoader):
+    with pytest.raises(ModuleNotFoundError):
+        plugin_loader.load_thread_plugin(plugin_name="does_not_exist")
+
+
+def test_thread_plugin__runs_outside_isolation(plugin_loader: PluginLoader):
+    import json  # noqa: F401
+
+    original_sys_modules = sys.modules.copy()
+    started = threading.Event()
+    plugin = plugin_loader.load_thread_plugin(plugin_name="blocking", cancellable=True)
+    plugin.start(started=started)
+
+    try:
+        assert started.wait(5)
+        assert sys.modules == original_sys_modules
+
+        plugin1 = plugin_loader.load(plugin_name="plugin1")
+        assert isinstance(plugin1, PluginWrapper)
+        load_thread = threading.Thread(target=plugin1.load, daemon=True)
+        load_thread.start()
+        load_thread.join(5)
+
+        assert not load_thread.is_alive()
+        assert "Tweedledee" in plugin1.run()
+    finally:
+        assert plugin.cancel(grace_period=5) == CancellationOutcome.STOPPED
+
+    assert plugin.return_value == "released"
@@ -0,0 +1,86 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from serpentarium import PluginLoader
+from serpentarium.plugin_module_cache import PluginModuleCache
+from serpentarium.plugin_wrapper import PluginWrapper
+
+PLUGIN_DIR = Path(__file__).parent / "plugins"
+
+
+@pytest.fixture
+def plugin_directory(tmp_path: Path) -> Path:
+    for plugin_name in ("plugin1", "plugin2"):
+        shutil.copytree(PLUGIN_DIR / plugin_name, tmp_path / plugin_name)
+
+    return tmp_path
+
+
+def load_plugin_class(plugin_loader: PluginLoader, plugin_name: str) -> type:
+    plugin = plugin_loader.load(plugin_name=plugin_name)
+    assert isinstance(plugin, PluginWrapper)
+    plugin.load()
+
+    return type(plugin.plugin)
+
+
+def test_max_size_must_be_positive():
+    with pytest.raises(ValueError):
+        PluginModuleCache(0)
+
+
+def test_cached_modules_are_reused(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory, module_cache_size=2)
+
+    assert load_plugin_class(plugin_loader, "plugin1") is load_plugin_class(
+        plugin_loader, "plugin1"
+    )
+
+
+def test_cache_disabled_by_default(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory)
+
+    assert load_plugin_class(plugin_loader, "plugin1") is not load_plugin_class(
+        plugin_loader, "plugin1"
+    )
+
+
+def test_cached_plugins_are_isolated(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory, module_cache_size=2)
+
+    for _ in range(2):
+        assert "Tweedledee" in plugin_loader.load(plugin_name="plugin1").run()
+        assert "Tweedledum" in plugin_loader.load(plugin_name="plugin2").run()
+
+
+def test_modified_module_invalidates_cache(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory, module_cache_size=2)
+    assert "Tweedledee" in plugin_loader.load(plugin_name="plugin1").run()
+
+    vendored_module = plugin_directory / "plugin1" / "vendor" / "wonderland.py"
+    vendored_module.write_text('def pick_twin() -> str:\n    return "Humpty Dumpty"\n')
+    mtime_ns = os.stat(vendored_module).st_mtime_ns + 10**9
+    os.utime(vendored_module, ns=(mtime_ns, mtime_ns))
+
+    assert "Humpty Dumpty" in plugin_loader.load(plugin_name="plugin1").run()
+
+
+def test_least_recently_used_plugin_evicted(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory, module_cache_size=1)
+
+    plugin1_class = load_plugin_class(plugin_loader, "plugin1")
+    load_plugin_class(plugin_loader, "plugin2")
+
+    assert load_plugin_class(plugin_loader, "plugin1") is not plugin1_class
+
+
+def test_clear_module_cache(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory, module_cache_size=2)
+
+    plugin1_class = load_plugin_class(plugin_loader, "plugin1")
+    plugin_loader.clear_module_cache("plugin1")
+
+    assert load_plugin_class(plugin_loader, "plugin1") is not plugin1_class
@@ -0,0 +1,156 @@
+import os
+import threading
+import time
+
+import pytest
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin, PluginProcessPool
+
+
+class PidPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_) -> int:
+        return os.getpid()
+
+
+class EchoPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, value=None, delay: float = 0, **_):
+        time.sleep(delay)
+        return value
+
+
+class CrashPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, crash: bool = False, **_) -> int:
+        if crash:
+            os._exit(1)
+
+        return os.getpid()
+
+
+class ExceptionPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **_):
+        raise ValueError("Off with their heads!")
+
+
+def test_run_return_value():
+    with PluginProcessPool(plugin=EchoPlugin(plugin_name="echo")) as pool:
+        assert pool.run(value=42) == 42
+        assert pool.run(value="Jabberwocky") == "Jabberwocky"
+
+
+def test_workers_are_reused():
+    with PluginProcessPool(plugin=PidPlugin(plugin_name="pid"), max_workers=1) as pool:
+        pid = pool.run()
+
+        assert pid != os.getpid()
+        assert pool.run() == pid
+
+
+def test_min_workers_prestarted():
+    with PluginProcessPool(plugin=PidPlugin(plugin_name="pid"), min_workers=2) as pool:
+        assert pool.num_workers == 2
+
+
+def test_max_tasks_per_worker():
+    with PluginProcessPool(
+        plugin=PidPlugin(plugin_name="pid"), max_workers=1, max_tasks_per_worker=2
+    ) as pool:
+        pid_1 = pool.run()
+        pid_2 = pool.run()
+        pid_3 = pool.run()
+
+        assert pid_1 == pid_2
+        assert pid_3 != pid_1
+        assert pool.num_workers == 1
+
+
+def test_idle_timeout():
+    with PluginProcessPool(
+        plugin=EchoPlugin(plugin_name="echo"), min_workers=0, max_workers=2, idle_timeout=0.01
+    ) as pool:
+        threads = [
+            threading.Thread(target=pool.run, kwargs={"delay": 0.2}, daemon=True) for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert pool.num_workers == 2
+
+        time.sleep(0.05)
+        pool.run()
+
+        assert pool.num_workers == 1
+
+
+def test_idle_timeout__expired_without_run():
+    with PluginProcessPool(
+        plugin=EchoPlugin(plugin_name="echo"), min_workers=0, max_workers=1, idle_timeout=0.05
+    ) as pool:
+        pool.run()
+        assert pool.num_workers == 1
+
+        deadline = time.monotonic() + 5
+        while pool.num_workers > 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        assert pool.num_workers == 0
+
+
+def test_idle_timeout__min_workers_kept():
+    with PluginProcessPool(
+        plugin=EchoPlugin(plugin_name="echo"), min_workers=1, max_workers=2, idle_timeout=0.01
+    ) as pool:
+        time.sleep(0.1)
+
+        assert pool.num_workers == 1
+
+
+def test_crashed_worker_replaced():
+    with PluginProcessPool(plugin=CrashPlugin(plugin_name="crash"), max_workers=1) as pool:
+        pid = pool.run()
+
+        with pytest.raises(RuntimeError):
+            pool.run(crash=True)
+
+        assert pool.num_workers == 1
+        assert pool.run() != pid
+
+
+def test_max_workers():
+    with PluginProcessPool(plugin=PidPlugin(plugin_name="pid"), max_workers=2) as pool:
+        pids = set()
+
+        def run():
+            pids.add(pool.run())
+
+        threads = [threading.Thread(target=run, daemon=True) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(pids) <= 2
+        assert pool.num_workers <= 2
+
+
+def test_plugin_raises_exception():
+    with PluginProcessPool(plugin=ExceptionPlugin(plugin_name="exception")) as pool:
+        with pytest.raises(ValueError):
+            pool.run()
+
+        # The worker survives the exception
+        assert pool.num_workers == 1
+
+
+def test_run_after_shutdown():
+    pool = PluginProcessPool(plugin=EchoPlugin(plugin_name="echo"))
+    pool.shutdown()
+
+    assert pool.num_workers == 0
+    with pytest.raises(RuntimeError):
+        pool.run()
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        PluginProcessPool(plugin=EchoPlugin(plugin_name="echo"), min_workers=2, max_workers=1)
@@ -0,0 +1,133 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from serpentarium import MultiprocessingPlugin, PluginLoader, PluginRegistry
+from serpentarium.plugin_archive import build_plugin_archive
+
+PLUGIN_DIR = Path(__file__).parent / "plugins"
+
+
+@pytest.fixture
+def plugin_directory(tmp_path: Path) -> Path:
+    for plugin_name in ("plugin1", "plugin2"):
+        shutil.copytree(
+            PLUGIN_DIR / plugin_name,
+            tmp_path / plugin_name,
+            ignore=shutil.ignore_patterns("__pycache__"),
+        )
+    build_plugin_archive(PLUGIN_DIR / "run_parameters", tmp_path / "run_parameters.zip")
+    build_plugin_archive(PLUGIN_DIR / "plugin1", tmp_path / "plugin1.zip")
+    (tmp_path / "__pycache__").mkdir()
+    (tmp_path / "not-a-plugin").mkdir()
+    (tmp_path / "README.txt").touch()
+
+    return tmp_path
+
+
+def test_discover_plugins(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    assert sorted(registry) == ["plugin1", "plugin2", "run_parameters"]
+    assert len(registry) == 3
+
+
+def test_plugins_discovered_once(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+    list(registry)
+
+    shutil.copytree(plugin_directory / "plugin2", plugin_directory / "plugin3")
+
+    assert "plugin3" not in list(registry)
+    registry.refresh()
+    assert "plugin3" in list(registry)
+
+
+def test_contains(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    assert "plugin1" in registry
+    assert "run_parameters" in registry
+    assert "not-a-plugin" not in registry
+    assert "nonexistent" not in registry
+
+
+def test_metadata(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+    vendor_size = (plugin_directory / "plugin1" / "vendor" / "wonderland.py").stat().st_size
+
+    metadata = registry["plugin1"]
+
+    assert metadata.name == "plugin1"
+    assert metadata.path == plugin_directory / "plugin1"
+    assert not metadata.is_archive
+    assert metadata.mtime == (plugin_directory / "plugin1").stat().st_mtime
+    assert metadata.vendor_size == vendor_size
+
+
+def test_metadata__archive(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    metadata = registry["run_parameters"]
+
+    assert metadata.is_archive
+    assert metadata.path == plugin_directory / "run_parameters.zip"
+    assert metadata.vendor_size == 0
+
+
+def test_metadata__missing_plugin(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    with pytest.raises(KeyError):
+        registry["nonexistent"]
+
+
+def test_metadata_cached_until_modified(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+    vendor_directory = plugin_directory / "plugin1" / "vendor"
+
+    metadata = registry["plugin1"]
+    assert registry["plugin1"] is metadata
+
+    (vendor_directory / "extra.py").write_text("x = 1")
+    mtime_ns = vendor_directory.stat().st_mtime_ns + 10**9
+    os.utime(vendor_directory, ns=(mtime_ns, mtime_ns))
+
+    assert registry["plugin1"].vendor_size == metadata.vendor_size + 5
+
+
+def test_plugin(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    plugin = registry.plugin("plugin1")
+
+    assert registry.plugin("plugin1") is plugin
+    assert "Tweedledee" in plugin.run()
+
+
+def test_plugin__factory(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory)
+    registry = PluginRegistry(plugin_loader)
+
+    plugin = registry.plugin("plugin1", plugin_loader.load_multiprocessing_plugin)
+
+    assert isinstance(plugin, MultiprocessingPlugin)
+    assert registry.plugin("plugin1", plugin_loader.load_multiprocessing_plugin) is not plugin
+    assert "Tweedledee" in plugin.run()
+
+
+def test_plugin__factory_missing_plugin(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory)
+    registry = PluginRegistry(plugin_loader)
+
+    with pytest.raises(KeyError):
+        registry.plugin("nonexistent", plugin_loader.load_multiprocessing_plugin)
+
+
+def test_plugin__missing_plugin(plugin_directory: Path):
+    registry = PluginRegistry(PluginLoader(plugin_directory))
+
+    with pytest.raises(KeyError):
+        registry.plugin("nonexistent")
@@ -1,8 +1,11 @@
+import pickle
 import sys
+import threading
 from pathlib import Path
 
 import pytest
 
+from serpentarium import InMemoryMetricsRecorder, Metric
 from serpentarium.plugin_wrapper import PluginWrapper
 
 PLUGIN_DIR = Path(__file__).parent / "plugins"
@@ -38,3 +41,135 @@ def test_context_restored_on_exception():
         pass
 
     assert sys.modules == original_sys_modules
+
+
+def test_run__import_system_restored():
+    import json  # noqa: F401
+
+    original_sys_modules = sys.modules.copy()
+    plugin = PluginWrapper(plugin_name="plugin1", plugin_directory=PLUGIN_DIR / "plugin1")
+
+    plugin.run()
+
+    assert sys.modules == original_sys_modules
+
+
+def test_host_modules_hidden_and_restored():
+    import black  # Import black to ensure sys.modules differs from CLEAN_SYS_MODULES # noqa: F401
+
+    original_sys_modules = sys.modules.copy()
+    plugin = PluginWrapper(plugin_name="plugin1", plugin_directory=PLUGIN_DIR / "plugin1")
+
+    with plugin._plugin_import_context():
+        assert "black" not in sys.modules
+        plugin._load_plugin()
+        assert "wonderland" in sys.modules
+
+    assert sys.modules == original_sys_modules
+
+
+def test_sys_path_restored_after_plugin_modifies_it():
+    original_sys_path = sys.path.copy()
+    plugin = PluginWrapper(plugin_name="plugin1", plugin_directory=PLUGIN_DIR / "plugin1")
+
+    with plugin._plugin_import_context():
+        sys.path.insert(0, "added_by_plugin")
+
+    assert sys.path == ["added_by_plugin", *original_sys_path]
+    sys.path.remove("added_by_plugin")
+
+
+def test_concurrent_loads_are_isolated():
+    import black  # Import black to ensure sys.modules differs from CLEAN_SYS_MODULES # noqa: F401
+
+    original_sys_modules = sys.modules.copy()
+    original_sys_path = sys.path.copy()
+    expected_names = {"plugin1": "Tweedledee", "plugin2": "Tweedledum"}
+    errors = []
+
+    def load_and_run(plugin_name: str):
+        try:
+            for _ in range(10):
+                plugin = PluginWrapper(
+                    plugin_name=plugin_name, plugin_directory=PLUGIN_DIR / plugin_name
+                )
+                assert expected_names[plugin_name] in plugin.run()
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [
+        threading.Thread(target=load_and_run, args=(plugin_name,))
+        for plugin_name in [*expected_names] * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert sys.modules == original_sys_modules
+    assert sys.path == original_sys_path
+
+
+def test_vendored_import_in_run():
+    plugin = PluginWrapper(
+        plugin_name="import_in_run", plugin_directory=PLUGIN_DIR / "import_in_run"
+    )
+
+    assert plugin.run() == "ecilA"
+    assert "looking_glass" not in sys.modules
+
+
+def test_running_loaded_plugin_does_not_block_loads():
+    started = threading.Event()
+    release = threading.Event()
+    blocking_plugin = PluginWrapper(
+        plugin_name="blocking", plugin_directory=PLUGIN_DIR / "blocking"
+    )
+    blocking_plugin.load()
+    thread = threading.Thread(
+        target=blocking_plugin.run, kwargs={"started": started, "release": release}, daemon=True
+    )
+    thread.start()
+
+    try:
+        assert started.wait(5)
+        plugin1 = PluginWrapper(plugin_name="plugin1", plugin_directory=PLUGIN_DIR / "plugin1")
+        load_thread = threading.Thread(target=plugin1.load, daemon=True)
+        load_thread.start()
+        load_thread.join(5)
+
+        assert not load_thread.is_alive()
+        assert "json" in sys.modules
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_import_time_metric():
+    recorder = InMemoryMetricsRecorder()
+    plugin = PluginWrapper(
+        plugin_name="plugin1",
+        plugin_directory=PLUGIN_DIR / "plugin1",
+        metrics_recorder=recorder,
+    )
+
+    plugin.run()
+    plugin.run()
+
+    histograms = recorder.histograms("plugin1")
+    assert set(histograms) == {Metric.IMPORT_TIME, Metric.RUN_TIME}
+    assert histograms[Metric.IMPORT_TIME].count == 1
+    assert histograms[Metric.RUN_TIME].count == 2
+
+
+def test_pickle__metrics_recorder_replaced():
+    plugin = PluginWrapper(
+        plugin_name="plugin1",
+        plugin_directory=PLUGIN_DIR / "plugin1",
+        metrics_recorder=InMemoryMetricsRecorder(),
+    )
+
+    unpickled_plugin = pickle.loads(pickle.dumps(plugin))
+
+    assert not isinstance(unpickled_plugin._metrics_recorder, InMemoryMetricsRecorder)
@@ -0,0 +1,132 @@
+import os
+import time
+from pathlib import Path
+from threading import Event, Thread
+
+import pytest
+
+from serpentarium import PluginLoader
+
+PLUGIN_NAME = "versioned"
+PLUGIN_SOURCE = """
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+import version
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, event=None, **kwargs):
+        if event is not None:
+            event.wait(5)
+
+        return version.VERSION
+"""
+POLL_INTERVAL = 0.05  # seconds
+RELOAD_TIMEOUT = 5  # seconds
+
+
+@pytest.fixture
+def plugin_directory(tmp_path: Path) -> Path:
+    plugin_directory = tmp_path / PLUGIN_NAME
+    (plugin_directory / "vendor").mkdir(parents=True)
+    (plugin_directory / "plugin.py").write_text(PLUGIN_SOURCE)
+    set_version(plugin_directory, 1)
+
+    return plugin_directory
+
+
+def set_version(plugin_directory: Path, version: int):
+    version_file = plugin_directory / "vendor" / "version.py"
+    write_version(version_file, version)
+
+
+def write_version(version_file: Path, version: int):
+    version_file.write_text(f"VERSION = {version}")
+    # Ensure that the modification is visible even on filesystems with coarse timestamps
+    mtime_ns = time.time_ns() + version * 10**9
+    os.utime(version_file, ns=(mtime_ns, mtime_ns))
+
+
+def wait_for_version(plugin, version: int) -> bool:
+    deadline = time.monotonic() + RELOAD_TIMEOUT
+    while time.monotonic() < deadline:
+        if plugin.run() == version:
+            return True
+        time.sleep(POLL_INTERVAL)
+
+    return False
+
+
+def test_reload_on_change(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory.parent)
+
+    with plugin_loader.load_reloadable_plugin(
+        plugin_name=PLUGIN_NAME, poll_interval=POLL_INTERVAL
+    ) as plugin:
+        assert plugin.run() == 1
+
+        set_version(plugin_directory, 2)
+
+        assert wait_for_version(plugin, 2)
+
+
+def test_reload_on_nested_change__watch_recursively(plugin_directory: Path):
+    nested_directory = plugin_directory / "vendor" / "nested"
+    nested_directory.mkdir()
+    (nested_directory / "__init__.py").touch()
+    (plugin_directory / "vendor" / "version.py").write_text("from nested.version import VERSION")
+    write_version(nested_directory / "version.py", 1)
+    plugin_loader = PluginLoader(plugin_directory.parent)
+
+    with plugin_loader.load_reloadable_plugin(
+        plugin_name=PLUGIN_NAME, poll_interval=POLL_INTERVAL, watch_recursively=True
+    ) as plugin:
+        assert plugin.run() == 1
+
+        write_version(nested_directory / "version.py", 2)
+
+        assert wait_for_version(plugin, 2)
+
+
+def test_failed_reload_keeps_old_instance(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory.parent)
+    plugin = plugin_loader.load_reloadable_plugin(plugin_name=PLUGIN_NAME, poll_interval=None)
+    assert plugin.run() == 1
+
+    (plugin_directory / "vendor" / "version.py").write_text("VERSION = (")
+
+    with pytest.raises(SyntaxError):
+        plugin.reload()
+    assert plugin.run() == 1
+
+
+def test_in_flight_run_finishes_on_old_instance(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory.parent)
+    plugin = plugin_loader.load_reloadable_plugin(plugin_name=PLUGIN_NAME, poll_interval=None)
+    plugin.run()
+    event = Event()
+    results = []
+    in_flight_run = Thread(target=lambda: results.append(plugin.run(event=event)))
+    in_flight_run.start()
+
+    set_version(plugin_directory, 2)
+    plugin.reload()
+
+    assert plugin.run() == 2
+    event.set()
+    in_flight_run.join()
+    assert results == [1]
+
+
+def test_stop(plugin_directory: Path):
+    plugin_loader = PluginLoader(plugin_directory.parent)
+    plugin = plugin_loader.load_reloadable_plugin(
+        plugin_name=PLUGIN_NAME, poll_interval=POLL_INTERVAL
+    )
+    assert plugin.run() == 1
+
+    plugin.stop()
+    set_version(plugin_directory, 2)
+    time.sleep(POLL_INTERVAL * 4)
+
+    assert plugin.run() == 1
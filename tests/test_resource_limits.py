@@ -0,0 +1,89 @@
+import os
+import sys
+
+import pytest
+
+from serpentarium import (
+    InMemoryMetricsRecorder,
+    Metric,
+    MultiprocessingPlugin,
+    NamedPluginMixin,
+    ResourceLimits,
+    SingleUsePlugin,
+)
+
+pytestmark = pytest.mark.skipif(
+    sys.platform == "win32", reason="Resource limits are only supported on POSIX platforms"
+)
+
+MEBIBYTE = 1024 * 1024
+
+
+class ResourcePlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, *, resource: str, **_):  # type: ignore[override]
+        import resource as resource_module
+
+        if resource == "open_files":
+            return resource_module.getrlimit(resource_module.RLIMIT_NOFILE)
+        if resource == "nice":
+            return os.getpriority(os.PRIO_PROCESS, 0)
+        if resource == "memory":
+            try:
+                bytearray(1024 * MEBIBYTE)
+            except MemoryError:
+                return "MemoryError"
+            return "allocated"
+        if resource == "cpu_time":
+            while True:
+                pass
+
+        raise ValueError(resource)
+
+
+def run_plugin(resource: str, **kwargs) -> MultiprocessingPlugin:
+    plugin = MultiprocessingPlugin(plugin=ResourcePlugin(plugin_name="resource"), **kwargs)
+    plugin.run(resource=resource, timeout=30)
+
+    return plugin
+
+
+def test_open_files():
+    plugin = run_plugin("open_files", resource_limits=ResourceLimits(open_files=64))
+
+    assert plugin.return_value == (64, 64)
+
+
+def test_nice():
+    current_nice = os.getpriority(os.PRIO_PROCESS, 0)
+    nice = min(current_nice + 5, 19)
+
+    plugin = run_plugin("nice", resource_limits=ResourceLimits(nice=nice))
+
+    assert plugin.return_value == nice
+
+
+def test_address_space():
+    plugin = run_plugin("memory", resource_limits=ResourceLimits(address_space=512 * MEBIBYTE))
+
+    assert plugin.return_value == "MemoryError"
+
+
+def test_cpu_time():
+    plugin = run_plugin("cpu_time", resource_limits=ResourceLimits(cpu_time=1))
+
+    assert not plugin.is_alive()
+    assert plugin.return_value is None
+    assert plugin.resource_usage is None
+
+
+def test_resource_usage():
+    recorder = InMemoryMetricsRecorder()
+
+    plugin = run_plugin("open_files", metrics_recorder=recorder)
+
+    assert plugin.resource_usage.peak_rss > 0
+    assert plugin.resource_usage.cpu_time > 0
+
+    histograms = recorder.histograms("resource")
+    assert histograms[Metric.PEAK_RSS].total == plugin.resource_usage.peak_rss
+    assert histograms[Metric.CPU_TIME].total == plugin.resource_usage.cpu_time
@@ -0,0 +1,15 @@
+import pytest
+
+import serpentarium
+from serpentarium.plugin_process_pool import PluginProcessPool
+from serpentarium.plugin_registry import PluginRegistry
+
+
+def test_lazy_attribute():
+    assert serpentarium.PluginProcessPool is PluginProcessPool
+    assert serpentarium.PluginRegistry is PluginRegistry
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError):
+        serpentarium.NotAnAttribute  # type: ignore[attr-defined]
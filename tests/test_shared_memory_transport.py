@@ -0,0 +1,104 @@
+import multiprocessing
+import os
+import pickle
+from pathlib import Path
+
+import pytest
+
+from serpentarium import MultiprocessingPlugin, MultiUsePlugin, NamedPluginMixin
+from serpentarium.shared_memory_transport import SharedMemoryTransport
+
+THRESHOLD = 64
+
+
+@pytest.fixture
+def transport() -> SharedMemoryTransport:
+    return SharedMemoryTransport(threshold=THRESHOLD)
+
+
+def send_and_receive(transport: SharedMemoryTransport, obj):
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    try:
+        transport.send(sender, obj)
+        return transport.recv(receiver)
+    finally:
+        receiver.close()
+        sender.close()
+
+
+@pytest.mark.parametrize("size", [0, THRESHOLD - 1, THRESHOLD, 10 * THRESHOLD])
+def test_bytes(transport: SharedMemoryTransport, size: int):
+    data = os.urandom(size)
+
+    received = send_and_receive(transport, data)
+
+    assert type(received) is bytes
+    assert received == data
+
+
+def test_bytearray(transport: SharedMemoryTransport):
+    data = bytearray(os.urandom(10 * THRESHOLD))
+
+    received = send_and_receive(transport, data)
+
+    assert type(received) is bytearray
+    assert received == data
+
+
+@pytest.mark.parametrize("size", [THRESHOLD - 1, 10 * THRESHOLD])
+def test_memoryview(transport: SharedMemoryTransport, size: int):
+    data = memoryview(os.urandom(size * 4)).cast("I")
+
+    received = send_and_receive(transport, data)
+
+    assert type(received) is memoryview
+    assert received.format == "I"
+    assert received.tolist() == data.tolist()
+
+
+def test_pickle_buffer(transport: SharedMemoryTransport):
+    data = bytearray(os.urandom(10 * THRESHOLD))
+
+    received = send_and_receive(transport, pickle.PickleBuffer(data))
+
+    assert bytes(received) == data
+
+
+def test_nested(transport: SharedMemoryTransport):
+    data = {
+        "small": b"Drink me",
+        "large": [os.urandom(10 * THRESHOLD), bytearray(os.urandom(THRESHOLD))],
+        "other": (1, "Eat me", None),
+    }
+
+    assert send_and_receive(transport, data) == data
+
+
+@pytest.mark.skipif(not Path("/dev/shm").is_dir(), reason="Requires POSIX shared memory")
+def test_segments_unlinked(transport: SharedMemoryTransport):
+    segments_before = set(os.listdir("/dev/shm"))
+
+    send_and_receive(transport, [os.urandom(10 * THRESHOLD) for _ in range(3)])
+
+    assert set(os.listdir("/dev/shm")) == segments_before
+
+
+def test_invalid_threshold():
+    with pytest.raises(ValueError):
+        SharedMemoryTransport(threshold=0)
+
+
+class LargeReturnValuePlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, size: int, **_) -> bytes:  # type: ignore[override]
+        return b"x" * size
+
+
+def test_multiprocessing_plugin():
+    size = 32 * 1024 * 1024
+    plugin = MultiprocessingPlugin(
+        plugin=LargeReturnValuePlugin(plugin_name="large"), transport=SharedMemoryTransport()
+    )
+
+    return_value = plugin.run(size=size)
+
+    assert return_value == b"x" * size
@@ -0,0 +1,106 @@
+import threading
+import time
+from typing import Iterator
+
+import pytest
+
+from serpentarium import (
+    CancellationOutcome,
+    MultiUsePlugin,
+    NamedPluginMixin,
+    SingleUsePlugin,
+    ThreadPlugin,
+)
+
+
+class MyPlugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, *, value: int, **_) -> int:  # type: ignore[override]
+        return value
+
+
+class CancellablePlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, *, cancel_event: threading.Event, **_) -> str:  # type: ignore[override]
+        cancel_event.wait()
+        return "cancelled"
+
+
+class UncooperativePlugin(NamedPluginMixin, SingleUsePlugin):
+    def __init__(self, plugin_name: str, release: threading.Event):
+        super().__init__(plugin_name=plugin_name)
+        self._release = release
+
+    def run(self, **_):
+        self._release.wait()
+
+
+class RaisingPlugin(NamedPluginMixin, SingleUsePlugin):
+    def run(self, **_):
+        raise Exception("Failed")
+
+
+@pytest.fixture
+def release() -> Iterator[threading.Event]:
+    release = threading.Event()
+    yield release
+    release.set()
+
+
+def test_run():
+    plugin = ThreadPlugin(plugin=MyPlugin(plugin_name="my_plugin"))
+
+    assert plugin.run(value=42) == 42
+    assert not plugin.is_alive()
+
+
+def test_run__exception(caplog):
+    plugin = ThreadPlugin(plugin=RaisingPlugin(plugin_name="raising"))
+
+    assert plugin.run(timeout=30) is None
+    assert "raising raised an exception" in caplog.text
+
+
+def test_join__not_started():
+    plugin = ThreadPlugin(plugin=MyPlugin(plugin_name="my_plugin"))
+
+    assert not plugin.is_alive()
+    with pytest.raises(AssertionError):
+        plugin.join()
+
+
+def test_cancel():
+    plugin = ThreadPlugin(plugin=CancellablePlugin(plugin_name="cancellable"), cancellable=True)
+
+    plugin.start()
+
+    assert plugin.cancel(grace_period=30) == CancellationOutcome.STOPPED
+    assert plugin.return_value == "cancelled"
+
+
+def test_cancel__not_running():
+    plugin = ThreadPlugin(plugin=MyPlugin(plugin_name="my_plugin"))
+
+    plugin.start(value=1)
+    plugin.join()
+
+    assert plugin.cancel() == CancellationOutcome.NOT_RUNNING
+
+
+def test_cancel__abandoned(release: threading.Event):
+    plugin = ThreadPlugin(plugin=UncooperativePlugin(plugin_name="uncooperative", release=release))
+
+    plugin.start()
+
+    assert plugin.cancel(grace_period=0.01) == CancellationOutcome.ABANDONED
+    assert plugin.is_alive()
+
+
+def test_run__cancel_on_timeout():
+    plugin = ThreadPlugin(
+        plugin=CancellablePlugin(plugin_name="cancellable"),
+        cancellable=True,
+        cancel_grace_period=30,
+    )
+
+    start = time.monotonic()
+    assert plugin.run(timeout=0.1) == "cancelled"
+    assert time.monotonic() - start < 30
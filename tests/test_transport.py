@@ -0,0 +1,31 @@
+import multiprocessing
+
+import pytest
+
+from serpentarium import PickleTransport
+
+
+def send_and_receive(transport: PickleTransport, obj):
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    try:
+        transport.send(sender, obj)
+        return transport.recv(receiver)
+    finally:
+        receiver.close()
+        sender.close()
+
+
+@pytest.mark.parametrize("obj", [None, 0, "Jabberwocky", b"", {"a": [1, 2, (3,)]}])
+def test_round_trip(obj):
+    assert send_and_receive(PickleTransport(), obj) == obj
+
+
+def test_chunked():
+    data = bytes(range(256)) * 100
+
+    assert send_and_receive(PickleTransport(chunk_size=7), data) == data
+
+
+def test_invalid_chunk_size():
+    with pytest.raises(ValueError):
+        PickleTransport(chunk_size=0)
@@ -0,0 +1,213 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from serpentarium import IsolationMode, PluginLoader
+from serpentarium.plugin_finder import ManifestFinder, PluginFinder
+from serpentarium.plugin_wrapper import PluginWrapper
+from serpentarium.vendor_manifest import (
+    MANIFEST_FILE_NAME,
+    build_manifest,
+    load_manifest,
+    main,
+    verify_manifest,
+    write_manifest,
+)
+
+PLUGIN_NAME = "my_plugin"
+PLUGIN_SOURCE = """
+import nspkg.inner
+import pkg.mod
+import single
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **kwargs):
+        return (pkg.mod.VALUE, single.VALUE, nspkg.inner.VALUE)
+"""
+
+PRECEDENCE_PLUGIN_SOURCE = """
+import regular
+import shadowed
+
+from serpentarium import MultiUsePlugin, NamedPluginMixin
+
+
+class Plugin(NamedPluginMixin, MultiUsePlugin):
+    def run(self, **kwargs):
+        return (regular.VALUE, shadowed.VALUE)
+"""
+
+
+@pytest.fixture
+def plugin_directory(tmp_path: Path) -> Path:
+    plugin_directory = tmp_path / PLUGIN_NAME
+    vendor_directory = plugin_directory / "vendor"
+    files = {
+        plugin_directory / "plugin.py": PLUGIN_SOURCE,
+        vendor_directory / "pkg" / "__init__.py": "",
+        vendor_directory / "pkg" / "mod.py": "VALUE = 'pkg.mod'",
+        vendor_directory / "single.py": "VALUE = 'single'",
+        vendor_directory / "nspkg" / "inner.py": "VALUE = 'nspkg.inner'",
+        vendor_directory / "pkg-1.0.dist-info" / "METADATA": "",
+    }
+    for path, contents in files.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+
+    return plugin_directory
+
+
+def bump_mtime(path: Path):
+    mtime_ns = os.stat(path).st_mtime_ns + 10**9
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_build_manifest(plugin_directory: Path):
+    manifest = build_manifest(PLUGIN_NAME, plugin_directory)
+
+    assert set(manifest.modules) == {
+        PLUGIN_NAME,
+        f"{PLUGIN_NAME}.plugin",
+        "pkg",
+        "pkg.mod",
+        "single",
+        "nspkg",
+        "nspkg.inner",
+    }
+    assert manifest.modules["pkg"].path == "vendor/pkg/__init__.py"
+    assert manifest.modules["pkg"].is_package
+    assert manifest.modules["nspkg"].sha256 is None
+    assert not manifest.modules["single"].is_package
+
+
+def test_load_manifest(plugin_directory: Path):
+    write_manifest(plugin_directory)
+
+    manifest = load_manifest(PLUGIN_NAME, plugin_directory)
+
+    assert manifest is not None
+    assert manifest.modules == build_manifest(PLUGIN_NAME, plugin_directory).modules
+
+
+def test_load_manifest__missing(plugin_directory: Path):
+    assert load_manifest(PLUGIN_NAME, plugin_directory) is None
+
+
+def test_load_manifest__wrong_plugin_name(plugin_directory: Path):
+    write_manifest(plugin_directory)
+
+    assert load_manifest("other_plugin", plugin_directory) is None
+
+
+def test_load_manifest__corrupt(plugin_directory: Path):
+    (plugin_directory / MANIFEST_FILE_NAME).write_text("{")
+
+    assert load_manifest(PLUGIN_NAME, plugin_directory) is None
+
+
+def test_manifest_out_of_date__module_added(plugin_directory: Path):
+    write_manifest(plugin_directory)
+
+    (plugin_directory / "vendor" / "pkg" / "new_module.py").touch()
+    bump_mtime(plugin_directory / "vendor" / "pkg")
+
+    assert load_manifest(PLUGIN_NAME, plugin_directory) is None
+
+
+def test_manifest_up_to_date__unrelated_file_added(plugin_directory: Path):
+    write_manifest(plugin_directory)
+
+    (plugin_directory / "vendor" / "__pycache__").mkdir()
+    (plugin_directory / "vendor" / "README.txt").touch()
+    bump_mtime(plugin_directory / "vendor")
+
+    assert load_manifest(PLUGIN_NAME, plugin_directory) is not None
+
+
+def test_verify_manifest(plugin_directory: Path):
+    write_manifest(plugin_directory)
+    manifest = load_manifest(PLUGIN_NAME, plugin_directory)
+    assert manifest is not None
+
+    (plugin_directory / "vendor" / "single.py").write_text("VALUE = 'modified'")
+
+    assert verify_manifest(manifest, plugin_directory) == ["single"]
+
+
+def test_plugin_loaded_from_manifest(plugin_directory: Path):
+    write_manifest(plugin_directory)
+    plugin_loader = PluginLoader(plugin_directory.parent, isolation_mode=IsolationMode.META_PATH)
+
+    plugin = plugin_loader.load(plugin_name=PLUGIN_NAME)
+    assert isinstance(plugin, PluginWrapper)
+
+    assert plugin.run() == ("pkg.mod", "single", "nspkg.inner")
+    assert isinstance(plugin._finder, ManifestFinder)
+
+
+def test_out_of_date_manifest_ignored(plugin_directory: Path):
+    write_manifest(plugin_directory)
+    (plugin_directory / "vendor" / "single.py").unlink()
+    (plugin_directory / "vendor" / "single.py").write_text("VALUE = 'single'")
+    (plugin_directory / "vendor" / "extra.py").touch()
+    bump_mtime(plugin_directory / "vendor")
+    plugin_loader = PluginLoader(plugin_directory.parent, isolation_mode=IsolationMode.META_PATH)
+
+    plugin = plugin_loader.load(plugin_name=PLUGIN_NAME)
+    assert isinstance(plugin, PluginWrapper)
+
+    assert plugin.run() == ("pkg.mod", "single", "nspkg.inner")
+    assert isinstance(plugin._finder, PluginFinder)
+
+
+@pytest.mark.parametrize(
+    "isolation_mode, use_manifest",
+    [
+        (IsolationMode.SYS_PATH, False),
+        (IsolationMode.META_PATH, False),
+        (IsolationMode.META_PATH, True),
+    ],
+)
+def test_module_precedence(tmp_path: Path, isolation_mode: IsolationMode, use_manifest: bool):
+    plugin_directory = tmp_path / PLUGIN_NAME
+    vendor_directory = plugin_directory / "vendor"
+    files = {
+        plugin_directory / "plugin.py": PRECEDENCE_PLUGIN_SOURCE,
+        vendor_directory / "regular.py": "VALUE = 'module'",
+        vendor_directory / "regular" / "__init__.py": "VALUE = 'package'",
+        vendor_directory / "shadowed.py": "VALUE = 'module'",
+        vendor_directory / "shadowed" / "inner.py": "VALUE = 'namespace package'",
+    }
+    for path, contents in files.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contents)
+    if use_manifest:
+        write_manifest(plugin_directory)
+    plugin_loader = PluginLoader(tmp_path, isolation_mode=isolation_mode)
+
+    plugin = plugin_loader.load(plugin_name=PLUGIN_NAME)
+
+    assert plugin.run() == ("package", "module")
+
+
+@pytest.mark.parametrize("check, expected_exit_code", [(False, 0), (True, 1)])
+def test_main(monkeypatch, plugin_directory: Path, check: bool, expected_exit_code: int):
+    monkeypatch.setattr(sys, "argv", ["vendor_manifest", str(plugin_directory)])
+    with pytest.raises(SystemExit):
+        main()
+
+    (plugin_directory / "vendor" / "single.py").write_text("VALUE = 'modified'")
+    argv = ["vendor_manifest", *(["--check"] if check else []), str(plugin_directory)]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+
+    # mypy can't resolve the type of ExceptionInfo.value, so the exception is narrowed explicitly
+    exit_error: BaseException = exit_info.value
+    assert isinstance(exit_error, SystemExit)
+    assert exit_error.code == expected_exit_code